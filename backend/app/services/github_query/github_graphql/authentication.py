@@ -1,4 +1,7 @@
-from typing import Dict
+import math
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
 
 class Authenticator:
     """
@@ -17,6 +20,32 @@ class Authenticator:
         """
         raise NotImplementedError("Authenticator cannot be implemented")
 
+    def update_rate_limit(self, header: Dict[str, str], remaining: int, reset_at: str) -> None:
+        """
+        Records the rate limit reported for the credential behind a header. Authenticators holding a
+        single credential have no choice to make, so the default implementation ignores it.
+
+        Args:
+            header (dict): The authorization header the request was sent with.
+            remaining (int): The points left in the credential's current rate limit window.
+            reset_at (str): The time the window resets, formatted as "%Y-%m-%dT%H:%M:%SZ".
+        """
+        pass
+
+    def rotate(self, header: Dict[str, str], reset_at: str) -> bool:
+        """
+        Called when the credential behind a header cannot afford the next query.
+
+        Args:
+            header (dict): The authorization header of the exhausted credential.
+            reset_at (str): The time the credential's window resets, formatted as "%Y-%m-%dT%H:%M:%SZ".
+
+        Returns:
+            bool: True if the next call to get_authorization_header can provide another credential,
+                  False if the caller has to wait for the reset itself.
+        """
+        return False
+
 
 class PersonalAccessTokenAuthenticator(Authenticator):
     """
@@ -43,3 +72,116 @@ class PersonalAccessTokenAuthenticator(Authenticator):
         return {
             "Authorization": f"token {self._token}"
         }
+
+
+class TokenPoolAuthenticator(Authenticator):
+    """
+    TokenPoolAuthenticator spreads queries over several credentials. It tracks the remaining points and
+    reset time GitHub reports for each credential, hands out the credential with the most headroom, and
+    only blocks callers once every credential in the pool is exhausted. It is safe to share between threads.
+    """
+    def __init__(self, authenticators: List[Authenticator], reserve: int = 5) -> None:
+        """
+        Initializes the pool with the authenticators of the credentials to rotate between.
+
+        Args:
+            authenticators (list): The authenticators of the credentials, each holding a single credential.
+            reserve (int): The points a credential keeps in reserve, a credential with no more than this many
+                           points left is considered exhausted until its window resets.
+
+        Raises:
+            ValueError: If no authenticator is provided.
+        """
+        if not authenticators:
+            raise ValueError("TokenPoolAuthenticator needs at least one authenticator")
+        self._authenticators = list(authenticators)
+        self._keys = [self._key(authenticator.get_authorization_header()) for authenticator in self._authenticators]
+        self._reserve = reserve
+        # remaining points and reset time per credential, unknown until the first response
+        self._remaining: Dict[str, Optional[int]] = {key: None for key in self._keys}
+        self._reset_at: Dict[str, Optional[datetime]] = {key: None for key in self._keys}
+        # order in which credentials were last handed out, used to spread ties
+        self._last_used: Dict[str, int] = {key: 0 for key in self._keys}
+        self._tick = 0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_tokens(cls, tokens: List[str], reserve: int = 5) -> 'TokenPoolAuthenticator':
+        """
+        Builds a pool of personal access tokens.
+
+        Args:
+            tokens (list): The personal access tokens to rotate between.
+            reserve (int): The points a token keeps in reserve.
+
+        Returns:
+            TokenPoolAuthenticator: A pool holding one PersonalAccessTokenAuthenticator per token.
+        """
+        return cls([PersonalAccessTokenAuthenticator(token=token) for token in tokens], reserve=reserve)
+
+    @staticmethod
+    def _key(header: Dict[str, str]) -> str:
+        return header["Authorization"]
+
+    def _headroom(self, key: str, now: datetime) -> float:
+        """
+        Returns the points a credential can still spend, infinite while unknown or after its window reset.
+        """
+        remaining, reset_at = self._remaining[key], self._reset_at[key]
+        if remaining is None or reset_at is None or reset_at <= now:
+            return math.inf
+        return remaining
+
+    def get_authorization_header(self) -> Dict[str, str]:
+        """
+        Returns the authorization header of the credential with the most headroom, blocking the calling
+        thread until the earliest reset if every credential is exhausted.
+
+        Returns:
+            dict: The authorization header of the selected credential.
+        """
+        with self._condition:
+            while True:
+                now = datetime.utcnow()
+                index = max(range(len(self._keys)),
+                            key=lambda i: (self._headroom(self._keys[i], now), -self._last_used[self._keys[i]]))
+                key = self._keys[index]
+                if self._headroom(key, now) > self._reserve:
+                    self._tick += 1
+                    self._last_used[key] = self._tick
+                    return self._authenticators[index].get_authorization_header()
+
+                reset_at = min(reset for reset in self._reset_at.values() if reset is not None)
+                seconds = (reset_at - now).total_seconds()
+                print(f"all {len(self._keys)} tokens exhausted, waiting for {seconds}s.")
+                self._condition.wait(timeout=max(seconds, 0) + 5)
+
+    def update_rate_limit(self, header: Dict[str, str], remaining: int, reset_at: str) -> None:
+        """
+        Records the rate limit reported for the credential behind a header.
+
+        Args:
+            header (dict): The authorization header the request was sent with.
+            remaining (int): The points left in the credential's current rate limit window.
+            reset_at (str): The time the window resets, formatted as "%Y-%m-%dT%H:%M:%SZ".
+        """
+        key = self._key(header)
+        with self._condition:
+            self._remaining[key] = remaining
+            self._reset_at[key] = datetime.strptime(reset_at, '%Y-%m-%dT%H:%M:%SZ')
+            self._condition.notify_all()
+
+    def rotate(self, header: Dict[str, str], reset_at: str) -> bool:
+        """
+        Marks the credential behind a header as exhausted until its reset, so that the next call to
+        get_authorization_header selects another credential or waits for the earliest reset.
+
+        Args:
+            header (dict): The authorization header of the exhausted credential.
+            reset_at (str): The time the credential's window resets, formatted as "%Y-%m-%dT%H:%M:%SZ".
+
+        Returns:
+            bool: Always True, the pool itself waits when every credential is exhausted.
+        """
+        self.update_rate_limit(header, 0, reset_at)
+        return True
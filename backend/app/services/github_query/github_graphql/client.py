@@ -1,15 +1,23 @@
 import re
 import time
+import queue
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from random import randint
 from string import Template
-from typing import Union, Optional, Dict, Any, Generator
+from typing import Union, Optional, Dict, Any, Callable, Tuple, Generator, AsyncGenerator, Awaitable
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout, RequestException
 from requests import Response
 from backend.app.services.github_query.github_graphql.authentication import Authenticator
-from backend.app.services.github_query.github_graphql.query import Query, PaginatedQuery
+from backend.app.services.github_query.github_graphql.query import Query, PaginatedQuery, PaginationState
+from backend.app.services.github_query.github_graphql.response_cache import ResponseCache
+from backend.app.services.github_query.github_graphql.page_size import PageSizeController
 from backend.app.services.github_query.queries.costs.query_cost import QueryCost
+from backend.app.services.github_query.queries.costs.cost_estimator import estimate_cost
 
 class InvalidAuthenticationError(Exception):
     """Exception raised when an authentication object is invalid or not provided."""
@@ -31,12 +39,44 @@ class QueryFailedException(Exception):
             message = f"Query failed with code {response.status_code}. Path: {response.request.path_url}. Response: {response.text}"
         super().__init__(message)
 
+def build_session(pool_connections: int = 10, pool_maxsize: int = 10) -> requests.Session:
+    """
+    Builds a keep-alive requests session whose connection pool is sized for repeated calls to the same GitHub host.
+    Retries are left to the clients, so the adapter itself never retries.
+
+    Args:
+        pool_connections (int): The number of per-host connection pools to cache.
+        pool_maxsize (int): The maximum number of connections kept alive in each pool.
+
+    Returns:
+        requests.Session: A session with pooled HTTP and HTTPS adapters mounted.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# points kept in reserve when comparing a query's cost against the remaining rate limit
+RATE_LIMIT_MARGIN = 5
+RATE_LIMIT_MODES = ("dryrun", "inline", "estimate")
+# the rateLimit selections the client adds to queries are aliased, so they cannot conflict with a rateLimit
+# selected by the query itself, such as RateLimit with a dry run
+RATE_LIMIT_ALIAS = "clientRateLimit"
+RATE_LIMIT_SELECTION = f"{RATE_LIMIT_ALIAS}: rateLimit {{ cost remaining resetAt }}"
+# gateway errors GitHub answers queries with when they take too long to resolve
+GATEWAY_ERRORS = (502, 503, 504)
+DRY_RUN_SELECTION = f"{RATE_LIMIT_ALIAS}: rateLimit(dryRun: true) {{ cost remaining resetAt }}"
+
 class Client:
     """
     Client is a class that handles making GraphQL queries to a GitHub instance using the provided authentication.
     It manages request construction, execution, and error handling, along with support for pagination.
     """
-    def __init__(self, protocol: str = "https", host: str = "api.github.com", is_enterprise: bool = False, authenticator: Optional[Authenticator] = None) -> None:
+    def __init__(self, protocol: str = "https", host: str = "api.github.com", is_enterprise: bool = False, authenticator: Optional[Authenticator] = None,
+                 session: Optional[requests.Session] = None, pool_connections: int = 10, pool_maxsize: int = 10,
+                 rate_limit_mode: str = "dryrun", dry_run_threshold: int = 100, use_variables: bool = False,
+                 cache: Optional[ResponseCache] = None, page_size: Optional[PageSizeController] = None) -> None:
         """
         Initializes the client with the necessary configuration and authentication.
 
@@ -45,9 +85,25 @@ class Client:
             host (str): The host address of the GitHub server.
             is_enterprise (bool): Indicates whether the client is connecting to a GitHub Enterprise instance.
             authenticator (Optional[Authenticator]): The authenticator instance for handling authentication.
+            session (Optional[requests.Session]): A session to send requests through. When omitted, the client builds
+                                                  a pooled keep-alive session of its own and closes it in close().
+            pool_connections (int): The number of connection pools cached by the client's own session.
+            pool_maxsize (int): The maximum number of keep-alive connections per pool of the client's own session.
+            rate_limit_mode (str): "dryrun" prices every query with a separate dry-run request before sending it.
+                                   "inline" selects rateLimit in the query itself and tracks the budget locally,
+                                   dry-running only while the budget is unknown or close to the threshold.
+                                   "estimate" also selects rateLimit inline, but prices every query locally with
+                                   estimate_cost against the tracked budget, dry-running only while it is unknown.
+            dry_run_threshold (int): In "inline" mode, the remaining points below which queries are dry-run first.
+            use_variables (bool): Sends Query objects as a typed document with a separate variables payload instead of
+                                  inlining the substitutions, so the query text is the same for every user and page.
+            cache (Optional[ResponseCache]): A cache of responses, answering queries sent before without a request.
+            page_size (Optional[PageSizeController]): Adapts the $pg_size of paginations to the cost, latency and failures
+                                                      of their pages, the caller's $pg_size serving as the initial size.
 
         Raises:
             InvalidAuthenticationError: If no authenticator is provided or if the provided authenticator is invalid.
+            ValueError: If the rate limit mode is not one of "dryrun", "inline" or "estimate".
         """
         self._protocol = protocol
         self._host = host
@@ -56,7 +112,36 @@ class Client:
         if authenticator is None:
             raise InvalidAuthenticationError("Authentication needs to be specified")
         self._authenticator = authenticator
-                
+
+        # an injected session belongs to the caller, so only a session built here is closed by close()
+        self._owns_session = session is None
+        self._session = session if session is not None else build_session(pool_connections, pool_maxsize)
+
+        if rate_limit_mode not in RATE_LIMIT_MODES:
+            raise ValueError(f"Unknown rate limit mode {rate_limit_mode}, expected one of {RATE_LIMIT_MODES}")
+        self._rate_limit_mode = rate_limit_mode
+        self._dry_run_threshold = dry_run_threshold
+        # the last rateLimit reported by the server for each credential, keyed by its Authorization header
+        self._rate_limits: Dict[str, Dict[str, Any]] = {}
+        self._use_variables = use_variables
+        self._cache = cache
+        self._page_size = page_size
+        # the cost of the last query sent by each thread, observed by the page size controller
+        self._last_cost = threading.local()
+
+    def close(self) -> None:
+        """
+        Releases the pooled connections held by the client. Injected sessions are left open for their owner.
+        """
+        if self._owns_session:
+            self._session.close()
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
     def _base_path(self) -> str:
         """
         Constructs the base URL path for the GitHub GraphQL API.
@@ -84,7 +169,28 @@ class Client:
         headers.update(kwargs)
         return headers
 
-    def _retry_request(self, retry_attempts: int, timeout_seconds: int, query: Union[str, Query], substitutions: Dict[str, Any]) -> Response:
+    @staticmethod
+    def _render(query: Union[str, Query], substitutions: Dict[str, Any], state: Optional[PaginationState] = None) -> str:
+        """
+        Renders a query template with its substitutions into the query string sent to the server.
+
+        Args:
+            query (Union[str, Query]): The GraphQL query to render.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            state (Optional[PaginationState]): For a PaginatedQuery, the pagination whose page to render,
+                                               instead of the page held by the query's paginator.
+
+        Returns:
+            str: The rendered query string.
+        """
+        if isinstance(query, str):
+            return Template(query).substitute(**substitutions)
+        if state is not None:
+            return query.substitute_page(state, **substitutions)
+        return query.substitute(**substitutions)
+
+    def _retry_request(self, retry_attempts: int, timeout_seconds: int, query: Union[str, Query], substitutions: Optional[Dict[str, Any]],
+                       headers: Optional[Dict[str, str]] = None, variables: Optional[Dict[str, Any]] = None) -> Response:
         """
         Tries to send a request multiple times until it succeeds or the retry limit is reached.
 
@@ -92,7 +198,10 @@ class Client:
             retry_attempts (int): The number of times to retry the request before giving up.
             timeout_seconds (int): The number of seconds to wait for a response before timing out.
             query (Union[str, Query]): The GraphQL query to execute.
-            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            substitutions (Optional[Dict[str, Any]]): Substitutions to apply to the query template,
+                                                      None if the query is an already rendered string.
+            headers (Optional[Dict[str, str]]): The headers to send, generated from the authenticator if omitted.
+            variables (Optional[Dict[str, Any]]): The GraphQL variables to send along with an already rendered query.
 
         Returns:
             Response: The server's response to the HTTP request.
@@ -100,16 +209,21 @@ class Client:
         Raises:
             Timeout: If all retry attempts are exhausted and the request keeps timing out.
         """
+        # render once, every attempt sends the same query string
+        query_string = query if substitutions is None else self._render(query, substitutions)
+        if headers is None:
+            headers = self._generate_headers()
+        payload = {'query': query_string}
+        if variables is not None:
+            payload['variables'] = variables
         last_exception = None
         response = None
         for _ in range(retry_attempts):
             try:
-                response = requests.post(
+                response = self._session.post(
                     self._base_path(),
-                    json={
-                        'query': Template(query).substitute(**substitutions) if isinstance(query, str) else query.substitute(**substitutions)
-                    },
-                    headers=self._generate_headers(),
+                    json=payload,
+                    headers=headers,
                     timeout=timeout_seconds
                 )
                 if response.status_code == 200:
@@ -122,41 +236,142 @@ class Client:
             raise QueryFailedException(query=query, response=response)
         raise Timeout("All retry attempts exhausted.")
 
-    def _execute(self, query: Union[str, Query], substitutions: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _wait_for_reset(reset_at: str) -> None:
         """
-        Executes a query with the given substitutions and handles response processing and error checking.
+        Blocks until the rate limit window resets.
 
         Args:
-            query (Union[str, Query]): The GraphQL query to execute.
-            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            reset_at (str): The time the current rate limit window resets, formatted as "%Y-%m-%dT%H:%M:%SZ".
+        """
+        current_time = datetime.utcnow()
+        time_format = '%Y-%m-%dT%H:%M:%SZ'
+        reset_at = datetime.strptime(reset_at, time_format)
+        time_diff = reset_at - current_time
+        seconds = time_diff.total_seconds()
+        print(f"stop at {current_time}s.")
+        print(f"waiting for {seconds}s.")
+        print(f"reset at {reset_at}s.")
+        time.sleep(seconds + 5)
+
+    def _record_rate_limit(self, headers: Dict[str, str], rate_limit: Dict[str, Any]) -> None:
+        """
+        Records the rate limit the server reported for the credential a request was sent with.
+
+        Args:
+            headers (Dict[str, str]): The headers the request was sent with.
+            rate_limit (Dict[str, Any]): The reported rateLimit with cost, remaining and resetAt.
+        """
+        self._rate_limits[headers.get("Authorization", "")] = rate_limit
+        self._last_cost.value = rate_limit['cost']
+        self._authenticator.update_rate_limit(headers, rate_limit['remaining'], rate_limit['resetAt'])
+
+    def _dry_run(self, content: str, headers: Dict[str, str], operation: str = "query ",
+                 variables: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """
+        Pre-calculates the cost of a query with a dry run. If the cost is larger than the available rate limit,
+        switches to another credential of the authenticator or waits for the rate limit to reset.
+
+        Args:
+            content (str): The selection set of the query to price, without the surrounding "query { }".
+            headers (Dict[str, str]): The headers the query is going to be sent with.
+            operation (str): The operation the selection set belongs to, including its variable declarations.
+            variables (Optional[Dict[str, Any]]): The GraphQL variables of the query, None if they are inlined.
 
         Returns:
-            Dict[str, Any]: The parsed JSON response from the server.
+            Dict[str, str]: The headers to send the query with.
+        """
+        if variables is None:
+            rate_limit = self._retry_request(3, 10, QueryCost(content), {"dryrun": True}, headers)
+            rate_limit = rate_limit.json()["data"]["rateLimit"]
+        else:
+            rate_query = f"{operation}{{{content} {DRY_RUN_SELECTION} }}"
+            rate_limit = self._retry_request(3, 10, rate_query, None, headers, variables)
+            rate_limit = rate_limit.json()["data"][RATE_LIMIT_ALIAS]
+        self._record_rate_limit(headers, rate_limit)
+        return self._reserve(headers, rate_limit['cost'], rate_limit['remaining'], rate_limit['resetAt'])
 
-        Raises:
-            QueryFailedException: If the query execution fails or returns errors.
+    def _estimate(self, query_string: str, headers: Dict[str, str], operation: str, content: str,
+                  variables: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """
+        Prices a query locally against the rate limit budget tracked for a credential, falling back to a dry run
+        while the budget is unknown.
+
+        Args:
+            query_string (str): The rendered query.
+            headers (Dict[str, str]): The headers the query is going to be sent with.
+            operation (str): The operation the selection set belongs to, including its variable declarations.
+            content (str): The selection set of the query, without the surrounding "query { }".
+            variables (Optional[Dict[str, Any]]): The GraphQL variables of the query, None if they are inlined.
+
+        Returns:
+            Dict[str, str]: The headers to send the query with.
+        """
+        rate_limit = self._rate_limits.get(headers.get("Authorization", ""))
+        if rate_limit is None:
+            return self._dry_run(content, headers, operation, variables)
+        if datetime.strptime(rate_limit['resetAt'], '%Y-%m-%dT%H:%M:%SZ') <= datetime.utcnow():
+            # the window has reset since the last response, so the budget is full again
+            return headers
+        return self._reserve(headers, estimate_cost(query_string, variables), rate_limit['remaining'],
+                             rate_limit['resetAt'])
+
+    def _reserve(self, headers: Dict[str, str], cost: int, remaining: int, reset_at: str) -> Dict[str, str]:
+        """
+        Makes sure the credential a query is going to be sent with can afford it, switching to another credential
+        of the authenticator or waiting for the rate limit to reset if it cannot.
+
+        Args:
+            headers (Dict[str, str]): The headers the query is going to be sent with.
+            cost (int): The cost of the query.
+            remaining (int): The remaining rate limit of the credential.
+            reset_at (str): The time the rate limit of the credential resets, formatted as "%Y-%m-%dT%H:%M:%SZ".
+
+        Returns:
+            Dict[str, str]: The headers to send the query with.
         """
-        query_string = Template(query).substitute(**substitutions) if isinstance(query, str) else query.substitute(**substitutions)
-        match = re.search(r'query\s*{(?P<content>.+)}', query_string)
-        # pre-calculate the cost of the upcoming graphql query
-        rate_query = QueryCost(match.group('content'))
-        rate_limit = self._retry_request(3, 10, rate_query, {"dryrun": True})
-        # print(query_string, rate_query, rate_limit.json())
-        rate_limit = rate_limit.json()["data"]["rateLimit"]
-        cost, remaining, reset_at = rate_limit['cost'], rate_limit['remaining'], rate_limit['resetAt']
         # if the cost of the upcoming graphql query larger than avaliable ratelimit, wait till ratelimit reset
-        if cost > remaining - 5:
-            current_time = datetime.utcnow()
-            time_format = '%Y-%m-%dT%H:%M:%SZ'
-            reset_at = datetime.strptime(reset_at, time_format)
-            time_diff = reset_at - current_time
-            seconds = time_diff.total_seconds()
-            print(f"stop at {current_time}s.")
-            print(f"waiting for {seconds}s.")
-            print(f"reset at {reset_at}s.")
-            time.sleep(seconds + 5)
-
-        response = self._retry_request(3, 10, query, substitutions)
+        if cost > remaining - RATE_LIMIT_MARGIN:
+            if self._authenticator.rotate(headers, reset_at):
+                # the authenticator picks another credential, or blocks until one resets
+                return self._generate_headers()
+            self._wait_for_reset(reset_at)
+        return headers
+
+    def _budget_is_low(self, headers: Dict[str, str]) -> bool:
+        """
+        Checks the locally tracked rate limit budget of a credential against the dry run threshold.
+
+        Args:
+            headers (Dict[str, str]): The headers identifying the credential.
+
+        Returns:
+            bool: True if the budget is unknown or close to the threshold, False if queries can be sent directly.
+        """
+        rate_limit = self._rate_limits.get(headers.get("Authorization", ""))
+        if rate_limit is None:
+            return True
+        reset_at = datetime.strptime(rate_limit['resetAt'], '%Y-%m-%dT%H:%M:%SZ')
+        if reset_at <= datetime.utcnow():
+            # the window has reset since the last response, so the budget is full again
+            return False
+        return rate_limit['remaining'] - RATE_LIMIT_MARGIN < self._dry_run_threshold
+
+    @staticmethod
+    def _parse_response(query: Union[str, Query], response: Response) -> Dict[str, Any]:
+        """
+        Extracts the data of a response, checking it for errors.
+
+        Args:
+            query (Union[str, Query]): The GraphQL query the response answers.
+            response (Response): The server's response.
+
+        Returns:
+            Dict[str, Any]: The data of the response.
+
+        Raises:
+            QueryFailedException: If the response cannot be decoded or reports errors.
+        """
         try:
             json_response = response.json()
         except RequestException:
@@ -167,43 +382,563 @@ class Client:
         else:
             raise QueryFailedException(query=query, response=response)
 
-    def execute(self, query: Union[str, Query, PaginatedQuery], substitutions: Dict[str, Any]) -> Dict[str, Any]:
+    def _execute(self, query: Union[str, Query], substitutions: Dict[str, Any],
+                 state: Optional[PaginationState] = None) -> Dict[str, Any]:
+        """
+        Executes a query with the given substitutions and handles response processing and error checking.
+
+        Args:
+            query (Union[str, Query]): The GraphQL query to execute.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            state (Optional[PaginationState]): For a PaginatedQuery, the pagination whose page to fetch,
+                                               instead of the page held by the query's paginator.
+
+        Returns:
+            Dict[str, Any]: The parsed JSON response from the server.
+
+        Raises:
+            QueryFailedException: If the query execution fails or returns errors.
+            ResponseCacheMiss: If the cache is offline and holds no response for the query.
+        """
+        if self._use_variables and isinstance(query, Query):
+            query_string, variables = query.with_variables(**substitutions) if state is None else \
+                query.with_variables_page(state, **substitutions)
+        else:
+            query_string, variables = self._render(query, substitutions, state), None
+        if self._cache is not None:
+            query_name = type(query).__name__
+            key = self._cache.key(query_string, variables)
+            cached = self._cache.get(key, query_name, substitutions)
+            if cached is not None:
+                return cached
+            data = self._send(query, query_string, variables)
+            self._cache.put(key, query_name, substitutions, data)
+            return data
+        return self._send(query, query_string, variables)
+
+    def _send(self, query: Union[str, Query], query_string: str, variables: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Sends a rendered query to the server, accounting for its cost according to the rate limit mode.
+
+        Args:
+            query (Union[str, Query]): The GraphQL query being executed.
+            query_string (str): The rendered query.
+            variables (Optional[Dict[str, Any]]): The GraphQL variables to send along with the query.
+
+        Returns:
+            Dict[str, Any]: The parsed JSON response from the server.
+
+        Raises:
+            QueryFailedException: If the query execution fails or returns errors.
+        """
+        match = re.search(r'(?P<operation>query[^{]*){(?P<content>.+)}', query_string)
+        operation, content = match.group('operation'), match.group('content')
+        # the dry run and the query itself are sent with the same credential
+        headers = self._generate_headers()
+
+        if self._rate_limit_mode == "dryrun":
+            headers = self._dry_run(content, headers, operation, variables)
+            response = self._retry_request(3, 10, query_string, None, headers, variables)
+            return self._parse_response(query, response)
+
+        if self._rate_limit_mode == "estimate":
+            headers = self._estimate(query_string, headers, operation, content, variables)
+        elif self._budget_is_low(headers):
+            headers = self._dry_run(content, headers, operation, variables)
+        # account for the query in the query itself instead of a separate dry run
+        response = self._retry_request(3, 10, f"{operation}{{{content} {RATE_LIMIT_SELECTION} }}", None, headers, variables)
+        data = self._parse_response(query, response)
+        self._record_rate_limit(headers, data.pop(RATE_LIMIT_ALIAS))
+        return data
+
+    def _execute_page(self, query: PaginatedQuery, substitutions: Dict[str, Any],
+                      state: Optional[PaginationState] = None) -> Dict[str, Any]:
+        """
+        Fetches the next page of a pagination, at the page size of the page size controller if there is one.
+
+        Args:
+            query (PaginatedQuery): The paginated GraphQL query to execute.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            state (Optional[PaginationState]): The pagination whose page to fetch, the query's paginator if omitted.
+
+        Returns:
+            Dict[str, Any]: The parsed JSON response from the server.
+        """
+        if self._page_size is None or "pg_size" not in substitutions:
+            return self._execute(query, substitutions, state)
+        return self._execute_adaptive(query, substitutions, state)
+
+    def _execute_adaptive(self, query: PaginatedQuery, substitutions: Dict[str, Any],
+                          state: Optional[PaginationState] = None) -> Dict[str, Any]:
+        """
+        Fetches the next page of a pagination at the page size the controller picks for the query class, reporting
+        the latency and cost of the page back to it. A page that times out or fails with a gateway error is retried
+        from the same cursor at a smaller size, until the controller's minimum size is reached.
+
+        Args:
+            query (PaginatedQuery): The paginated GraphQL query to execute.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template, including the initial $pg_size.
+            state (Optional[PaginationState]): The pagination whose page to fetch, the query's paginator if omitted.
+
+        Returns:
+            Dict[str, Any]: The parsed JSON response from the server.
+
+        Raises:
+            QueryFailedException: If the query fails for another reason, or at the minimum page size.
+            Timeout: If the query keeps timing out at the minimum page size.
+        """
+        key = type(query).__name__
+        while True:
+            size = self._page_size.size(key, substitutions["pg_size"])
+            self._last_cost.value = None
+            started = time.monotonic()
+            try:
+                response = Client._execute(self, query, {**substitutions, "pg_size": size}, state)
+            except (Timeout, QueryFailedException) as error:
+                gateway_error = isinstance(error, Timeout) or error.response.status_code in GATEWAY_ERRORS
+                if not gateway_error or not self._page_size.back_off(key, size):
+                    raise
+                continue
+            self._page_size.observe(key, size, time.monotonic() - started, self._last_cost.value)
+            return response
+
+    def execute(self, query: Union[str, Query, PaginatedQuery], substitutions: Dict[str, Any],
+                stop_predicate: Optional[Callable[[Dict[str, Any]], bool]] = None, prefetch: int = 0,
+                state: Optional[PaginationState] = None) -> Dict[str, Any]:
         """
         Public method to execute a non-paginated or paginated query.
 
         Args:
             query (Union[str, Query, PaginatedQuery]): The GraphQL query to execute.
             substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            stop_predicate (Optional[Callable[[Dict[str, Any]], bool]]): For a PaginatedQuery, called with each page;
+                pagination stops after the first page for which it returns True.
+            prefetch (int): For a PaginatedQuery, the number of pages fetched ahead in the background while the caller
+                processes the current one. 0 fetches each page only once the previous one has been consumed.
+            state (Optional[PaginationState]): For a PaginatedQuery, the state the pagination starts from and records its
+                progress in, leaving the query untouched so that it can serve other paginations at the same time.
+                Without a state, the pagination is recorded in the query's own paginator.
 
         Returns:
             Dict[str, Any]: The parsed JSON response from the server.
         """
         if isinstance(query, PaginatedQuery):
-            return self._execution_generator(query, substitutions)
+            if prefetch > 0:
+                return self._prefetching_generator(query, substitutions, stop_predicate, prefetch, state)
+            return self._execution_generator(query, substitutions, stop_predicate, state)
 
         return self._execute(query, substitutions)
 
-    def _execution_generator(self, query: Union[Query, PaginatedQuery], substitutions: Dict[str, Any]) -> Generator[Dict[str, Any], None, None]:
+    def _execution_generator(self, query: Union[Query, PaginatedQuery], substitutions: Dict[str, Any],
+                             stop_predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                             state: Optional[PaginationState] = None) -> Generator[Dict[str, Any], None, None]:
         """
         Handles the iteration over paginated query results, yielding each page's data as it's fetched.
 
         Args:
             query (Union[Query, PaginatedQuery]): The paginated GraphQL query to execute.
             substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            stop_predicate (Optional[Callable[[Dict[str, Any]], bool]]): Called with each page; once it returns True
+                the page is yielded and no further pages are fetched.
+            state (Optional[PaginationState]): The state of the pagination, the query's paginator if omitted.
+
+        Returns:
+            Generator[Dict[str, Any], None, None]: A generator yielding each page's data as a dictionary.
+        """
+        paginator = query.paginator if state is None else state
+        while paginator.has_next():
+            response = self._execute_page(query, substitutions, state)
+            paginator.update_paginator(*self._next_page(query, substitutions, response, stop_predicate))
+            yield response
+
+    def _prefetching_generator(self, query: PaginatedQuery, substitutions: Dict[str, Any],
+                               stop_predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                               prefetch: int = 1, state: Optional[PaginationState] = None) -> Generator[Dict[str, Any], None, None]:
+        """
+        Iterates over paginated query results like _execution_generator, but a background thread keeps fetching
+        the following pages while the caller processes the current one. Pages are fetched one after the other
+        since each request needs the cursor of the previous page, so the paginator is only ever updated by that thread.
+
+        Args:
+            query (PaginatedQuery): The paginated GraphQL query to execute.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            stop_predicate (Optional[Callable[[Dict[str, Any]], bool]]): Called with each page; once it returns True
+                no further pages are fetched.
+            prefetch (int): The maximum number of fetched pages waiting to be consumed.
+            state (Optional[PaginationState]): The state of the pagination, the query's paginator if omitted.
 
         Returns:
             Generator[Dict[str, Any], None, None]: A generator yielding each page's data as a dictionary.
+
+        Raises:
+            QueryFailedException: If fetching a page fails, raised once the pages before it have been yielded.
         """
-        while query.paginator.has_next():
-            response = self._execute(query, substitutions)
-            curr_node = response
+        pages = queue.Queue(maxsize=prefetch)
+        closed = threading.Event()
+        paginator = query.paginator if state is None else state
 
-            for field_name in query.path:
-                curr_node = curr_node[Template(field_name).substitute(**substitutions)]
+        def put(item: Tuple[Optional[Dict[str, Any]], Optional[Exception]]) -> None:
+            # Gives up once the consumer is gone instead of blocking on a full buffer forever
+            while not closed.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def fetch() -> None:
+            try:
+                while paginator.has_next() and not closed.is_set():
+                    response = self._execute_page(query, substitutions, state)
+                    paginator.update_paginator(*self._next_page(query, substitutions, response, stop_predicate))
+                    put((response, None))
+                put((None, None))
+            except Exception as error:
+                put((None, error))
+
+        fetcher = threading.Thread(target=fetch, daemon=True)
+        fetcher.start()
+        try:
+            while True:
+                response, error = pages.get()
+                if error is not None:
+                    raise error
+                if response is None:
+                    return
+                yield response
+        finally:
+            closed.set()
+
+    @staticmethod
+    def _next_page(query: PaginatedQuery, substitutions: Dict[str, Any], response: Dict[str, Any],
+                   stop_predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Reads the pagination state of a fetched page.
+
+        Args:
+            query (PaginatedQuery): The paginated GraphQL query the page belongs to.
+            substitutions (Dict[str, Any]): Substitutions applied to the query template.
+            response (Dict[str, Any]): The parsed page.
+            stop_predicate (Optional[Callable[[Dict[str, Any]], bool]]): Ends the pagination early when it returns True for the page.
 
-            end_cursor = curr_node["pageInfo"]["endCursor"]
-            has_next_page = curr_node["pageInfo"]["hasNextPage"]
-            query.paginator.update_paginator(has_next_page, end_cursor)
+        Returns:
+            Tuple[bool, Optional[str]]: Whether another page should be fetched, and the end cursor of the page.
+        """
+        curr_node = response
+
+        for field_name in query.path:
+            curr_node = curr_node[Template(field_name).substitute(**substitutions)]
+
+        end_cursor = curr_node["pageInfo"]["endCursor"]
+        has_next_page = curr_node["pageInfo"]["hasNextPage"]
+        if has_next_page and stop_predicate is not None and stop_predicate(response):
+            has_next_page = False
+        return has_next_page, end_cursor
+
+
+
+class AsyncClient(Client):
+    """
+    AsyncClient exposes the Client API to asyncio code. Queries run on a bounded pool of worker threads that
+    share the client's pooled session, so many queries can be in flight at once while the event loop stays free.
+    Rate limit handling and QueryFailedException semantics are the same as for Client.
+    """
+    def __init__(self, protocol: str = "https", host: str = "api.github.com", is_enterprise: bool = False, authenticator: Optional[Authenticator] = None,
+                 session: Optional[requests.Session] = None, pool_connections: int = 10, pool_maxsize: Optional[int] = None,
+                 rate_limit_mode: str = "dryrun", dry_run_threshold: int = 100, use_variables: bool = False, *,
+                 cache: Optional[ResponseCache] = None, page_size: Optional[PageSizeController] = None,
+                 max_concurrency: int = 10) -> None:
+        """
+        Initializes the asynchronous client with the same configuration as Client and a concurrency limit. The
+        parameters following use_variables are keyword-only.
+
+        Args:
+            protocol (str): The protocol to use for connecting to the GitHub server (usually https).
+            host (str): The host address of the GitHub server.
+            is_enterprise (bool): Indicates whether the client is connecting to a GitHub Enterprise instance.
+            authenticator (Optional[Authenticator]): The authenticator instance for handling authentication.
+            session (Optional[requests.Session]): A session to send requests through, see Client.
+            pool_connections (int): The number of connection pools cached by the client's own session.
+            pool_maxsize (Optional[int]): The maximum number of keep-alive connections per pool, defaults to max_concurrency
+                                          so that every query in flight can keep its connection.
+            rate_limit_mode (str): How the cost of queries is accounted for, see Client.
+            dry_run_threshold (int): In "inline" mode, the remaining points below which queries are dry-run first.
+            use_variables (bool): Sends Query objects with a separate variables payload, see Client.
+            cache (Optional[ResponseCache]): A cache of responses, see Client.
+            page_size (Optional[PageSizeController]): Adapts the page size of paginations, see Client.
+            max_concurrency (int): The maximum number of queries in flight at once.
+        """
+        super().__init__(protocol=protocol, host=host, is_enterprise=is_enterprise, authenticator=authenticator,
+                         session=session, pool_connections=pool_connections,
+                         pool_maxsize=max_concurrency if pool_maxsize is None else pool_maxsize,
+                         rate_limit_mode=rate_limit_mode, dry_run_threshold=dry_run_threshold, use_variables=use_variables,
+                         cache=cache, page_size=page_size)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def close(self) -> None:
+        """
+        Stops the worker threads and releases the pooled connections held by the client.
+        """
+        self._executor.shutdown(wait=True)
+        super().close()
+
+    async def __aenter__(self) -> 'AsyncClient':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        # waiting for the worker threads to finish would block the event loop, so close on a separate thread
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def _execute(self, query: Union[str, Query], substitutions: Dict[str, Any],
+                       state: Optional[PaginationState] = None) -> Dict[str, Any]:
+        """
+        Executes a query on a worker thread once a concurrency slot is free.
+
+        Args:
+            query (Union[str, Query]): The GraphQL query to execute.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            state (Optional[PaginationState]): For a PaginatedQuery, the pagination whose page to fetch.
+
+        Returns:
+            Dict[str, Any]: The parsed JSON response from the server.
+
+        Raises:
+            QueryFailedException: If the query execution fails or returns errors.
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, Client._execute, self, query, substitutions, state)
+
+    async def _execute_page(self, query: PaginatedQuery, substitutions: Dict[str, Any],
+                            state: Optional[PaginationState] = None) -> Dict[str, Any]:
+        """
+        Fetches the next page of a pagination on a worker thread, see Client._execute_page.
+
+        Args:
+            query (PaginatedQuery): The paginated GraphQL query to execute.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            state (Optional[PaginationState]): The pagination whose page to fetch, the query's paginator if omitted.
+
+        Returns:
+            Dict[str, Any]: The parsed JSON response from the server.
+        """
+        if self._page_size is None or "pg_size" not in substitutions:
+            return await self._execute(query, substitutions, state)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, Client._execute_adaptive, self, query, substitutions, state)
+
+    def execute(self, query: Union[str, Query, PaginatedQuery], substitutions: Dict[str, Any],
+                stop_predicate: Optional[Callable[[Dict[str, Any]], bool]] = None, prefetch: int = 0,
+                state: Optional[PaginationState] = None) -> Union[Awaitable[Dict[str, Any]], AsyncGenerator[Dict[str, Any], None]]:
+        """
+        Public method to execute a non-paginated or paginated query.
+
+        Args:
+            query (Union[str, Query, PaginatedQuery]): The GraphQL query to execute.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            stop_predicate (Optional[Callable[[Dict[str, Any]], bool]]): For a PaginatedQuery, called with each page;
+                pagination stops after the first page for which it returns True.
+            prefetch (int): For a PaginatedQuery, the number of pages fetched ahead while the caller processes the current one.
+            state (Optional[PaginationState]): For a PaginatedQuery, the state of the pagination, see Client.execute.
+
+        Returns:
+            Union[Awaitable[Dict[str, Any]], AsyncGenerator[Dict[str, Any], None]]: An awaitable of the parsed JSON response,
+            or an async generator yielding each page's data for a PaginatedQuery.
+        """
+        if isinstance(query, PaginatedQuery):
+            if prefetch > 0:
+                return self._prefetching_generator(query, substitutions, stop_predicate, prefetch, state)
+            return self._execution_generator(query, substitutions, stop_predicate, state)
+
+        return self._execute(query, substitutions)
+
+    async def _prefetching_generator(self, query: PaginatedQuery, substitutions: Dict[str, Any],
+                                     stop_predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                                     prefetch: int = 1, state: Optional[PaginationState] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Iterates over paginated query results like _execution_generator, but a background task keeps fetching
+        the following pages while the caller processes the current one.
+
+        Args:
+            query (PaginatedQuery): The paginated GraphQL query to execute.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            stop_predicate (Optional[Callable[[Dict[str, Any]], bool]]): Called with each page; once it returns True
+                no further pages are fetched.
+            prefetch (int): The maximum number of fetched pages waiting to be consumed.
+            state (Optional[PaginationState]): The state of the pagination, the query's paginator if omitted.
+
+        Returns:
+            AsyncGenerator[Dict[str, Any], None]: An async generator yielding each page's data as a dictionary.
+        """
+        pages = asyncio.Queue(maxsize=prefetch)
+        paginator = query.paginator if state is None else state
+
+        async def fetch() -> None:
+            try:
+                while paginator.has_next():
+                    response = await self._execute_page(query, substitutions, state)
+                    paginator.update_paginator(*self._next_page(query, substitutions, response, stop_predicate))
+                    await pages.put((response, None))
+                await pages.put((None, None))
+            except Exception as error:
+                await pages.put((None, error))
+
+        fetcher = asyncio.ensure_future(fetch())
+        try:
+            while True:
+                response, error = await pages.get()
+                if error is not None:
+                    raise error
+                if response is None:
+                    return
+                yield response
+        finally:
+            fetcher.cancel()
+
+    async def _execution_generator(self, query: Union[Query, PaginatedQuery], substitutions: Dict[str, Any],
+                                   stop_predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                                   state: Optional[PaginationState] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Handles the iteration over paginated query results, yielding each page's data as it's fetched.
+
+        Args:
+            query (Union[Query, PaginatedQuery]): The paginated GraphQL query to execute.
+            substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+            stop_predicate (Optional[Callable[[Dict[str, Any]], bool]]): Called with each page; once it returns True
+                the page is yielded and no further pages are fetched.
+            state (Optional[PaginationState]): The state of the pagination, the query's paginator if omitted.
+
+        Returns:
+            AsyncGenerator[Dict[str, Any], None]: An async generator yielding each page's data as a dictionary.
+        """
+        paginator = query.paginator if state is None else state
+        while paginator.has_next():
+            response = await self._execute_page(query, substitutions, state)
+            paginator.update_paginator(*self._next_page(query, substitutions, response, stop_predicate))
             yield response
 
+class RESTClient:
+    """
+    A client for interacting with the GitHub REST API.
+    Handles the construction and execution of RESTful requests with provided authentication.
+    """
+    def __init__(self, protocol: str = "https", host: str = "api.github.com", is_enterprise: bool = False, authenticator: Authenticator = None,
+                 session: Optional[requests.Session] = None, pool_connections: int = 10, pool_maxsize: int = 10) -> None:
+        """
+        Initialization with protocol, host, and whether the GitHub instance is Enterprise
+        Requires an Authenticator to be provided for handling authentication
+        Args:
+            protocol: Protocol for the server
+            host: Host for the server
+            is_enterprise: Is the host running on Enterprise Version?
+            authenticator: Authenticator for the client
+            session: Session to send requests through, the client builds and owns a pooled one when omitted
+            pool_connections: Number of connection pools cached by the client's own session
+            pool_maxsize: Maximum number of keep-alive connections per pool of the client's own session
+        """
+        self._protocol = protocol
+        self._host = host
+        self._is_enterprise = is_enterprise
+
+        if authenticator is None:
+            raise InvalidAuthenticationError("Authentication needs to be specified")
+
+        self._authenticator = authenticator
+
+        self._owns_session = session is None
+        self._session = session if session is not None else build_session(pool_connections, pool_maxsize)
+
+    def close(self) -> None:
+        """
+        Releases the pooled connections held by the client, injected sessions are left open for their owner
+        """
+        if self._owns_session:
+            self._session.close()
+
+    def __enter__(self) -> 'RESTClient':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _base_path(self) -> str:
+        """
+        Constructs the base path for REST API requests, differing based on whether it's an enterprise instance
+        Returns:
+            Base path for requests
+        """
+        return (
+            f"{self._protocol}://{self._host}/api/v3/"
+            if self._is_enterprise else
+            f"{self._protocol}://{self._host}/"
+        )
+
+    def _generate_headers(self, **kwargs):
+        """
+        Generates headers for the request including authorization and any additional provided headers
+        Args:
+            **kwargs: Headers
+
+        Returns:
+            Headers required for requests
+        """
+        headers = {}
+
+        headers.update(self._authenticator.get_authorization_header())
+        headers.update(kwargs)
+
+        return headers
+
+    def get(self, path: str, **kwargs):
+        """
+        Makes a GET request to the specified path, handling rate limits and retrying as needed
+        Args:
+            path: API path to hit
+            **kwargs: Arguments for the GET request
+
+        Returns:
+            Response as a JSON
+        """
+        path = path[1:] if path.startswith("/") else path
+        kwargs.setdefault("headers", {})
+
+        kwargs["headers"] = self._generate_headers(**kwargs["headers"])
+
+        response = None
+        json_response = None
+
+        i = -1
+
+        while json_response is None and i < 10:
+            i += 1
+
+            try:
+                response = self._session.get(
+                    f"{self._base_path()}{path}", **kwargs
+                )
+
+                if int(response.headers["X-RateLimit-Remaining"]) < 2:
+                    reset_at = datetime.fromtimestamp(int(response.headers["X-RateLimit-Reset"]))
+                    current_time = datetime.utcnow()
+
+                    seconds = (reset_at - current_time).total_seconds()
+                    print(f"waiting for {seconds}s.")
+                    time.sleep(seconds + 5)
+
+                    json_response = None
+                    continue
+
+                if response.status_code == 202:
+                    json_response = None
+                    time.sleep(randint(0, i))
+
+                    continue
+
+                json_response = response.json()
+
+            except RequestException:
+                raise QueryFailedException(response=response)
 
+        return json_response
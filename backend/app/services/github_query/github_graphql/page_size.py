@@ -0,0 +1,97 @@
+import math
+import threading
+from typing import Dict, Optional
+
+# the largest page GitHub serves for a connection
+MAX_PAGE_SIZE = 100
+
+
+class PageSizeController:
+    """
+    PageSizeController adapts the page size of paginated queries, substituted as $pg_size, to what each query class
+    can afford. Pages that time out or fail with a gateway error are retried at half the size, and pages that come back
+    slowly shrink the following ones. Pages that come back quickly and cost the minimum charge of one rate limit point
+    grow the following ones, since more nodes per page then come for free. Heavy nodes, such as repositories with their
+    languages, thus settle on small pages while tiny nodes, such as comment timestamps, stay at the largest size.
+
+    The sizes are kept per query class and shared by every pagination of the client, including concurrent ones.
+    """
+
+    def __init__(self, minimum: int = 5, maximum: int = MAX_PAGE_SIZE, target_latency: float = 5.0,
+                 backoff: float = 0.5, growth: float = 1.5) -> None:
+        """
+        Initializes a controller without any observed query.
+
+        Args:
+            minimum (int): The smallest page size; a page failing at this size is not retried.
+            maximum (int): The largest page size.
+            target_latency (float): The response time in seconds above which pages shrink.
+            backoff (float): The factor pages shrink by after a slow or failed page.
+            growth (float): The factor pages grow by after a fast page costing a single point.
+        """
+        if not 1 <= minimum <= maximum <= MAX_PAGE_SIZE:
+            raise ValueError(f"Page sizes must satisfy 1 <= minimum <= maximum <= {MAX_PAGE_SIZE}")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.growth = growth
+        self._lock = threading.Lock()
+        self._sizes: Dict[str, int] = {}
+
+    def _clamp(self, size: int) -> int:
+        return max(self.minimum, min(self.maximum, size))
+
+    def size(self, key: str, initial: int = MAX_PAGE_SIZE) -> int:
+        """
+        Returns the page size to request next for a query class.
+
+        Args:
+            key (str): The query class name.
+            initial (int): The page size of a query class not observed yet, such as the $pg_size given by the caller.
+
+        Returns:
+            int: The page size.
+        """
+        with self._lock:
+            return self._sizes.setdefault(key, self._clamp(initial))
+
+    def observe(self, key: str, size: int, latency: float, cost: Optional[int] = None) -> int:
+        """
+        Adjusts the page size of a query class after a page was fetched.
+
+        Args:
+            key (str): The query class name.
+            size (int): The page size the page was fetched with.
+            latency (float): The response time of the page in seconds.
+            cost (Optional[int]): The rate limit cost of the page, None if unknown, e.g. for a cached response.
+
+        Returns:
+            int: The page size to request next.
+        """
+        with self._lock:
+            current = self._sizes.setdefault(key, self._clamp(size))
+            if latency > self.target_latency:
+                current = min(current, self._clamp(int(size * self.backoff)))
+            elif cost is not None and cost <= 1 and size >= current:
+                # a page observed at a smaller size than the current one, e.g. by a concurrent pagination, is stale
+                current = self._clamp(math.ceil(size * self.growth))
+            self._sizes[key] = current
+            return current
+
+    def back_off(self, key: str, size: int) -> bool:
+        """
+        Shrinks the page size of a query class after a page failed.
+
+        Args:
+            key (str): The query class name.
+            size (int): The page size the failed page was requested with.
+
+        Returns:
+            bool: True if the page should be retried at the smaller size, False if it already was at the minimum.
+        """
+        if size <= self.minimum:
+            return False
+        with self._lock:
+            self._sizes[key] = min(self._sizes.get(key, size), self._clamp(int(size * self.backoff)))
+        return True
@@ -1,7 +1,9 @@
+import re
+import threading
 from string import Template
 from typing import Union, List, Dict, Tuple, Any, Optional
-from datetime import datetime
 from collections import deque
+from backend.app.services.github_query.utils.timestamps import is_time_format
 
 class InvalidQueryException(Exception):
     """
@@ -40,7 +42,7 @@ class QueryNode:
     allowing for the representation of complex queries.
     """
 
-    def __init__(self, name: str = "query", fields: List[Union[str, 'QueryNode']] = [], args: Dict = None) -> None:
+    def __init__(self, name: str = "query", fields: Optional[List[Union[str, 'QueryNode']]] = None, args: Dict = None) -> None:
         """
         Initializes a QueryNode with a name, a list of fields, and optional arguments.
 
@@ -52,7 +54,7 @@ class QueryNode:
                          and provide variables for the fields requested.
         """
         self.name = name
-        self.fields = fields
+        self.fields = fields if fields is not None else []
         self.args = args
 
     def _format_args(self) -> str:
@@ -127,8 +129,119 @@ class Query(QueryNode):
     """
     Query is a subclass of QueryNode specifically designed to represent a complete, executable GraphQL query. 
     It provides additional functionality for formatting and substituting values in preparation for execution.
+    The query tree is rendered into a template only once, on the first substitution, so the tree must not be
+    changed afterwards.
     """
 
+    # GraphQL types of the placeholders whose type cannot be inferred from their value, see with_variables
+    variable_types: Dict[str, str] = {}
+
+    def __init__(self, name: str = "query", fields: Optional[List[Union[str, 'QueryNode']]] = None, args: Dict = None) -> None:
+        """
+        Initializes a Query with a name, a list of fields, and optional arguments.
+
+        Args:
+            name (str): The name of the Query, typically representing the operation in the GraphQL query.
+            fields (List[Union[str, 'QueryNode']]): A list of fields or nested QueryNodes to include in the Query.
+            args (Dict): A dictionary of arguments to include with the Query.
+        """
+        super().__init__(name=name, fields=fields, args=args)
+        self._templates = {}
+        # guards the rendering of templates, which may briefly rewrite the cursor argument of a paginator
+        self._compile_lock = threading.Lock()
+
+    def compile(self) -> Template:
+        """
+        Returns the template of the query, rendering the query tree only the first time it is needed.
+
+        Returns:
+            Template: The query string with its placeholders.
+        """
+        template = self._templates.get(None)
+        if template is None:
+            with self._compile_lock:
+                template = self._templates[None] = Template(self.__str__())
+        return template
+
+    def compile_variables(self) -> Tuple[str, List[str]]:
+        """
+        Returns the query with its placeholders left in place as GraphQL variables, along with the variable names
+        in order of appearance. Placeholders quoted by _format_args, such as login: "$user", are unquoted.
+
+        Returns:
+            Tuple[str, List[str]]: The query string without variable declarations, and the names of its variables.
+        """
+        compiled = self._templates.get("variables")
+        if compiled is None:
+            template = self.compile().template
+            with self._compile_lock:
+                compiled = self._templates["variables"] = Query._variables_document(template)
+        return compiled
+
+    @staticmethod
+    def _variables_document(template: str) -> Tuple[str, List[str]]:
+        """
+        Unquotes the placeholders of a query template and collects their names.
+        """
+        document = re.sub(r'"\$(\w+)"', r'$\1', template)
+        names = []
+        for match in Template.pattern.finditer(document):
+            name = match.group("named") or match.group("braced")
+            if name and name not in names:
+                names.append(name)
+        return document, names
+
+    def variable_type(self, name: str, value: Any) -> Optional[str]:
+        """
+        Returns the GraphQL type of a variable, from variable_types or else inferred from its value.
+
+        Args:
+            name (str): The name of the variable.
+            value (Any): The value of the variable.
+
+        Returns:
+            Optional[str]: The GraphQL type, or None if it cannot be inferred.
+        """
+        if name in self.variable_types:
+            return self.variable_types[name]
+        if isinstance(value, bool):
+            return "Boolean!"
+        if isinstance(value, int):
+            return "Int!"
+        if isinstance(value, str):
+            return "DateTime!" if Query.test_time_format(value) else "String!"
+        return None
+
+    def with_variables(self, **kwargs: Any) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the query as a GraphQL document with typed variable declarations, query($user: String!, ...) { ... },
+        and the values of its variables. The document is the same for every call with values of the same types,
+        so only the variables payload changes between users and pages.
+
+        Args:
+            **kwargs: A mapping of placeholders to their actual values.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The document and the variables to send with it.
+
+        Raises:
+            InvalidQueryException: If a variable has no value or its type can neither be looked up nor inferred.
+        """
+        document, names = self.compile_variables()
+        declarations = []
+        variables = {}
+        for name in names:
+            if name not in kwargs:
+                raise InvalidQueryException(f"Missing value for variable ${name}")
+            variable_type = self.variable_type(name, kwargs[name])
+            if variable_type is None:
+                raise InvalidQueryException(f"Cannot infer the type of variable ${name}, declare it in variable_types")
+            declarations.append(f"${name}: {variable_type}")
+            variables[name] = kwargs[name]
+        if declarations:
+            document = f"{self.name}({', '.join(declarations)})" + document[len(self.name):]
+        return document, variables
+
     @staticmethod
     def test_time_format(time_string: str) -> bool:
         """
@@ -140,11 +253,7 @@ class Query(QueryNode):
         Returns:
             bool: True if the string matches the time format, False otherwise.
         """
-        try:
-            datetime.strptime(time_string, "%Y-%m-%dT%H:%M:%SZ")
-            return True
-        except ValueError:
-            return False
+        return is_time_format(time_string)
 
     @staticmethod
     def convert_dict(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -189,7 +298,7 @@ class Query(QueryNode):
             str: The query string with placeholders substituted with actual values.
         """
         converted_args = Query.convert_dict(kwargs)
-        return Template(self.__str__()).substitute(**converted_args)
+        return self.compile().substitute(**converted_args)
 
 
 class QueryNodePaginator(QueryNode):
@@ -198,7 +307,8 @@ class QueryNodePaginator(QueryNode):
     It includes functionality to manage and track the state of pagination through GraphQL queries.
     """
 
-    def __init__(self, name: str = "query", fields: List[Union[str, 'QueryNode']] = [], args: Dict[str, str] = {}) -> None:
+    def __init__(self, name: str = "query", fields: Optional[List[Union[str, 'QueryNode']]] = None,
+                 args: Optional[Dict[str, str]] = None) -> None:
         """
         Initializes a QueryNodePaginator with name, fields, and arguments, setting up the initial state for pagination.
 
@@ -206,8 +316,9 @@ class QueryNodePaginator(QueryNode):
             name (str): Name of the QueryNodePaginator, typically representing a field in the GraphQL query.
             fields (List[Union[str, 'QueryNode']]): A list of fields or nested QueryNodes that the paginator will handle.
             args (Dict): A dictionary of arguments relevant to pagination, such as 'first', 'after', etc.
+                         The paginator keeps a copy, as update_paginator writes the cursor into it.
         """
-        super().__init__(name=name, fields=fields, args=args)
+        super().__init__(name=name, fields=fields, args=dict(args) if args is not None else {})
         self.has_next_page = True
 
     def update_paginator(self, has_next_page: bool, end_cursor: Optional[str] = None) -> None:
@@ -253,6 +364,46 @@ class QueryNodePaginator(QueryNode):
         return isinstance(other, QueryNodePaginator) and super().__eq__(other)
 
 
+class PaginationState:
+    """
+    PaginationState holds the cursor of one pagination of a PaginatedQuery, apart from the query tree. A query paginated
+    through its own QueryNodePaginator can run only one pagination at a time, while a query driven by PaginationState
+    objects is never modified, so one instance can serve many paginations, from several threads at once.
+    It offers the has_next and update_paginator methods of QueryNodePaginator.
+    """
+
+    def __init__(self, end_cursor: Optional[str] = None, has_next_page: bool = True) -> None:
+        """
+        Initializes the state of a pagination, at its first page unless a cursor is given.
+
+        Args:
+            end_cursor (Optional[str]): The end cursor of the last page fetched, to resume a pagination after it.
+            has_next_page (bool): Whether there is a page left to fetch.
+        """
+        self.end_cursor = end_cursor
+        self.has_next_page = has_next_page
+
+    def update_paginator(self, has_next_page: bool, end_cursor: Optional[str] = None) -> None:
+        """
+        Records a fetched page.
+
+        Args:
+            has_next_page (bool): Indicates whether there is a next page available.
+            end_cursor (str, optional): The cursor that should be used to fetch the next page.
+        """
+        self.has_next_page = has_next_page
+        self.end_cursor = end_cursor
+
+    def has_next(self) -> bool:
+        """
+        Checks whether there is a next page available.
+
+        Returns:
+            bool: True if there is another page to be fetched, False otherwise.
+        """
+        return self.has_next_page
+
+
 class PaginatedQuery(Query):
     """
     PaginatedQuery is a subclass of Query specifically designed to handle paginated GraphQL queries.
@@ -273,6 +424,136 @@ class PaginatedQuery(Query):
         super().__init__(name=name, fields=fields, args=args)
         self.path, self.paginator = PaginatedQuery.extract_path_to_pageinfo_node(self)
 
+    def compile(self, has_cursor: Optional[bool] = None) -> Template:
+        """
+        Returns the template of the query for a page. The cursor is a $_cursor slot of the template,
+        so the query tree is rendered once for the first page and once for all following pages.
+
+        Args:
+            has_cursor (Optional[bool]): Whether the page follows a cursor, by default whether the paginator holds one.
+
+        Returns:
+            Template: The query string with its placeholders.
+        """
+        if has_cursor is None:
+            has_cursor = self.paginator is not None and "after" in self.paginator.args
+        template = self._templates.get(has_cursor)
+        if template is None:
+            with self._compile_lock:
+                template = self._templates[has_cursor] = Template(self._render_tree(has_cursor, "$_cursor"))
+        return template
+
+    def _render_tree(self, has_cursor: bool, cursor_slot: str) -> str:
+        """
+        Renders the query tree with the cursor argument of the paginator set to a slot, or left out,
+        and restores the paginator afterwards.
+        """
+        if self.paginator is None:
+            return self.__str__()
+        had_cursor = "after" in self.paginator.args
+        cursor = self.paginator.args.get("after")
+        if has_cursor:
+            self.paginator.args["after"] = cursor_slot
+        else:
+            self.paginator.args.pop("after", None)
+        try:
+            return self.__str__()
+        finally:
+            if had_cursor:
+                self.paginator.args["after"] = cursor
+            else:
+                self.paginator.args.pop("after", None)
+
+    def substitute(self, **kwargs: Any) -> str:
+        """
+        Substitutes placeholders in the query with actual values provided in kwargs, and the cursor of the
+        paginator into its slot.
+
+        Args:
+            **kwargs: A mapping of placeholders to their actual values.
+
+        Returns:
+            str: The query string with placeholders substituted with actual values.
+        """
+        converted_args = Query.convert_dict(kwargs)
+        if self.paginator is not None and "after" in self.paginator.args:
+            converted_args["_cursor"] = self.paginator.args["after"]
+        return self.compile().substitute(**converted_args)
+
+    def substitute_page(self, state: PaginationState, **kwargs: Any) -> str:
+        """
+        Substitutes placeholders in the query for the page of a pagination state, leaving the paginator untouched.
+
+        Args:
+            state (PaginationState): The state of the pagination.
+            **kwargs: A mapping of placeholders to their actual values.
+
+        Returns:
+            str: The query string with placeholders substituted with actual values.
+        """
+        converted_args = Query.convert_dict(kwargs)
+        if state.end_cursor is None:
+            return self.compile(False).substitute(**converted_args)
+        return self.compile(True).substitute(**converted_args, _cursor='"' + state.end_cursor + '"')
+
+    def compile_variables(self) -> Tuple[str, List[str]]:
+        """
+        Returns the query with its placeholders left in place as GraphQL variables, the cursor of the paginator
+        included as $after, so that every page shares the same document.
+
+        Returns:
+            Tuple[str, List[str]]: The query string without variable declarations, and the names of its variables.
+        """
+        compiled = self._templates.get("variables")
+        if compiled is None:
+            with self._compile_lock:
+                compiled = self._templates["variables"] = Query._variables_document(self._render_tree(True, "$after"))
+        return compiled
+
+    def variable_type(self, name: str, value: Any) -> Optional[str]:
+        """
+        Returns the GraphQL type of a variable, the cursor being a nullable String.
+
+        Args:
+            name (str): The name of the variable.
+            value (Any): The value of the variable.
+
+        Returns:
+            Optional[str]: The GraphQL type, or None if it cannot be inferred.
+        """
+        if name == "after":
+            return "String"
+        return super().variable_type(name, value)
+
+    def with_variables(self, **kwargs: Any) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the query as a GraphQL document with typed variable declarations and the values of its variables,
+        the cursor of the paginator included. The first page sends a null cursor.
+
+        Args:
+            **kwargs: A mapping of placeholders to their actual values.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The document and the variables to send with it.
+        """
+        # the paginator keeps the cursor quoted for inlining into the query text
+        cursor = self.paginator.args.get("after", '""')[1:-1]
+        return super().with_variables(**kwargs, after=cursor or None)
+
+    def with_variables_page(self, state: PaginationState, **kwargs: Any) -> Tuple[str, Dict[str, Any]]:
+        """
+        Builds the query as a GraphQL document with typed variable declarations and the values of its variables,
+        for the page of a pagination state, leaving the paginator untouched.
+
+        Args:
+            state (PaginationState): The state of the pagination.
+            **kwargs: A mapping of placeholders to their actual values.
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: The document and the variables to send with it.
+        """
+        return super().with_variables(**kwargs, after=state.end_cursor or None)
+
     @staticmethod
     def extract_path_to_pageinfo_node(paginated_query: 'PaginatedQuery') -> Tuple[List[str], Optional['QueryNodePaginator']]:
         """
@@ -302,3 +583,176 @@ class PaginatedQuery(Query):
                     else:
                         paths.append((current_path + [field.name], field, field.fields))
         raise InvalidQueryException("Paginator node not found")
+
+
+# the largest page of a connection, assumed for page sizes that cannot be resolved
+MAX_CONNECTION_SIZE = 100
+
+
+def connection_size(node: QueryNode, values: Optional[Dict[str, Any]] = None) -> Optional[int]:
+    """
+    Returns the page size a connection node requests through its first or last argument, given in its arguments or
+    inline in its name. Placeholders and GraphQL variables are resolved from values; a page size that cannot be
+    resolved is assumed to be the largest one.
+
+    Args:
+        node (QueryNode): The field to inspect.
+        values (Optional[Dict[str, Any]]): Substitutions or variables, keyed by name without the leading $.
+
+    Returns:
+        Optional[int]: The page size, or None if the field is not a connection.
+    """
+    args = dict(node.args or {})
+    inline = re.search(r'\((?P<args>.*)\)', node.name)
+    if inline:
+        args.update(re.findall(r'(\w+)\s*:\s*([^,\s)]+)', inline.group('args')))
+    for key in ("first", "last"):
+        if key in args:
+            value = args[key]
+            if isinstance(value, str):
+                value = value.strip('"')
+                if value.startswith("$"):
+                    value = (values or {}).get(value[1:], MAX_CONNECTION_SIZE)
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return MAX_CONNECTION_SIZE
+    return None
+
+
+def connection_counts(node: QueryNode, values: Optional[Dict[str, Any]] = None, multiplier: int = 1) -> Tuple[int, int]:
+    """
+    Counts, assuming every connection returns its full page, the requests GitHub needs to fulfil a query, one for
+    every connection times the number of parent nodes it is requested for, and the nodes the query can return.
+
+    Args:
+        node (QueryNode): The query or field to count.
+        values (Optional[Dict[str, Any]]): Substitutions or variables resolving page sizes given as placeholders.
+        multiplier (int): The number of times the node itself is returned.
+
+    Returns:
+        Tuple[int, int]: The number of requests and the maximum number of nodes.
+    """
+    requests, nodes = 0, 0
+    for field in node.get_connected_nodes():
+        size = connection_size(field, values)
+        if size is None:
+            field_requests, field_nodes = connection_counts(field, values, multiplier)
+        else:
+            field_requests, field_nodes = connection_counts(field, values, multiplier * size)
+            field_requests += multiplier
+            field_nodes += multiplier * size
+        requests += field_requests
+        nodes += field_nodes
+    return requests, nodes
+
+
+def request_count(node: QueryNode, values: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Counts the requests GitHub needs to fulfil a query, see connection_counts.
+    """
+    return connection_counts(node, values)[0]
+
+
+def node_count(node: QueryNode, values: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Counts the nodes a query can return at most, multiplying the page sizes of nested connections.
+    """
+    return connection_counts(node, values)[1]
+
+
+class BatchedQuery(Query):
+    """
+    BatchedQuery merges the same query for many substitutions into a single request. Every root field of the
+    query is repeated once per substitution under an alias (u0: user(login: "a") { ... } u1: user(login: "b") { ... }),
+    and the response is split back into one result per substitution, shaped like the response of the original query.
+    """
+
+    # GitHub rejects calls that could return more than this many nodes
+    NODE_LIMIT = 500000
+
+    def __init__(self, query: Query, substitutions: List[Dict[str, Any]], alias_prefix: str = "u") -> None:
+        """
+        Initializes a BatchedQuery from a query and the substitutions of each entry in the batch.
+
+        Args:
+            query (Query): The query to repeat, typically one fetching a single user(login: $user).
+            substitutions (List[Dict[str, Any]]): The substitutions of each entry, in order.
+            alias_prefix (str): The prefix of the aliases given to the repeated root fields.
+
+        Raises:
+            InvalidQueryException: If the query is paginated, pagination cannot be shared between entries.
+        """
+        if isinstance(query, PaginatedQuery):
+            raise InvalidQueryException("Paginated queries cannot be batched")
+        self.query = query
+        self.substitutions = substitutions
+        self.alias_prefix = alias_prefix
+        self.roots = [field for field in query.fields if isinstance(field, QueryNode)]
+        fields = []
+        for index, entry in enumerate(substitutions):
+            converted_args = Query.convert_dict(entry)
+            for position, root in enumerate(self.roots):
+                rendered = Template(str(root)).substitute(**converted_args)
+                fields.append(f"{self._alias(index, position)}: {rendered}")
+        super().__init__(name=query.name, fields=fields, args=query.args)
+
+    def _alias(self, index: int, position: int) -> str:
+        """
+        Returns the alias of a root field of an entry, suffixed by its position only if the query has several roots.
+        """
+        if len(self.roots) == 1:
+            return f"{self.alias_prefix}{index}"
+        return f"{self.alias_prefix}{index}_{position}"
+
+    def substitute(self, **kwargs: Any) -> str:
+        """
+        Returns the query string. The substitutions of every entry are applied when the batch is built,
+        so no further substitution takes place.
+
+        Args:
+            **kwargs: Ignored.
+
+        Returns:
+            str: The query string.
+        """
+        return self.compile().template
+
+    def split_response(self, response: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Splits the response of the batch into one result per substitution. An entry the server could not resolve,
+        such as a login that does not exist, gets None for its root field. For such batches the client raises
+        QueryFailedException, whose response still carries the data of the resolved entries.
+
+        Args:
+            response (Optional[Dict[str, Any]]): The data returned for the batch.
+
+        Returns:
+            List[Dict[str, Any]]: The result of each entry, in the order of the substitutions, keyed by root field name.
+        """
+        response = response or {}
+        return [
+            {root.name: response.get(self._alias(index, position)) for position, root in enumerate(self.roots)}
+            for index in range(len(self.substitutions))
+        ]
+
+    @classmethod
+    def batches(cls, query: Query, substitutions: List[Dict[str, Any]], max_batch_size: int = 100,
+                node_limit: int = NODE_LIMIT) -> List['BatchedQuery']:
+        """
+        Splits the substitutions into batches no larger than max_batch_size, and small enough to stay under the node limit.
+
+        Args:
+            query (Query): The query to repeat in every batch.
+            substitutions (List[Dict[str, Any]]): The substitutions of all entries, in order.
+            max_batch_size (int): The maximum number of entries in a batch.
+            node_limit (int): The maximum number of nodes a batch may request.
+
+        Returns:
+            List[BatchedQuery]: The batches, covering the substitutions in order.
+        """
+        if not substitutions:
+            return []
+        nodes_per_entry = max(1, node_count(query, substitutions[0]))
+        size = max(1, min(max_batch_size, node_limit // nodes_per_entry))
+        return [cls(query, substitutions[i:i + size]) for i in range(0, len(substitutions), size)]
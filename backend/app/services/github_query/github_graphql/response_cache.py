@@ -0,0 +1,185 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Union
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# how long a cached response stays fresh: seconds, None for never, or a callable of the substitutions returning either
+Ttl = Union[None, float, Callable[[Dict[str, Any]], Optional[float]]]
+
+
+class ResponseCacheMiss(Exception):
+    """
+    Exception raised in offline mode when a query has no cached response to replay.
+    """
+    def __init__(self, query_name: str) -> None:
+        self.query_name = query_name
+        super().__init__(f"No cached response for {query_name} in offline mode")
+
+
+def contributions_ttl(substitutions: Dict[str, Any]) -> Optional[float]:
+    """
+    Keeps contributionsCollection windows that ended in the past for good, as they can no longer change,
+    and windows reaching into the present for an hour.
+
+    Args:
+        substitutions (Dict[str, Any]): The substitutions of the query, with the window ends as "end", "end0", ...
+
+    Returns:
+        Optional[float]: None if every window has ended, otherwise one hour.
+    """
+    now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    ends = [value for key, value in substitutions.items() if re.fullmatch(r"end\d*", key)]
+    return None if ends and all(end < now for end in ends) else HOUR
+
+
+# the TTLs of the query classes whose responses age differently from the default
+DEFAULT_TTLS: Dict[str, Ttl] = {
+    "UserProfileStats": HOUR,
+    "UserContributionsCollection": contributions_ttl,
+    "UserContributionsCollectionWindows": contributions_ttl,
+}
+
+
+class ResponseCache:
+    """
+    ResponseCache stores the responses of GraphQL queries on local disk, content-addressed by a hash of the rendered
+    query and its variables, so that re-running an analysis does not download the same pages again. Pages of a
+    paginated query render their cursor into the query, so every page is cached on its own.
+
+    Each query class has its own time to live. Once the total size of the cache exceeds its bound, the least recently
+    used responses are evicted. In offline mode the cache is read-only and a query without a cached response raises
+    ResponseCacheMiss instead of reaching the server, whatever the age of the response.
+    """
+
+    def __init__(self, directory: str, ttls: Optional[Dict[str, Ttl]] = None, default_ttl: Ttl = DAY,
+                 max_bytes: Optional[int] = None, offline: bool = False) -> None:
+        """
+        Opens a cache directory, creating it if needed.
+
+        Args:
+            directory (str): The directory holding the cached responses.
+            ttls (Optional[Dict[str, Ttl]]): TTLs by query class name, overriding DEFAULT_TTLS.
+            default_ttl (Ttl): The TTL of the other query classes.
+            max_bytes (Optional[int]): The size above which the least recently used responses are evicted, unbounded if None.
+            offline (bool): Replays cached responses only, never storing or evicting any.
+        """
+        self._directory = directory
+        self._ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._default_ttl = default_ttl
+        self._max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        # the size of every cached response, from the least to the most recently used
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(directory, name))
+                entries.append((stat.st_mtime, name[:-len(".json")], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+        self._size = sum(self._entries.values())
+
+    @staticmethod
+    def key(query_string: str, variables: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Computes the cache key of a rendered query.
+
+        Args:
+            query_string (str): The query as sent to the server.
+            variables (Optional[Dict[str, Any]]): The variables sent along with the query.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest of the query and its variables.
+        """
+        payload = json.dumps({"query": query_string, "variables": variables}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key + ".json")
+
+    def ttl(self, query_name: str, substitutions: Dict[str, Any]) -> Optional[float]:
+        """
+        Returns how long the response of a query stays fresh.
+
+        Args:
+            query_name (str): The class name of the query.
+            substitutions (Dict[str, Any]): The substitutions of the query.
+
+        Returns:
+            Optional[float]: The TTL in seconds, None if the response never expires.
+        """
+        ttl = self._ttls.get(query_name, self._default_ttl)
+        return ttl(substitutions) if callable(ttl) else ttl
+
+    def get(self, key: str, query_name: str, substitutions: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a fresh cached response.
+
+        Args:
+            key (str): The cache key of the rendered query.
+            query_name (str): The class name of the query.
+            substitutions (Dict[str, Any]): The substitutions of the query, for TTLs depending on them.
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached data, or None if there is no fresh response.
+
+        Raises:
+            ResponseCacheMiss: In offline mode, if there is no cached response.
+        """
+        try:
+            with open(self._path(key), encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            if self.offline:
+                raise ResponseCacheMiss(query_name)
+            return None
+        if not self.offline:
+            ttl = self.ttl(query_name, substitutions)
+            if ttl is not None and time.time() - entry["stored_at"] > ttl:
+                return None
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+            # the modification time orders the responses by use when the cache is reopened
+            os.utime(self._path(key))
+        return entry["data"]
+
+    def put(self, key: str, query_name: str, substitutions: Dict[str, Any], data: Dict[str, Any]) -> None:
+        """
+        Stores a response, evicting the least recently used ones beyond the size bound. Nothing is stored in
+        offline mode, or for a query whose TTL is 0.
+
+        Args:
+            key (str): The cache key of the rendered query.
+            query_name (str): The class name of the query.
+            substitutions (Dict[str, Any]): The substitutions of the query.
+            data (Dict[str, Any]): The data of the response.
+        """
+        if self.offline or self.ttl(query_name, substitutions) == 0:
+            return
+        content = json.dumps({"stored_at": time.time(), "data": data}).encode("utf-8")
+        temporary = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(content)
+        # readers see either the previous response or the whole new one
+        os.replace(temporary, self._path(key))
+        with self._lock:
+            self._size += len(content) - self._entries.pop(key, 0)
+            self._entries[key] = len(content)
+            while self._max_bytes is not None and self._size > self._max_bytes and len(self._entries) > 1:
+                evicted, size = self._entries.popitem(last=False)
+                self._size -= size
+                try:
+                    os.remove(self._path(evicted))
+                except OSError:
+                    pass
@@ -1,65 +1,155 @@
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import pandas as pd
-import json
-import github_query.util.helper as helper
-from github_query.github_graphql.client import Client, QueryFailedException
-from github_query.queries.profile.user_login import UserLogin
-from github_query.queries.repositories.repository_contributors import RepositoryContributors
-from github_query.queries.repositories.repository_contributors_contribution import \
+import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.github_graphql.client import Client, QueryFailedException
+from backend.app.services.github_query.github_graphql.query import BatchedQuery, PaginationState
+from backend.app.services.github_query.utils.result_collector import ResultCollector
+from backend.app.services.github_query.queries.profiles.user_login import UserLogin
+from backend.app.services.github_query.queries.repositories.repository_commits import RepositoryCommits, RepositoryCreatedAt
+from backend.app.services.github_query.queries.repositories.repository_contributors import RepositoryContributors
+from backend.app.services.github_query.queries.repositories.repository_contributors_contribution import \
     RepositoryContributorsContribution
 
 
+# the since bound of the oldest window, history can predate the creation of the repository on GitHub
+HISTORY_START = "1970-01-01T00:00:00Z"
+# the until bound of the newest window, so that commits dated after the local clock, e.g. by a committer's skewed
+# clock, are not dropped
+HISTORY_END = "9999-12-31T23:59:59Z"
+
+
 class RepositoryContributorsContributionMiner:
     """
     Helps mining repository data.
     """
 
-    def __init__(self, client: Client):
+    def __init__(self, client: Client, user_ids: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            client: client to execute the queries with
+            user_ids: login to node id cache, shared across the repositories mined by this miner and, if given,
+                      with other miners
+        """
         self._client = client
-        self.cumulated_contribution = pd.DataFrame(columns=['repo', 'login', 'commits', 'additions', 'deletions'])
-        self.individual_contribution = pd.DataFrame(columns=['repo', 'login', 'authoredDate', 'changedFiles',
-                                                             'additions', 'deletions', 'message'])
+        self._user_ids = user_ids if user_ids is not None else {}
+        self._cumulated_contribution = ResultCollector(['repo', 'login', 'commits', 'additions', 'deletions'])
+        self._individual_contribution = ResultCollector(['repo', 'login', 'authoredDate', 'changedFiles',
+                                                         'additions', 'deletions', 'message'])
+
+    @property
+    def cumulated_contribution(self) -> pd.DataFrame:
+        return self._cumulated_contribution.to_frame()
+
+    @property
+    def individual_contribution(self) -> pd.DataFrame:
+        return self._individual_contribution.to_frame()
+
+    def _resolve_ids(self, logins: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        Resolves logins to node ids, fetching the logins missing from the cache in aliased batches.
+        Logins the server reports as NOT_FOUND are left out.
+        Args:
+            logins: logins to resolve
+        Raises:
+            QueryFailedException: if a batch fails for any other reason, such as a gateway error
+        """
+        logins = list(logins)
+        missing = [login for login in logins if login not in self._user_ids]
+        for batch in BatchedQuery.batches(UserLogin(), [{"user": login} for login in missing]):
+            try:
+                response = self._client.execute(query=batch, substitutions={})
+            except QueryFailedException as e:
+                # a login that cannot be resolved fails the batch, the other entries still carry their data
+                response = helper.not_found_data(e)
+                if response is None:
+                    raise
+            for entry, result in zip(batch.substitutions, batch.split_response(response)):
+                if result['user'] is not None:
+                    self._user_ids[entry['user']] = result['user']['id']
+        return [(login, self._user_ids[login]) for login in logins if login in self._user_ids]
+
+    @staticmethod
+    def _failure_message(error: QueryFailedException) -> str:
+        """
+        Returns the first GraphQL error message of a failure, or its status code if the body carries none.
+        Args:
+            error: failure of a query
+        """
+        try:
+            return error.response.json()['errors'][0]['message']
+        except (ValueError, KeyError, IndexError, TypeError):
+            return f"Query failed with code {error.response.status_code}"
 
-    def run(self, link: str):
+    def _windowed_history(self, substitutions: Dict[str, Any], windows: int) -> Dict[str, Any]:
+        """
+        Pages the history in time windows concurrently and merges the windows into a single page. The windows split
+        the span between the creation of the repository and now, the oldest and newest windows are open-ended.
+        Args:
+            substitutions: owner, repository name and page size
+            windows: number of time windows
+        """
+        created_at = self._client.execute(query=RepositoryCreatedAt(), substitutions=substitutions)['repository']['createdAt']
+        bounds = RepositoryCommits.time_windows(created_at, datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                                                windows)
+        bounds[0] = (HISTORY_START, bounds[0][1])
+        bounds[-1] = (bounds[-1][0], HISTORY_END)
+
+        # every window runs its own pagination of the same query
+        query = RepositoryCommits(windowed=True)
+
+        def fetch(window: Tuple[str, str]) -> List[Dict[str, Any]]:
+            since, until = window
+            return list(self._client.execute(query=query, substitutions={**substitutions, "since": since, "until": until},
+                                             state=PaginationState()))
+
+        with ThreadPoolExecutor(max_workers=windows) as executor:
+            pages = [page for window_pages in executor.map(fetch, bounds) for page in window_pages]
+        return RepositoryCommits.merge_windows(pages)
+
+    def run(self, link: str, single_pass: bool = False, windows: int = 1):
         """
         Collect data for a repository using a link.
         Args:
             link: Link to the repository
+            single_pass: page the default branch history once and partition the commits by author locally,
+                         instead of paging it once to find the authors and again for every author
+            windows: in single pass mode, the number of time windows the history is split into and paged concurrently,
+                     breaking the chain of cursors of a long history into shorter ones
         """
         try:
             owner, repository = helper.get_owner_and_name(link)
-            response = self._client.execute(query=RepositoryContributors(),
-                                            substitutions={"owner": owner, "repo_name": repository})
+            substitutions = {"owner": owner, "repo_name": repository, "pg_size": 100}
+            commits = {}
+            if single_pass and windows > 1:
+                RepositoryCommits.commits_by_author(self._windowed_history(substitutions, windows), commits)
+            elif single_pass:
+                for response in self._client.execute(query=RepositoryCommits(), substitutions=substitutions):
+                    RepositoryCommits.commits_by_author(response, commits)
+            else:
+                contributors = {'name': set(), 'login': set()}
+                for response in self._client.execute(query=RepositoryContributors(), substitutions=substitutions):
+                    RepositoryContributors.extract_unique_author(response, contributors)
+                for login, user_id in self._resolve_ids(sorted(contributors['login'])):
+                    print(f"querying user: {login}")
+                    commits[login] = []
+                    for response in self._client.execute(query=RepositoryContributorsContribution(),
+                                                         substitutions={**substitutions, "id": {"id": user_id}}):
+                        RepositoryContributorsContribution.user_commit_contribution(response, commits[login])
         except QueryFailedException as e:
-            message = e.response.json()['errors'][0]['message']
+            message = self._failure_message(e)
             print(message)
-            dne = pd.DataFrame(
-                [{'repo': message, 'login': pd.NA, 'commits': pd.NA, 'additions': pd.NA, 'deletions': pd.NA}])
-            self.cumulated_contribution = pd.concat([self.cumulated_contribution, dne], ignore_index=True)
+            dne = {'repo': message, 'login': pd.NA, 'commits': pd.NA, 'additions': pd.NA, 'deletions': pd.NA}
+            self._cumulated_contribution.append(dne)
             return
 
-        contributors = RepositoryContributors.extract_unique_author(response)
-        contributors_ids = []
-        for contributor in contributors:
-            user = self._client.execute(query=UserLogin(), substitutions={"user": contributor})['user']
-            contributors_ids.append((user['login'], user['id']))
-
-        for login, user_id in contributors_ids:
-            print(f"querying user: {login}")
-            response = self._client.execute(query=RepositoryContributorsContribution(),
-                                            substitutions={"owner": owner,
-                                                           "repo_name": repository,
-                                                           "id": {"id": user_id}})
-
-            repo_login_cum = {"repo": repository, "login": login}
-            cumulated_contribution = RepositoryContributorsContribution.user_cumulated_contribution(response)
-            repo_login_cum.update(cumulated_contribution)
-            new_row_cum = pd.DataFrame([repo_login_cum])
-            self.cumulated_contribution = pd.concat([self.cumulated_contribution, new_row_cum], ignore_index=True)
-
-            individual_contribution = RepositoryContributorsContribution.user_commit_contribution(response)
-            for i, v in enumerate(individual_contribution):
+        for login in sorted(commits):
+            self._cumulated_contribution.append({"repo": repository, "login": login,
+                                                 "commits": len(commits[login]),
+                                                 "additions": sum(commit['additions'] for commit in commits[login]),
+                                                 "deletions": sum(commit['deletions'] for commit in commits[login])})
+            for commit in commits[login]:
                 repo_login_ind = {"repo": repository, "login": login}
-                repo_login_ind.update(v)
-                individual_contribution[i] = repo_login_ind
-            new_rows_ind = pd.DataFrame(individual_contribution)
-            self.individual_contribution = pd.concat([self.individual_contribution, new_rows_ind], ignore_index=True)
+                repo_login_ind.update(commit)
+                self._individual_contribution.append(repo_login_ind)
@@ -1,18 +1,41 @@
+import signal
+import multiprocessing
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 import pandas as pd
-from collections import Counter
-import github_query.util.helper as helper
-from github_query.github_graphql.client import Client, QueryFailedException
-from github_query.queries.profile.user_login import UserLogin
-from github_query.queries.contributions.user_gists import UserGists
-from github_query.queries.contributions.user_repositories import UserRepositories
-from github_query.queries.contributions.user_repository_discussions import UserRepositoryDiscussions
-from github_query.queries.time_range_contributions.user_contributions_collection import \
-    UserContributionsCollection
-from github_query.queries.comments.user_gist_comments import UserGistComments
-from github_query.queries.comments.user_issue_comments import UserIssueComments
-from github_query.queries.comments.user_commit_comments import UserCommitComments
-from github_query.queries.comments.user_repository_discussion_comments import UserRepositoryDiscussionComments
+from backend.app.services.github_query.github_graphql.client import Client, QueryFailedException
+from backend.app.services.github_query.github_graphql.authentication import PersonalAccessTokenAuthenticator
+from backend.app.services.github_query.github_graphql.query import PaginatedQuery, PaginationState
+from backend.app.services.github_query.utils.result_collector import ResultCollector
+from backend.app.services.github_query.utils.checkpoint import CheckpointStore, fold_pages
+from backend.app.services.github_query.utils.contribution_windows import ContributionWindowStore, windowed_contributions
+from backend.app.services.github_query.utils.repository_stats import repository_stats
+import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.queries.profiles.user_login import UserLogin
+from backend.app.services.github_query.queries.contributions.user_gists import UserGists
+from backend.app.services.github_query.queries.contributions.user_repository_discussions import UserRepositoryDiscussions
+from backend.app.services.github_query.queries.time_range_contributions.user_contributions_collection import \
+    UserContributionsCollectionWindows
+from backend.app.services.github_query.queries.comments.user_gist_comments import UserGistComments
+from backend.app.services.github_query.queries.comments.user_issue_comments import UserIssueComments
+from backend.app.services.github_query.queries.comments.user_commit_comments import UserCommitComments
+from backend.app.services.github_query.queries.comments.user_repository_discussion_comments import UserRepositoryDiscussionComments
+
+
+METRIC_COLUMNS = ['github', 'created_at', 'end_at', 'lifetime', 'res_con',
+                  'commit', 'issue', 'pr', 'pr_review', 'repository', 'gists',
+                  'repository_discussions',
+                  'commit_comments', 'issue_comments',
+                  'gist_comments', 'repository_discussion_comments',
+                  'Atotal_count', 'Afork_count', 'Astargazer_count',
+                  'Awatchers_count', 'Atotal_size', 'type_A_lang',
+                  'Btotal_count', 'Bfork_count', 'Bstargazer_count',
+                  'Bwatchers_count', 'Btotal_size', 'type_B_lang',
+                  'Ctotal_count', 'Cfork_count', 'Cstargazer_count',
+                  'Cwatchers_count', 'Ctotal_size', 'type_C_lang',
+                  'Dtotal_count', 'Dfork_count', 'Dstargazer_count',
+                  'Dwatchers_count', 'Dtotal_size', 'type_D_lang']
 
 
 class UserMetricStatsMiner:
@@ -20,36 +43,132 @@ class UserMetricStatsMiner:
     Helps mining repository data.
     """
 
-    def __init__(self, client: Client):
+    def __init__(self, client: Client, checkpoint: Optional[CheckpointStore] = None,
+                 window_store: Optional[ContributionWindowStore] = None):
+        """
+        Args:
+            client: client to mine with
+            checkpoint: store recording finished logins and pagination progress, so an interrupted run can resume
+            window_store: store of the contributionsCollection counts of past windows, so repeated runs only query
+                          the window reaching into the present
+        """
         self._client = client
+        self._checkpoint = checkpoint
+        self._window_store = window_store
         self.exceptions = []
-        self.total_contributions = pd.DataFrame(columns=['github', 'created_at', 'end_at', 'lifetime', 'res_con',
-                                                         'commit', 'issue', 'pr', 'pr_review', 'repository', 'gists',
-                                                         'repository_discussions',
-                                                         'commit_comments', 'issue_comments',
-                                                         'gist_comments', 'repository_discussion_comments',
-                                                         'Atotal_count', 'Afork_count', 'Astargazer_count',
-                                                         'Awatchers_count', 'Atotal_size', 'type_A_lang',
-                                                         'Btotal_count', 'Bfork_count', 'Bstargazer_count',
-                                                         'Bwatchers_count', 'Btotal_size', 'type_B_lang',
-                                                         'Ctotal_count', 'Cfork_count', 'Cstargazer_count',
-                                                         'Cwatchers_count', 'Ctotal_size', 'type_C_lang',
-                                                         'Dtotal_count', 'Dfork_count', 'Dstargazer_count',
-                                                         'Dwatchers_count', 'Dtotal_size', 'type_D_lang'])
+        self._total_contributions = ResultCollector(METRIC_COLUMNS)
+
+    @property
+    def total_contributions(self) -> pd.DataFrame:
+        return self._total_contributions.to_frame()
+
+    @property
+    def total_contribution_records(self) -> List[Dict[str, Any]]:
+        """
+        The mined rows as dictionaries, without materialising a frame, e.g. to send them across processes.
+        """
+        return self._total_contributions.to_records()
+
+    # the paginated counts of a user, with the query and node extractor of each; the queries are paginated
+    # through PaginationState objects, so every user shares the same instances and their compiled templates
+    PAGINATED_COUNTS = (
+        ("gists", UserGists(), UserGists.user_gists),
+        ("repository_discussions", UserRepositoryDiscussions(), UserRepositoryDiscussions.user_repository_discussions),
+        ("commit_comments", UserCommitComments(), UserCommitComments.user_commit_comments),
+        ("issue_comments", UserIssueComments(), UserIssueComments.user_issue_comments),
+        ("gist_comments", UserGistComments(), UserGistComments.user_gist_comments),
+        ("repository_discussion_comments", UserRepositoryDiscussionComments(),
+         UserRepositoryDiscussionComments.user_repository_discussion_comments),
+    )
+
+    def _count_created_before(self, login: str, column: str, query: PaginatedQuery,
+                              nodes: Callable[[Dict[str, Any]], List[Dict[str, Any]]], end: str) -> int:
+        """
+        Counts the nodes of a paginated query created before end, without fetching the pages after it.
+        """
+        return fold_pages(self._client, query, {"user": login, "pg_size": 100},
+                          lambda response, counter: counter + query.created_before_time(nodes(response), end), 0,
+                          stop_predicate=lambda page: helper.reached_time(nodes(page), end),
+                          checkpoint=self._checkpoint, key=f"{login}/{column}")
+
+    def _count_created_before_since(self, login: str, column: str, query: PaginatedQuery,
+                                    nodes: Callable[[Dict[str, Any]], List[Dict[str, Any]]], end: str,
+                                    state: CheckpointStore) -> int:
+        """
+        Counts the nodes of a paginated query created before end, starting from the last page of the previous run
+        recorded in the state store, and records the start of the last page fetched for the next run.
+        The connections list their nodes from the oldest, so only the last page can gain nodes between runs.
+        """
+        cursor, _, count = state.progress(f"{login}/{column}")
+        count = count or 0
+        pagination = PaginationState(cursor)
+        resume_cursor, resume_count = cursor, count
+        for response in self._client.execute(query=query, substitutions={"user": login, "pg_size": 100},
+                                             stop_predicate=lambda page: helper.reached_time(nodes(page), end),
+                                             state=pagination):
+            # the next run fetches this page again, as it may gain nodes or hold nodes created after end
+            resume_cursor, resume_count = cursor, count
+            count += query.created_before_time(nodes(response), end)
+            cursor = pagination.end_cursor
+        state.save_progress(f"{login}/{column}", resume_cursor, True, resume_count)
+        return count
+
+    def _contributions(self, login: str, start: str, end: str) -> Dict[str, int]:
+        """
+        Sums the contributionsCollection counts of a user in a time span, the yearly windows missing from the
+        window store in a single request.
+        """
+        windows = UserContributionsCollectionWindows.yearly_windows(start, end)
+        return dict(windowed_contributions(self._client, login, windows, self._window_store))
+
+    def _repository_stats(self, login: str, end: str) -> Dict[str, Any]:
+        """
+        Collects the statistics of the four repository categories of a user in one pass, bucketed locally.
+        """
+        return repository_stats(self._client, login, end, self._checkpoint)
+
+    @staticmethod
+    def _missing_row(login: str, end_at: Any = pd.NA) -> Dict[str, Any]:
+        """
+        Builds the row of a login that could not be mined.
+        """
+        row = {column: pd.NA for column in METRIC_COLUMNS}
+        row.update({'github': login, 'created_at': "Do Not Exist", 'end_at': end_at})
+        return row
+
+    @staticmethod
+    def _previous_count(previous: Optional[Dict[str, Any]], column: str) -> int:
+        """
+        Returns a count of the previous row, 0 if there is no previous row or the count is missing,
+        as NA counts are stored as null.
+        """
+        value = previous.get(column) if previous is not None else None
+        return 0 if value is None or pd.isna(value) else value
 
     def run(self, login: str, start: str = None, end: str = None):
         """
-        Collect GitHub metric data for a user in the give time span.
+        Collect GitHub metric data for a user in the give time span. With a checkpoint store, a login finished
+        by an earlier run is taken from the store, and an unfinished one resumes where the earlier run stopped.
         Args:
             login: user GitHub account
             start: start time
             end: end time
         """
+        if self._checkpoint is not None and self._checkpoint.is_complete(login):
+            self._total_contributions.extend(self._checkpoint.rows(login))
+            if self._checkpoint.rows(login)[0]['created_at'] == "Do Not Exist":
+                self.exceptions.append(login)
+            return
         try:
             if not start:
                 start = self._client.execute(query=UserLogin(), substitutions={"user": login})["user"]["createdAt"]
+            if end is None and self._checkpoint is not None:
+                # a resumed login keeps the end of the run that started it
+                end = self._checkpoint.progress(f"{login}/end")[2]
             if end is None:
                 end = datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ')
+            if self._checkpoint is not None:
+                self._checkpoint.save_progress(f"{login}/end", None, False, end)
 
             datetime_start = datetime.strptime(start, "%Y-%m-%dT%H:%M:%SZ")
             datetime_end = datetime.strptime(end, "%Y-%m-%dT%H:%M:%SZ")
@@ -58,190 +177,212 @@ class UserMetricStatsMiner:
 
             basic_stats = {'github': login, 'created_at': start, 'end_at': end, 'lifetime': difference.days}
 
-            period_end = helper.add_a_year(start)
-            cumulated_contributions_collection = Counter({"res_con": 0, "commit": 0, "issue": 0,
-                                                          "pr": 0, "pr_review": 0, "repository": 0})
-
-            temp = Counter({"res_con": 0, "commit": 0, "issue": 0, "pr": 0, "pr_review": 0, "repository": 0})
-
-            type_A_repo = {"total_count": 0, "fork_count": 0, "stargazer_count": 0, "watchers_count": 0,
-                           "total_size": 0}
-            type_A_lang = {}
-
-            type_B_repo = {"total_count": 0, "fork_count": 0, "stargazer_count": 0, "watchers_count": 0,
-                           "total_size": 0}
-            type_B_lang = {}
-
-            type_C_repo = {"total_count": 0, "fork_count": 0, "stargazer_count": 0, "watchers_count": 0,
-                           "total_size": 0}
-            type_C_lang = {}
-
-            type_D_repo = {"total_count": 0, "fork_count": 0, "stargazer_count": 0, "watchers_count": 0,
-                           "total_size": 0}
-            type_D_lang = {}
-
-            while start < end:
-                if period_end > end:
-                    period_end = end
-                response = self._client.execute(query=UserContributionsCollection(),
-                                                substitutions={"user": login,
-                                                               "start": start,
-                                                               "end": period_end})
-
-                cumulated_contributions_collection += UserContributionsCollection.user_contributions_collection(
-                    response)
-                start = period_end
-                period_end = helper.add_a_year(start)
-
-
-            cumulated_contributions_collection = Counter(
-                {key: cumulated_contributions_collection[key] + temp[key] for key in
-                 set(cumulated_contributions_collection) | set(temp)})
-            cumulated_contributions_collection = dict(cumulated_contributions_collection)
-
-            # gists
-            counter = 0
-            for response in self._client.execute(query=UserGists(),
-                                                 substitutions={"user": login, "pg_size": 100}):
-                counter += UserGists.created_before_time(UserGists.user_gists(response), end)
-            cumulated_contributions_collection["gists"] = counter
-
-            # repositoryDiscussions
-            counter = 0
-            for response in self._client.execute(query=UserRepositoryDiscussions(),
-                                                 substitutions={"user": login, "pg_size": 100}):
-                counter += UserRepositoryDiscussions.created_before_time(
-                    UserRepositoryDiscussions.user_repository_discussions(response), end)
-            cumulated_contributions_collection["repository_discussions"] = counter
-
-            # commitComments
-            counter = 0
-            for response in self._client.execute(query=UserCommitComments(),
-                                                 substitutions={"user": login, "pg_size": 100}):
-                counter += UserCommitComments.created_before_time(UserCommitComments.user_commit_comments(response),
-                                                                  end)
-            cumulated_contributions_collection["commit_comments"] = counter
-
-            # issueComments
-            counter = 0
-            for response in self._client.execute(query=UserIssueComments(),
-                                                 substitutions={"user": login, "pg_size": 100}):
-                counter += UserIssueComments.created_before_time(UserIssueComments.user_issue_comments(response),
-                                                                 end)
-            cumulated_contributions_collection["issue_comments"] = counter
-
-            # gistComments
-            counter = 0
-            for response in self._client.execute(query=UserGistComments(),
-                                                 substitutions={"user": login, "pg_size": 100}):
-                counter += UserGistComments.created_before_time(UserGistComments.user_gist_comments(response), end)
-            cumulated_contributions_collection["gist_comments"] = counter
-
-            # repositoryDiscussionComments
-            counter = 0
-            for response in self._client.execute(query=UserRepositoryDiscussionComments(),
-                                                 substitutions={"user": login, "pg_size": 100}):
-                counter += UserRepositoryDiscussionComments.created_before_time(
-                    UserRepositoryDiscussionComments.user_repository_discussion_comments(response), end)
-            cumulated_contributions_collection["repository_discussion_comments"] = counter
-
-            # TypeA
-            for response in self._client.execute(query=UserRepositories(),
-                                                 substitutions={"user": login, "pg_size": 100,
-                                                                "is_fork": False,
-                                                                "ownership": "OWNER",
-                                                                "order_by": {
-                                                                    "field": "CREATED_AT",
-                                                                    "direction": "ASC"}}):
-                UserRepositories.cumulated_repository_stats(UserRepositories.user_repositories(response),
-                                                            type_A_repo, type_A_lang, end)
-            type_A_repo = {'A' + key: value for key, value in type_A_repo.items()}
-            cumulated_contributions_collection.update(type_A_repo)
-            cumulated_contributions_collection["type_A_lang"] = type_A_lang
-
-            # TypeB
-            for response in self._client.execute(query=UserRepositories(),
-                                                 substitutions={"user": login, "pg_size": 100,
-                                                                "is_fork": True,
-                                                                "ownership": "OWNER",
-                                                                "order_by": {
-                                                                    "field": "CREATED_AT",
-                                                                    "direction": "ASC"}}):
-                UserRepositories.cumulated_repository_stats(UserRepositories.user_repositories(response),
-                                                            type_B_repo, type_B_lang, end)
-            type_B_repo = {'B' + key: value for key, value in type_B_repo.items()}
-            cumulated_contributions_collection.update(type_B_repo)
-            cumulated_contributions_collection["type_B_lang"] = type_B_lang
-
-            # TypeC
-            for response in self._client.execute(query=UserRepositories(),
-                                                 substitutions={"user": login, "pg_size": 100,
-                                                                "is_fork": False,
-                                                                "ownership": "COLLABORATOR",
-                                                                "order_by": {
-                                                                    "field": "CREATED_AT",
-                                                                    "direction": "ASC"}}):
-                UserRepositories.cumulated_repository_stats(UserRepositories.user_repositories(response),
-                                                            type_C_repo, type_C_lang, end)
-            type_C_repo = {'C' + key: value for key, value in type_C_repo.items()}
-            cumulated_contributions_collection.update(type_C_repo)
-            cumulated_contributions_collection["type_C_lang"] = type_C_lang
-
-            # TypeD
-            for response in self._client.execute(query=UserRepositories(),
-                                                 substitutions={"user": login, "pg_size": 100,
-                                                                "is_fork": True,
-                                                                "ownership": "COLLABORATOR",
-                                                                "order_by": {
-                                                                    "field": "CREATED_AT",
-                                                                    "direction": "ASC"}}):
-                UserRepositories.cumulated_repository_stats(UserRepositories.user_repositories(response),
-                                                            type_D_repo, type_D_lang, end)
-            type_D_repo = {'D' + key: value for key, value in type_D_repo.items()}
-            cumulated_contributions_collection.update(type_D_repo)
-            cumulated_contributions_collection["type_D_lang"] = type_D_lang
+            cumulated_contributions_collection = self._contributions(login, start, end)
+
+            # gists, discussions and comments, each paginated only up to end
+            for column, query, nodes in self.PAGINATED_COUNTS:
+                cumulated_contributions_collection[column] = self._count_created_before(login, column, query, nodes, end)
+
+            cumulated_contributions_collection.update(self._repository_stats(login, end))
 
             cumulated_contributions_collection.update(basic_stats)
-            self.total_contributions = pd.concat(
-                [self.total_contributions, pd.DataFrame([cumulated_contributions_collection])], ignore_index=True)
+            self._total_contributions.append(cumulated_contributions_collection)
+            if self._checkpoint is not None:
+                self._checkpoint.complete(login, [cumulated_contributions_collection])
+
+        except QueryFailedException as e:
+            dne = self._missing_row(login)
+            self._total_contributions.append(dne)
+            self.exceptions.append(login)
+            if self._checkpoint is not None and helper.not_found_data(e) is not None:
+                # the login does not exist, so a later run has nothing to retry; other failures are left incomplete
+                self._checkpoint.complete(login, [dne])
+
+        except Exception:
+            self._total_contributions.append(self._missing_row(login, "Unknown exception"))
+            self.exceptions.append(login)
+
+    def run_incremental(self, login: str, state: CheckpointStore, previous: Optional[Dict[str, Any]] = None,
+                        end: str = None):
+        """
+        Collect GitHub metric data for a user up to end, fetching only the activity since the previous run.
+        The contributionsCollection counts of the new window are added to the previous totals, and gists,
+        discussions and comments are paginated from the last page of the previous run. Repository statistics
+        are a snapshot of stars, forks and sizes, so they are collected again. The new row and the pagination
+        positions are recorded in the state store for the next run.
+        Args:
+            login: user GitHub account
+            state: store of the rows and pagination positions of earlier runs, such as a weekly state file
+            previous: row of the previous run, with the columns of total_contributions, for a login without state
+                      yet, such as one built from the stored GitHubUserData; its end_at is the start of the new window
+            end: end time
+        """
+        previous = state.progress(f"{login}/last_run")[2] or previous
+        try:
+            if previous is None or previous.get('created_at') in (None, "Do Not Exist"):
+                created_at = self._client.execute(query=UserLogin(), substitutions={"user": login})["user"]["createdAt"]
+                previous, since = None, created_at
+            else:
+                created_at, since = previous['created_at'], previous['end_at']
+            if end is None:
+                end = datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ')
+
+            difference = datetime.strptime(end, "%Y-%m-%dT%H:%M:%SZ") - datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%SZ")
+            row = {'github': login, 'created_at': created_at, 'end_at': end, 'lifetime': difference.days}
+
+            contributions = self._contributions(login, since, end)
+            for key, value in contributions.items():
+                row[key] = value + self._previous_count(previous, key)
+
+            for column, query, nodes in self.PAGINATED_COUNTS:
+                # without a recorded position, e.g. a previous row from the database, the count starts over
+                row[column] = self._count_created_before_since(login, column, query, nodes, end, state)
+
+            row.update(self._repository_stats(login, end))
+            self._total_contributions.append(row)
+            state.save_progress(f"{login}/last_run", None, False, row)
 
         except QueryFailedException:
-            dne = pd.DataFrame([{'github': login, 'created_at': "Do Not Exist", 'end_at': pd.NA, 'lifetime': pd.NA,
-                                 'res_con': pd.NA, 'commit': pd.NA, 'issue': pd.NA, 'pr': pd.NA, 'pr_review': pd.NA,
-                                 'repository': pd.NA, 'gists': pd.NA, 'repository_discussions': pd.NA,
-                                 'commit_comments': pd.NA, 'issue_comments': pd.NA, 'gist_comments': pd.NA,
-                                 'repository_discussion_comments': pd.NA,
-                                 'Atotal_count': pd.NA, 'Afork_count': pd.NA, 'Astargazer_count': pd.NA,
-                                 'Awatchers_count': pd.NA, 'Atotal_size': pd.NA, 'type_A_lang': pd.NA,
-                                 'Btotal_count': pd.NA, 'Bfork_count': pd.NA, 'Bstargazer_count': pd.NA,
-                                 'Bwatchers_count': pd.NA, 'Btotal_size': pd.NA, 'type_B_lang': pd.NA,
-                                 'Ctotal_count': pd.NA, 'Cfork_count': pd.NA, 'Cstargazer_count': pd.NA,
-                                 'Cwatchers_count': pd.NA, 'Ctotal_size': pd.NA, 'type_C_lang': pd.NA,
-                                 'Dtotal_count': pd.NA, 'Dfork_count': pd.NA, 'Dstargazer_count': pd.NA,
-                                 'Dwatchers_count': pd.NA, 'Dtotal_size': pd.NA, 'type_D_lang': pd.NA}])
-
-            self.total_contributions = pd.concat(
-                [self.total_contributions, dne], ignore_index=True)
+            self._total_contributions.append(self._missing_row(login))
             self.exceptions.append(login)
 
-        except Exception as e:
-            dne = pd.DataFrame([{'github': login, 'created_at': "Do Not Exist", 'end_at': "Unknown exception", 'lifetime': pd.NA,
-                                 'res_con': pd.NA, 'commit': pd.NA, 'issue': pd.NA, 'pr': pd.NA, 'pr_review': pd.NA,
-                                 'repository': pd.NA, 'gists': pd.NA, 'repository_discussions': pd.NA,
-                                 'commit_comments': pd.NA, 'issue_comments': pd.NA, 'gist_comments': pd.NA,
-                                 'repository_discussion_comments': pd.NA,
-                                 'Atotal_count': pd.NA, 'Afork_count': pd.NA, 'Astargazer_count': pd.NA,
-                                 'Awatchers_count': pd.NA, 'Atotal_size': pd.NA, 'type_A_lang': pd.NA,
-                                 'Btotal_count': pd.NA, 'Bfork_count': pd.NA, 'Bstargazer_count': pd.NA,
-                                 'Bwatchers_count': pd.NA, 'Btotal_size': pd.NA, 'type_B_lang': pd.NA,
-                                 'Ctotal_count': pd.NA, 'Cfork_count': pd.NA, 'Cstargazer_count': pd.NA,
-                                 'Cwatchers_count': pd.NA, 'Ctotal_size': pd.NA, 'type_C_lang': pd.NA,
-                                 'Dtotal_count': pd.NA, 'Dfork_count': pd.NA, 'Dstargazer_count': pd.NA,
-                                 'Dwatchers_count': pd.NA, 'Dtotal_size': pd.NA, 'type_D_lang': pd.NA}])
-            self.total_contributions = pd.concat(
-                [self.total_contributions, dne], ignore_index=True)
+        except Exception:
+            self._total_contributions.append(self._missing_row(login, "Unknown exception"))
             self.exceptions.append(login)
 
 
+# the client and stores of a cohort worker process, built once per process by _init_cohort_worker
+_worker_client = None
+_worker_checkpoint = None
+_worker_window_store = None
+
+
+def _init_cohort_worker(tokens: multiprocessing.Queue, client_kwargs: Dict[str, Any], checkpoint: Optional[str],
+                        window_store: Optional[str] = None) -> None:
+    """
+    Builds the client of a cohort worker process from a token of its own. Ctrl-C is left to the parent process,
+    which shuts the pool down.
+    """
+    global _worker_client, _worker_checkpoint, _worker_window_store
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_client = Client(authenticator=PersonalAccessTokenAuthenticator(tokens.get()), **client_kwargs)
+    _worker_checkpoint = CheckpointStore(checkpoint) if checkpoint else None
+    _worker_window_store = ContributionWindowStore(window_store) if window_store else None
+
+
+def _mine_cohort_user(login: str, start: Optional[str], end: Optional[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Mines one login in a cohort worker process.
+
+    Returns:
+        The rows mined for the login, and the login again if it failed.
+    """
+    miner = UserMetricStatsMiner(_worker_client, _worker_checkpoint, _worker_window_store)
+    miner.run(login, start, end)
+    return miner.total_contribution_records, miner.exceptions
+
+
+class UserMetricStatsCohortMiner:
+    """
+    Mines a cohort of logins with UserMetricStatsMiner, sharded across a pool of worker processes.
+    Every worker has its own client and token, so the workers draw on separate rate limits.
+    """
+
+    def __init__(self, tokens: List[str], max_workers: Optional[int] = None, client_kwargs: Optional[Dict[str, Any]] = None,
+                 checkpoint: Optional[str] = None, window_store: Optional[str] = None):
+        """
+        Args:
+            tokens: personal access tokens, one per worker; workers share them round robin when there are more workers
+            max_workers: number of worker processes, one per token by default
+            client_kwargs: further arguments of the Client of each worker, such as host or rate_limit_mode
+            checkpoint: path of a checkpoint file shared by the workers, so that a restarted run skips finished
+                        logins and resumes unfinished paginations
+            window_store: path of a contribution window store shared by the workers, so that the past years
+                          of a login are only queried once across runs
+        """
+        if not tokens:
+            raise ValueError("At least one token is required")
+        self._tokens = list(tokens)
+        self._max_workers = max_workers or len(self._tokens)
+        self._client_kwargs = client_kwargs or {}
+        self._checkpoint = checkpoint
+        self._window_store = window_store
+        self.exceptions = []
+        self.interrupted = []
+        self._total_contributions = ResultCollector(METRIC_COLUMNS)
+
+    @property
+    def total_contributions(self) -> pd.DataFrame:
+        return self._total_contributions.to_frame()
 
+    @staticmethod
+    def read_logins(file: str, column: str = "github") -> List[str]:
+        """
+        Reads the logins of a cohort from a CSV file.
+        Args:
+            file: path of the CSV file
+            column: column holding the logins
+        Returns:
+            the logins, in file order
+        """
+        return pd.read_csv(file)[column].dropna().astype(str).str.strip().tolist()
 
+    def run(self, logins: Union[str, Iterable[str]], start: str = None, end: str = None):
+        """
+        Collect GitHub metric data for every login of a cohort in the given time span. The rows are merged into
+        total_contributions in input order, and failed logins are listed in exceptions. On Ctrl-C, logins not yet
+        started are cancelled and listed in interrupted, while the ones in progress are allowed to finish.
+        Args:
+            logins: logins, or the path of a CSV file with a github column
+            start: start time
+            end: end time
+        """
+        if isinstance(logins, str):
+            logins = self.read_logins(logins)
+        logins = list(logins)
+
+        tokens = multiprocessing.Queue()
+        for index in range(self._max_workers):
+            tokens.put(self._tokens[index % len(self._tokens)])
+
+        results = {}
+        store = CheckpointStore(self._checkpoint) if self._checkpoint else None
+        executor = ProcessPoolExecutor(max_workers=self._max_workers, initializer=_init_cohort_worker,
+                                       initargs=(tokens, self._client_kwargs, self._checkpoint, self._window_store))
+        futures = {}
+        for index, login in enumerate(logins):
+            if store is not None and store.is_complete(login):
+                # finished by an earlier run, no need to start a worker for it
+                miner = UserMetricStatsMiner(None, store)
+                miner.run(login)
+                results[index] = (miner.total_contribution_records, miner.exceptions)
+            else:
+                futures[executor.submit(_mine_cohort_user, login, start, end)] = index
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = self._result(future, logins[futures[future]])
+        except KeyboardInterrupt:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, index in futures.items():
+                if index not in results and future.done() and not future.cancelled():
+                    results[index] = self._result(future, logins[index])
+        finally:
+            executor.shutdown(wait=True)
+
+        for index, login in enumerate(logins):
+            if index not in results:
+                self.interrupted.append(login)
+                continue
+            login_rows, exceptions = results[index]
+            self._total_contributions.extend(login_rows)
+            self.exceptions.extend(exceptions)
+
+    @staticmethod
+    def _result(future, login: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Returns the rows and failures of a finished login, counting a crashed worker as a failure.
+        """
+        try:
+            return future.result()
+        except Exception:
+            return [], [login]
@@ -1,6 +1,6 @@
 from typing import Dict, Any, List
 from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
-import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.utils.timestamps import count_leading_before
 
 
 class UserCommitComments(PaginatedQuery):
@@ -68,10 +68,4 @@ class UserCommitComments(PaginatedQuery):
         Returns:
             int: The count of commit comments created before the specified time.
         """
-        counter = 0
-        for commit_comment in commit_comments:
-            if helper.created_before(commit_comment["createdAt"], time):
-                counter += 1
-            else:
-                break
-        return counter
+        return count_leading_before([commit_comment["createdAt"] for commit_comment in commit_comments], time)
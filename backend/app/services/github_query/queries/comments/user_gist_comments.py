@@ -1,6 +1,6 @@
 from typing import Dict, Any, List
 from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
-import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.utils.timestamps import count_leading_before
 
 class UserGistComments(PaginatedQuery):
     """
@@ -67,11 +67,5 @@ class UserGistComments(PaginatedQuery):
         Returns:
             int: The count of gist comments created before the specified time.
         """
-        counter = 0
-        for gist_comment in gist_comments:
-            if helper.created_before(gist_comment["createdAt"], time):
-                counter += 1
-            else:
-                break
-        return counter
+        return count_leading_before([gist_comment["createdAt"] for gist_comment in gist_comments], time)
 
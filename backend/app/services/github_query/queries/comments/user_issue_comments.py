@@ -1,6 +1,6 @@
 from typing import Dict, Any, List
 from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
-import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.utils.timestamps import count_leading_before
 
 class UserIssueComments(PaginatedQuery):
     """
@@ -69,12 +69,6 @@ class UserIssueComments(PaginatedQuery):
         Returns:
             int: The count of issue comments created before the specified time.
         """
-        counter = 0
-        for issue_comment in issue_comments:
-            if helper.created_before(issue_comment["createdAt"], time):
-                counter += 1
-            else:
-                break
-        return counter
+        return count_leading_before([issue_comment["createdAt"] for issue_comment in issue_comments], time)
 
 
@@ -1,6 +1,6 @@
 from typing import Dict, Any, List
 from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
-import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.utils.timestamps import count_leading_before
 
 class UserRepositoryDiscussionComments(PaginatedQuery):
     """
@@ -68,10 +68,4 @@ class UserRepositoryDiscussionComments(PaginatedQuery):
         Returns:
             int: The count of repository discussion comments created before the specified time.
         """
-        counter = 0
-        for repository_discussion_comment in repository_discussion_comments:
-            if helper.created_before(repository_discussion_comment["createdAt"], time):
-                counter += 1
-            else:
-                break
-        return counter
+        return count_leading_before([repository_discussion_comment["createdAt"] for repository_discussion_comment in repository_discussion_comments], time)
@@ -1,6 +1,6 @@
 from typing import List, Dict, Any
 from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
-import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.utils.timestamps import count_leading_before
 
 class UserGists(PaginatedQuery):
     def __init__(self) -> None:
@@ -18,7 +18,9 @@ class UserGists(PaginatedQuery):
                         "login",
                         QueryNodePaginator(
                             "gists",
-                            args={"first": "$pg_size"},
+                            args={"first": "$pg_size",
+                                  "orderBy": {"field": "CREATED_AT",
+                                              "direction": "ASC"}},
                             fields=[
                                 "totalCount",
                                 QueryNode(
@@ -61,10 +63,4 @@ class UserGists(PaginatedQuery):
         Returns:
             The count of gists created before the specified time.
         """
-        counter = 0
-        for gist in gists:
-            if helper.created_before(gist.get("createdAt", ""), time):
-                counter += 1
-            else:
-                break
-        return counter
+        return count_leading_before([gist.get("createdAt", "") for gist in gists], time)
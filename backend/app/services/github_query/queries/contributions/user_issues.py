@@ -1,6 +1,6 @@
 from typing import List, Dict, Any
 from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
-import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.utils.timestamps import count_leading_before
 
 class UserIssues(PaginatedQuery):
     """
@@ -64,10 +64,4 @@ class UserIssues(PaginatedQuery):
         Returns:
             int: The count of issues created before the specified time.
         """
-        counter = 0
-        for issue in issues:
-            if helper.created_before(issue.get("createdAt", ""), time):
-                counter += 1
-            else:
-                break
-        return counter
+        return count_leading_before([issue.get("createdAt", "") for issue in issues], time)
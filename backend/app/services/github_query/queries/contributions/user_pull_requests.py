@@ -1,6 +1,6 @@
 from typing import List, Dict, Any
 from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
-import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.utils.timestamps import count_leading_before
 
 class UserPullRequests(PaginatedQuery):
     """
@@ -65,11 +65,5 @@ class UserPullRequests(PaginatedQuery):
         Returns:
             int: The count of pull requests created before the specified time.
         """
-        counter = 0
-        for pull_request in pull_requests:
-            if helper.created_before(pull_request.get("createdAt", ""), time):
-                counter += 1
-            else:
-                break
-        return counter
+        return count_leading_before([pull_request.get("createdAt", "") for pull_request in pull_requests], time)
 
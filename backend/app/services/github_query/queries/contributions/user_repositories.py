@@ -7,7 +7,9 @@ class UserRepositories(PaginatedQuery):
     UserRepositories is a class for querying a user's repositories including details like language statistics,
     fork count, stargazer count, etc. It extends PaginatedQuery to handle potentially large numbers of repositories.
     """
-    
+
+    variable_types = {"is_fork": "Boolean", "ownership": "[RepositoryAffiliation]", "order_by": "RepositoryOrder"}
+
     def __init__(self) -> None:
         """
         Initializes a query for a user's repositories with various filtering and ordering options.
@@ -122,5 +124,116 @@ class UserRepositories(PaginatedQuery):
                         lang_stats[name] += int(size)
 
 
-            
-                
\ No newline at end of file
+class UserRepositoriesAllCategories(PaginatedQuery):
+    """
+    UserRepositoriesAllCategories fetches the repositories a user owns or collaborates on, forks included, in a single
+    paginated pass. Each node carries isFork and its owner, so the repositories can be bucketed locally into the
+    categories A (owned sources), B (owned forks), C (collaborated sources) and D (collaborated forks)
+    instead of paginating UserRepositories once per category.
+    """
+
+    CATEGORIES = ("A", "B", "C", "D")
+
+    variable_types = {"order_by": "RepositoryOrder"}
+
+    def __init__(self) -> None:
+        """
+        Initializes a query for all of a user's owned and collaborated repositories with an ordering option.
+        """
+        super().__init__(
+            fields=[
+                QueryNode(
+                    "user",
+                    args={"login": "$user"},
+                    fields=[
+                        QueryNodePaginator(
+                            "repositories",
+                            args={"first": "$pg_size",
+                                  "ownerAffiliations": ["OWNER", "COLLABORATOR"],
+                                  "orderBy": "$order_by"},
+                            fields=[
+                                "totalCount",
+                                QueryNode(
+                                    "nodes",
+                                    fields=[
+                                        "name",
+                                        "isEmpty",
+                                        "isFork",
+                                        "createdAt",
+                                        "updatedAt",
+                                        "forkCount",
+                                        "stargazerCount",
+                                        QueryNode("owner", fields=["login"]),
+                                        QueryNode("watchers", fields=["totalCount"]),
+                                        QueryNode("primaryLanguage", fields=["name"]),
+                                        QueryNode(
+                                            "languages",
+                                            args={"first": 100,
+                                                  "orderBy": {"field": "SIZE",
+                                                              "direction": "DESC"}},
+                                            fields=[
+                                                "totalSize",
+                                                QueryNode(
+                                                    "edges",
+                                                    fields=[
+                                                        "size",
+                                                        QueryNode("node", fields=["name"])
+                                                    ]
+                                                )
+                                            ]
+                                        )
+                                    ]
+                                ),
+                                QueryNode(
+                                    "pageInfo",
+                                    fields=["endCursor", "hasNextPage"]
+                                )
+                            ]
+                        ),
+                    ]
+                )
+            ]
+        )
+
+    @staticmethod
+    def repository_category(repo: Dict[str, Any], login: str) -> str:
+        """
+        Determines the category of a repository for a user.
+
+        Args:
+            repo: A repository node, including isFork and owner.
+            login: The login of the user the repositories were fetched for.
+
+        Returns:
+            "A" for a source repository the user owns, "B" for a fork the user owns,
+            "C" for a source repository the user collaborates on, "D" for a fork the user collaborates on.
+        """
+        owned = repo["owner"]["login"].lower() == login.lower()
+        if owned:
+            return "B" if repo["isFork"] else "A"
+        return "D" if repo["isFork"] else "C"
+
+    @staticmethod
+    def categorized_repository_stats(repo_list: List[Dict[str, Any]], login: str, repo_stats: Dict[str, Dict[str, int]], lang_stats: Dict[str, Dict[str, int]], start: str, end: str, direction: str) -> None:
+        """
+        Buckets repositories into categories and aggregates the statistics of each category with
+        UserRepositories.cumulated_repository_stats.
+
+        Args:
+            repo_list: List of repositories to be analyzed.
+            login: The login of the user the repositories were fetched for.
+            repo_stats: Dictionary of statistics per category, each accumulating total count, fork count, etc.
+            lang_stats: Dictionary of language usage statistics per category.
+            start: String representing the start time for consideration of repositories.
+            end: String representing the end time for consideration of repositories.
+            direction: Specify whether to aggregates statistics for repositories created before, after a certain time or in between a time range.
+
+        Returns:
+            None: Modifies the dictionaries of repo_stats and lang_stats in place.
+        """
+        buckets = {category: [] for category in UserRepositoriesAllCategories.CATEGORIES}
+        for repo in repo_list:
+            buckets[UserRepositoriesAllCategories.repository_category(repo, login)].append(repo)
+        for category, repos in buckets.items():
+            if repos:
+                UserRepositories.cumulated_repository_stats(repos, repo_stats[category], lang_stats[category], start, end, direction)
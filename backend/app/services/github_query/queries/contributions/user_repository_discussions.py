@@ -1,6 +1,6 @@
 from typing import List, Dict, Any
 from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
-import backend.app.services.github_query.utils.helper as helper
+from backend.app.services.github_query.utils.timestamps import count_leading_before
 
 class UserRepositoryDiscussions(PaginatedQuery):
     def __init__(self) -> None:
@@ -14,7 +14,9 @@ class UserRepositoryDiscussions(PaginatedQuery):
                         "login",
                         QueryNodePaginator(
                             "repositoryDiscussions",
-                            args={"first": "$pg_size"},
+                            args={"first": "$pg_size",
+                                  "orderBy": {"field": "CREATED_AT",
+                                              "direction": "ASC"}},
                             fields=[
                                 "totalCount",
                                 QueryNode(
@@ -58,11 +60,5 @@ class UserRepositoryDiscussions(PaginatedQuery):
         Returns:
             int: The count of repository discussions created before the specified time.
         """
-        counter = 0
-        for repository_discussion in repository_discussions:
-            if helper.created_before(repository_discussion.get("createdAt", ""), time):
-                counter += 1
-            else:
-                break
-        return counter
+        return count_leading_before([repository_discussion.get("createdAt", "") for repository_discussion in repository_discussions], time)
 
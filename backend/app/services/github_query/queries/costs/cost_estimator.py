@@ -0,0 +1,122 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+from backend.app.services.github_query.github_graphql.query import QueryNode, request_count
+
+# GitHub divides the requests a query needs by this many to get its cost in rate limit points
+REQUESTS_PER_POINT = 100
+
+# strings, spreads, names and variables, numbers and punctuation; commas and whitespace are insignificant in GraphQL
+_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|\.\.\.|\$?[A-Za-z_]\w*|-?\d+(?:\.\d+)?|[{}()\[\]:!=@]')
+
+
+def _skip_balanced(tokens: List[str], pos: int) -> Tuple[str, int]:
+    """
+    Skips a parenthesised, braced or bracketed group starting at pos, returning its text and the position after it.
+    """
+    pairs = {"(": ")", "{": "}", "[": "]"}
+    stack = [pairs[tokens[pos]]]
+    start = pos
+    pos += 1
+    while stack:
+        if tokens[pos] in pairs:
+            stack.append(pairs[tokens[pos]])
+        elif tokens[pos] == stack[-1]:
+            stack.pop()
+        pos += 1
+    return " ".join(tokens[start:pos]), pos
+
+
+def _parse_args(tokens: List[str], pos: int) -> Tuple[Dict[str, str], int]:
+    """
+    Parses the arguments of a field starting at its opening parenthesis, keeping each value as written.
+    """
+    args = {}
+    pos += 1
+    while tokens[pos] != ")":
+        key = tokens[pos]
+        pos += 2  # the name and the colon
+        if tokens[pos] in ("{", "["):
+            value, pos = _skip_balanced(tokens, pos)
+        else:
+            value, pos = tokens[pos], pos + 1
+        args[key] = value
+    return args, pos + 1
+
+
+def _parse_selection(tokens: List[str], pos: int) -> Tuple[List[Union[str, QueryNode]], int]:
+    """
+    Parses a selection set starting at its opening brace into fields and QueryNodes.
+    """
+    fields = []
+    pos += 1
+    while tokens[pos] != "}":
+        if tokens[pos] == "...":
+            if tokens[pos + 1] == "on":
+                name, pos = f"... on {tokens[pos + 2]}", pos + 3
+            elif tokens[pos + 1] == "{":
+                name, pos = "...", pos + 1
+            else:
+                # a named fragment, whose definition is not part of the selection
+                fields.append(f"...{tokens[pos + 1]}")
+                pos += 2
+                continue
+        else:
+            name, pos = tokens[pos], pos + 1
+            if tokens[pos] == ":":
+                # an alias, the field itself follows
+                name, pos = f"{name}: {tokens[pos + 1]}", pos + 2
+        args = None
+        if tokens[pos] == "(":
+            args, pos = _parse_args(tokens, pos)
+        while tokens[pos] == "@":
+            pos += 2
+            if tokens[pos] == "(":
+                _, pos = _skip_balanced(tokens, pos)
+        if tokens[pos] == "{":
+            children, pos = _parse_selection(tokens, pos)
+            fields.append(QueryNode(name, fields=children, args=args))
+        else:
+            fields.append(QueryNode(name, args=args) if args else name)
+    return fields, pos + 1
+
+
+def parse_query(query_string: str) -> QueryNode:
+    """
+    Parses a GraphQL query string, such as one rendered by Query.substitute or Query.with_variables, into a tree
+    of QueryNodes. Only the structure needed for pricing is kept: field names, arguments and selections.
+
+    Args:
+        query_string (str): The query, with or without an operation type, name and variable declarations.
+
+    Returns:
+        QueryNode: The root of the query.
+    """
+    tokens = _TOKEN.findall(query_string)
+    pos = 0
+    while tokens[pos] != "{":
+        if tokens[pos] == "(":
+            # variable declarations
+            _, pos = _skip_balanced(tokens, pos)
+        else:
+            pos += 1
+    fields, _ = _parse_selection(tokens, pos)
+    return QueryNode("query", fields=fields)
+
+
+def estimate_cost(query: Union[str, QueryNode], values: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Predicts the rate limit cost of a query without asking the server, following GitHub's documented formula:
+    the requests needed to fulfil every connection divided by 100, rounded to the nearest whole number,
+    with a minimum of one point.
+
+    Args:
+        query (Union[str, QueryNode]): The query, as a QueryNode tree or a rendered query string.
+        values (Optional[Dict[str, Any]]): Substitutions or variables resolving page sizes given as placeholders.
+
+    Returns:
+        int: The predicted cost in rate limit points.
+    """
+    if isinstance(query, str):
+        query = parse_query(query)
+    requests = request_count(query, values)
+    return max(1, (requests + REQUESTS_PER_POINT // 2) // REQUESTS_PER_POINT)
@@ -1,9 +1,35 @@
-from typing import Dict, List, Optional
-from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from backend.app.services.github_query.github_graphql.query import QueryNode, Query, PaginatedQuery, QueryNodePaginator
 
-class RepositoryCommits(PaginatedQuery):
+class RepositoryCreatedAt(Query):
     def __init__(self) -> None:
-        """Initializes a paginated query for repository commits with specific fields and pagination controls."""
+        """Initializes a query for the creation date of a repository."""
+        super().__init__(
+            fields=[
+                QueryNode(
+                    "repository",
+                    args={"owner": "$owner", "name": "$repo_name"},
+                    fields=["createdAt"]
+                )
+            ]
+        )
+
+
+class RepositoryCommits(PaginatedQuery):
+    # the bounds of a windowed history are Git timestamps, not DateTime
+    variable_types = {"since": "GitTimestamp", "until": "GitTimestamp"}
+
+    def __init__(self, windowed: bool = False) -> None:
+        """
+        Initializes a paginated query for repository commits with specific fields and pagination controls.
+
+        Args:
+            windowed: Restricts the history to the commits between $since and $until, and selects the oid
+                      of every commit to de-duplicate commits fetched by adjacent windows.
+        """
+        history_args = {"since": "$since", "until": "$until", "first": "$pg_size"} if windowed else {"first": "$pg_size"}
+        oid = ["oid"] if windowed else []
         super().__init__(
             fields=[
                 QueryNode(
@@ -21,12 +47,12 @@ class RepositoryCommits(PaginatedQuery):
                                             fields=[
                                                 QueryNodePaginator(
                                                     "history",  # Paginated history of commits
-                                                    args={"first": "$pg_size"},  # Pagination control arguments
+                                                    args=history_args,  # Pagination control arguments
                                                     fields=[
                                                         'totalCount',  # Total number of commits in the history
                                                         QueryNode(
                                                             "nodes",  # List of commit nodes
-                                                            fields=[
+                                                            fields=oid + [
                                                                 "authoredDate",  # Date when the commit was authored
                                                                 "changedFilesIfAvailable",  # Number of files changed, if available
                                                                 "additions",  # Number of additions made in the commit
@@ -140,3 +166,73 @@ class RepositoryCommits(PaginatedQuery):
                             cumulative_commits[name]['total_files'] = files
                             cumulative_commits[name]['total_commits'] = 1
         return cumulative_commits
+
+    @staticmethod
+    def commits_by_author(raw_data: Dict[str, Dict], commits_by_author: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Partitions the commits of the raw data by the login of their author, so that a single pass over the history
+        yields the commits of every contributor. Commits whose author is not linked to a GitHub user are left out.
+
+        Args:
+            raw_data: The raw data returned from the GraphQL query.
+            commits_by_author: Optional dictionary of commits per login to accumulate results.
+
+        Returns:
+            A dictionary of the commits of each login, in history order, each with the details returned by
+            RepositoryContributorsContribution.user_commit_contribution.
+        """
+        nodes = raw_data['repository']['defaultBranchRef']['target']['history']['nodes']
+        if commits_by_author is None:
+            commits_by_author = {}
+
+        for node in nodes:
+            # Consider only commits with less than 2 parents (usually mainline commits)
+            if node['parents'] and node['parents']['totalCount'] < 2 and node['author']['user']:
+                commits_by_author.setdefault(node['author']['user']['login'], []).append({
+                    'authoredDate': node['authoredDate'],
+                    'changedFiles': node['changedFilesIfAvailable'],
+                    'additions': node['additions'],
+                    'deletions': node['deletions'],
+                    'message': node['message']
+                })
+        return commits_by_author
+
+    @staticmethod
+    def time_windows(start: str, end: str, count: int) -> List[Tuple[str, str]]:
+        """
+        Splits a time span into windows of equal length, to page the history of each window independently.
+
+        Args:
+            start: The start of the span, formatted as "%Y-%m-%dT%H:%M:%SZ".
+            end: The end of the span, formatted as "%Y-%m-%dT%H:%M:%SZ".
+            count: The number of windows.
+
+        Returns:
+            The (since, until) bounds of each window, from the oldest. Adjacent windows share their bound.
+        """
+        datetime_start = datetime.strptime(start, "%Y-%m-%dT%H:%M:%SZ")
+        step = (datetime.strptime(end, "%Y-%m-%dT%H:%M:%SZ") - datetime_start) / count
+        bounds = [(datetime_start + step * index).strftime("%Y-%m-%dT%H:%M:%SZ") for index in range(count)] + [end]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    @staticmethod
+    def merge_windows(pages: Iterable[Dict[str, Dict]]) -> Dict[str, Dict]:
+        """
+        Merges the pages of several windows of a windowed history into a single page, ordered by authored date
+        from the newest like the history itself, whatever the offsets of the dates. A commit on the bound of two windows is returned by both,
+        so commits are de-duplicated by oid.
+
+        Args:
+            pages: The raw data of every page of every window.
+
+        Returns:
+            The raw data of a single page holding every commit once.
+        """
+        commits = {}
+        for page in pages:
+            for node in page['repository']['defaultBranchRef']['target']['history']['nodes']:
+                commits[node['oid']] = node
+        # fromisoformat only accepts the Z suffix from Python 3.11
+        nodes = sorted(commits.values(), reverse=True,
+                       key=lambda node: datetime.fromisoformat(node['authoredDate'].replace('Z', '+00:00')))
+        return {'repository': {'defaultBranchRef': {'target': {'history': {'totalCount': len(nodes), 'nodes': nodes}}}}}
@@ -2,6 +2,8 @@ from typing import Dict, List, Optional, Any
 from backend.app.services.github_query.github_graphql.query import QueryNode, PaginatedQuery, QueryNodePaginator
 
 class RepositoryContributorsContribution(PaginatedQuery):
+    variable_types = {"id": "CommitAuthor"}
+
     def __init__(self) -> None:
         """
         Initializes a paginated query to extract contributions made by contributors in a specific repository.
@@ -1,6 +1,20 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from collections import Counter
 from backend.app.services.github_query.github_graphql.query import QueryNode, Query
+import backend.app.services.github_query.utils.helper as helper
+
+CONTRIBUTIONS_COLLECTION_FIELDS = [
+    "startedAt",  # The date and time at which the collection period starts.
+    "endedAt",    # The date and time at which the collection period ends.
+    "restrictedContributionsCount",  # Count of contributions to private repos the viewer does not have access to.
+    "totalCommitContributions",  # The total number of commits authored by the user.
+    "totalIssueContributions",  # The total number of issues opened by the user.
+    "totalPullRequestContributions",  # The total number of pull requests opened by the user.
+    "totalPullRequestReviewContributions",  # The total number of pull request reviews by the user.
+    "totalRepositoryContributions"  # The total number of repositories the user contributed to.
+    # Each of these fields provides a count related to different types of contributions.
+    # User can extend this to include fields they interested.
+]
 
 class UserContributionsCollection(Query):
     """
@@ -21,18 +35,7 @@ class UserContributionsCollection(Query):
                         QueryNode(
                             "contributionsCollection",
                             args={"from": "$start", "to": "$end"},  # Time period for the contributions.
-                            fields=[
-                                "startedAt",  # The date and time at which the collection period starts.
-                                "endedAt",    # The date and time at which the collection period ends.
-                                "restrictedContributionsCount",  # Count of contributions to private repos the viewer does not have access to.
-                                "totalCommitContributions",  # The total number of commits authored by the user.
-                                "totalIssueContributions",  # The total number of issues opened by the user.
-                                "totalPullRequestContributions",  # The total number of pull requests opened by the user.
-                                "totalPullRequestReviewContributions",  # The total number of pull request reviews by the user.
-                                "totalRepositoryContributions"  # The total number of repositories the user contributed to.
-                                # Each of these fields provides a count related to different types of contributions.
-                                # User can extend this to include fields they interested. 
-                            ]
+                            fields=CONTRIBUTIONS_COLLECTION_FIELDS
                         ),
                     ]
                 )
@@ -62,3 +65,109 @@ class UserContributionsCollection(Query):
             "repository": raw_data["totalRepositoryContributions"]  # Total repository contributions.
         })
         return contribution_collection
+
+
+class UserContributionsCollectionWindows(Query):
+    """
+    UserContributionsCollectionWindows fetches a user's contributions over several time windows in one request.
+    Each window is an aliased contributionsCollection field (window0, window1, ...), because a single
+    contributionsCollection may not span more than one year.
+    """
+
+    def __init__(self, windows: int) -> None:
+        """
+        Initializes a query for the given number of windows. The bounds of window i are substituted
+        through the placeholders $start<i> and $end<i>, see window_substitutions.
+
+        Args:
+            windows (int): The number of time windows to fetch.
+        """
+        super().__init__(
+            fields=[
+                QueryNode(
+                    "user",
+                    args={"login": "$user"},
+                    fields=[
+                        QueryNode(
+                            f"window{index}: contributionsCollection",
+                            args={"from": f"$start{index}", "to": f"$end{index}"},
+                            fields=CONTRIBUTIONS_COLLECTION_FIELDS
+                        )
+                        for index in range(windows)
+                    ]
+                )
+            ]
+        )
+
+    @staticmethod
+    def yearly_windows(start: str, end: str) -> List[Tuple[str, str]]:
+        """
+        Splits a time span into consecutive windows of at most one year.
+
+        Args:
+            start (str): The start of the span, formatted as "%Y-%m-%dT%H:%M:%SZ".
+            end (str): The end of the span, formatted as "%Y-%m-%dT%H:%M:%SZ".
+
+        Returns:
+            List[Tuple[str, str]]: The (start, end) bounds of each window, in chronological order.
+        """
+        windows = []
+        while start < end:
+            period_end = min(helper.add_by_days(start, 365), end)
+            windows.append((start, period_end))
+            start = period_end
+        return windows
+
+    @staticmethod
+    def window_substitutions(login: str, windows: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Builds the substitutions of the query for a user and its windows.
+
+        Args:
+            login (str): The GitHub login of the user.
+            windows (List[Tuple[str, str]]): The (start, end) bounds of each window.
+
+        Returns:
+            Dict[str, Any]: The substitutions for the user and each window's bounds.
+        """
+        substitutions = {"user": login}
+        for index, (start, end) in enumerate(windows):
+            substitutions[f"start{index}"] = start
+            substitutions[f"end{index}"] = end
+        return substitutions
+
+    @staticmethod
+    def window_contributions(raw_data: Dict[str, Any]) -> List[Counter]:
+        """
+        Extracts the contributions of each window returned by the query.
+
+        Args:
+            raw_data (dict): The raw data returned by the query,
+                            expected to contain one aliased contributions collection per window.
+
+        Returns:
+            List[Counter]: The contributions of each window, in the order of the windows of the query.
+        """
+        windows = {int(key[len("window"):]): collection
+                   for key, collection in raw_data["user"].items() if key.startswith("window")}
+        return [UserContributionsCollection.user_contributions_collection({"user": {"contributionsCollection": windows[index]}})
+                for index in sorted(windows)]
+
+    @staticmethod
+    def user_contributions_collection(raw_data: Dict[str, Any]) -> Counter:
+        """
+        Sums the contributions of every window returned by the query.
+
+        Args:
+            raw_data (dict): The raw data returned by the query,
+                            expected to contain one aliased contributions collection per window.
+
+        Returns:
+            Counter: The contributions of all windows, with every contribution type present even if zero.
+        """
+        contribution_collection = Counter({"res_con": 0, "commit": 0, "issue": 0, "pr": 0, "pr_review": 0, "repository": 0})
+        for key, collection in raw_data["user"].items():
+            if key.startswith("window"):
+                contribution_collection.update(UserContributionsCollection.user_contributions_collection(
+                    {"user": {"contributionsCollection": collection}}))
+        return contribution_collection
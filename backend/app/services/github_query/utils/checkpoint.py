@@ -0,0 +1,194 @@
+import os
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import pandas as pd
+from backend.app.services.github_query.github_graphql.query import PaginatedQuery, PaginationState
+
+
+def _json_default(value: Any) -> Any:
+    """
+    Serialises the missing values pandas puts into miner rows.
+    """
+    if value is pd.NA or value is pd.NaT:
+        return None
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JsonLinesStore:
+    """
+    JsonLinesStore keeps records in an append-only JSON lines file on local disk. Every record is written with
+    a single append and fsync'd before the call returns, so a crash loses at most the record being written. A torn
+    last line is ignored when the file is loaded. Records of several processes can be appended to the same file.
+    Subclasses apply every record, loaded or appended, to their in-memory state in _apply.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens a store file, loading the records of earlier runs if it exists.
+
+        Args:
+            path (str): The path of the store file.
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    self._load(line)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """
+        Applies a record to the in-memory state of the store.
+        """
+        raise NotImplementedError
+
+    def _load(self, line: str) -> None:
+        """
+        Applies a record of the file, skipping lines torn by a crash.
+        """
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return
+        self._apply(record)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """
+        Appends a record to the file and waits for it to reach the disk.
+        """
+        data = (json.dumps(record, default=_json_default) + "\n").encode("utf-8")
+        with self._lock:
+            fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._load(data.decode("utf-8"))
+
+
+class CheckpointStore(JsonLinesStore):
+    """
+    CheckpointStore records the progress of a mining run in an append-only JSON lines file on local disk, so that
+    a restarted run skips the logins it already finished and resumes long paginations from their last cursor.
+    Later records of a key take precedence, see JsonLinesStore for the durability of the records.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens a checkpoint file, loading the records of earlier runs if it exists.
+
+        Args:
+            path (str): The path of the checkpoint file.
+        """
+        self._completed: Dict[str, List[Dict[str, Any]]] = {}
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        super().__init__(path)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """
+        Records a finished key or the position of a pagination.
+        """
+        if record.get("type") == "complete":
+            self._completed[record["key"]] = record["rows"]
+        elif record.get("type") == "progress":
+            self._progress[record["key"]] = record
+
+    def is_complete(self, key: str) -> bool:
+        """
+        Checks whether a key, typically a login, was finished by an earlier run.
+
+        Args:
+            key (str): The key to check.
+
+        Returns:
+            bool: True if the key was recorded as complete.
+        """
+        return key in self._completed
+
+    def rows(self, key: str) -> List[Dict[str, Any]]:
+        """
+        Returns the result rows recorded for a completed key.
+
+        Args:
+            key (str): The completed key.
+
+        Returns:
+            List[Dict[str, Any]]: The rows, missing values read back as None.
+        """
+        return self._completed[key]
+
+    def complete(self, key: str, rows: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Records a key as complete along with its result rows.
+
+        Args:
+            key (str): The key to record, typically a login.
+            rows (Optional[List[Dict[str, Any]]]): The result rows of the key.
+        """
+        self._append({"type": "complete", "key": key, "rows": [dict(row) for row in rows or []]})
+
+    def progress(self, key: str) -> Tuple[Optional[str], bool, Any]:
+        """
+        Returns the last recorded position of a pagination.
+
+        Args:
+            key (str): The key of the pagination, such as "login/issueComments".
+
+        Returns:
+            Tuple[Optional[str], bool, Any]: The end cursor of the last processed page (None if nothing was recorded),
+            whether more pages follow, and the state accumulated over the processed pages.
+        """
+        record = self._progress.get(key)
+        if record is None:
+            return None, True, None
+        return record["cursor"], record["has_next"], record["state"]
+
+    def save_progress(self, key: str, cursor: Optional[str], has_next: bool, state: Any = None) -> None:
+        """
+        Records the position of a pagination after a page has been processed.
+
+        Args:
+            key (str): The key of the pagination.
+            cursor (Optional[str]): The end cursor of the processed page.
+            has_next (bool): Whether more pages follow.
+            state (Any): JSON serialisable state accumulated over the processed pages, such as a counter.
+        """
+        self._append({"type": "progress", "key": key, "cursor": cursor, "has_next": has_next, "state": state})
+
+
+def fold_pages(client: Any, query: PaginatedQuery, substitutions: Dict[str, Any], fold: Callable[[Dict[str, Any], Any], Any],
+               state: Any, stop_predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+               checkpoint: Optional[CheckpointStore] = None, key: Optional[str] = None) -> Any:
+    """
+    Folds the pages of a paginated query into a state. With a checkpoint store, the position and state are recorded
+    after every page, and a pagination recorded by an earlier run resumes after its last processed page.
+
+    Args:
+        client (Client): The client to execute the query with.
+        query (PaginatedQuery): The paginated query, which is left untouched and can be shared between paginations.
+        substitutions (Dict[str, Any]): Substitutions to apply to the query template.
+        fold (Callable[[Dict[str, Any], Any], Any]): Combines a page with the state so far into the new state.
+        state (Any): The initial state, JSON serialisable when a checkpoint store is given.
+        stop_predicate (Optional[Callable[[Dict[str, Any]], bool]]): Ends the pagination after the first page it accepts.
+        checkpoint (Optional[CheckpointStore]): The store to resume from and record to.
+        key (Optional[str]): The key of the pagination in the store.
+
+    Returns:
+        Any: The state after the last page.
+    """
+    pagination = PaginationState()
+    if checkpoint is not None:
+        cursor, has_next, saved = checkpoint.progress(key)
+        if not has_next:
+            return saved
+        if cursor is not None:
+            pagination = PaginationState(cursor)
+            state = saved
+    for response in client.execute(query=query, substitutions=substitutions, stop_predicate=stop_predicate,
+                                   state=pagination):
+        state = fold(response, state)
+        if checkpoint is not None:
+            checkpoint.save_progress(key, pagination.end_cursor, pagination.has_next(), state)
+    return state
@@ -0,0 +1,112 @@
+from collections import Counter
+from functools import lru_cache
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from backend.app.services.github_query.queries.time_range_contributions.user_contributions_collection import \
+    UserContributionsCollectionWindows
+from backend.app.services.github_query.utils.checkpoint import JsonLinesStore
+from backend.app.services.github_query.utils.timestamps import TIME_FORMAT, time_key
+
+CONTRIBUTION_KEYS = ("res_con", "commit", "issue", "pr", "pr_review", "repository")
+
+# how long after its end a window is still queried, in case GitHub has not settled its counts yet
+SETTLE_TIME = timedelta(days=1)
+
+
+class ContributionWindowStore(JsonLinesStore):
+    """
+    ContributionWindowStore keeps the contributionsCollection counts of time windows that ended in the past in an
+    append-only JSON lines file on local disk. The counts of such a window can no longer change, so a user's past
+    years are fetched once and later runs only query the window reaching into the present.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens a store file, loading the windows of earlier runs if it exists.
+
+        Args:
+            path (str): The path of the store file.
+        """
+        self._windows: Dict[Tuple[str, str, str], Dict[str, int]] = {}
+        super().__init__(path)
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """
+        Records the counts of a window.
+        """
+        self._windows[(record["login"], record["start"], record["end"])] = record["counts"]
+
+    def get(self, login: str, window: Tuple[str, str]) -> Optional[Counter]:
+        """
+        Looks up the contributions of a user in a window.
+
+        Args:
+            login (str): The GitHub login of the user.
+            window (Tuple[str, str]): The (start, end) bounds of the window.
+
+        Returns:
+            Optional[Counter]: The contributions, or None if the window is not stored.
+        """
+        counts = self._windows.get((login, *window))
+        return None if counts is None else Counter(counts)
+
+    def put(self, login: str, window: Tuple[str, str], contributions: Counter) -> None:
+        """
+        Records the contributions of a user in a window that has ended.
+
+        Args:
+            login (str): The GitHub login of the user.
+            window (Tuple[str, str]): The (start, end) bounds of the window.
+            contributions (Counter): The contributions of the user in the window.
+        """
+        self._append({"login": login, "start": window[0], "end": window[1],
+                      "counts": {key: contributions[key] for key in CONTRIBUTION_KEYS}})
+
+
+@lru_cache(maxsize=None)
+def _windows_query(windows: int) -> UserContributionsCollectionWindows:
+    """
+    Returns the query of a number of windows, one instance per number, so that its template is compiled only once.
+    """
+    return UserContributionsCollectionWindows(windows)
+
+
+def windowed_contributions(client: Any, login: str, windows: List[Tuple[str, str]],
+                           store: Optional[ContributionWindowStore] = None, now: Optional[str] = None) -> Counter:
+    """
+    Sums the contributions of a user over time windows, fetching every window missing from the store in a single
+    request. Windows that ended more than SETTLE_TIME before now are added to the store.
+
+    Args:
+        client (Client): The client to execute the query with.
+        login (str): The GitHub login of the user.
+        windows (List[Tuple[str, str]]): The (start, end) bounds of each window, such as the yearly_windows of a span.
+        store (Optional[ContributionWindowStore]): The store of windows that have ended.
+        now (Optional[str]): The current time, formatted as "%Y-%m-%dT%H:%M:%SZ", the current UTC time by default.
+
+    Returns:
+        Counter: The contributions of all windows, with every contribution type present even if zero.
+    """
+    contributions = Counter(dict.fromkeys(CONTRIBUTION_KEYS, 0))
+    missing = []
+    for window in windows:
+        stored = store.get(login, window) if store is not None else None
+        if stored is None:
+            missing.append(window)
+        else:
+            contributions.update(stored)
+    if not missing:
+        return contributions
+
+    response = client.execute(query=_windows_query(len(missing)),
+                              substitutions=UserContributionsCollectionWindows.window_substitutions(login, missing))
+    settled = (datetime.strptime(now, TIME_FORMAT) if now else datetime.utcnow()) - SETTLE_TIME
+    settled = settled.strftime(TIME_FORMAT)
+    for window, counts in zip(missing, UserContributionsCollectionWindows.window_contributions(response)):
+        contributions.update(counts)
+        if store is not None and time_key(window[1]) < settled:
+            store.put(login, window, counts)
+    return contributions
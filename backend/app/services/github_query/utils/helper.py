@@ -2,10 +2,13 @@ import os
 import re
 import string
 import random
-from datetime import datetime, timedelta
+from datetime import timedelta
+from typing import Optional
 from backend.app.services.github_query.github_graphql.query import Query
-from backend.app.services.github_query.github_graphql.client import Client
-from backend.app.services.github_query.queries.costs.query_cost import QueryCost
+from backend.app.services.github_query.github_graphql.client import Client, QueryFailedException
+from backend.app.services.github_query.queries.costs.rate_limit import RateLimit
+from backend.app.services.github_query.queries.costs.cost_estimator import estimate_cost
+from backend.app.services.github_query.utils.timestamps import parse_time, time_key
 
 
 def print_methods(obj: object) -> None:
@@ -74,7 +77,7 @@ def add_by_days(time_string: str, days: int) -> str:
     time_format = "%Y-%m-%dT%H:%M:%SZ"
 
     # Convert the string to a datetime object
-    time = datetime.strptime(time_string, time_format)
+    time = parse_time(time_string)
 
     # Add a duration of given number of days
     new_time = time + timedelta(days=days)
@@ -97,7 +100,7 @@ def minus_by_days(time_string: str, days: int) -> str:
     time_format = "%Y-%m-%dT%H:%M:%SZ"
 
     # Convert the string to a datetime object
-    time = datetime.strptime(time_string, time_format)
+    time = parse_time(time_string)
 
     # Minus a duration of given number of days
     new_time = time - timedelta(days=days)
@@ -119,10 +122,7 @@ def in_time_period(time: str, start: str, end: str) -> bool:
     Returns:
         bool: True if the time is within the period; False otherwise.
     """
-    time = datetime.strptime(time, '%Y-%m-%dT%H:%M:%SZ')
-    start = datetime.strptime(start, '%Y-%m-%dT%H:%M:%SZ')
-    end = datetime.strptime(end, '%Y-%m-%dT%H:%M:%SZ')
-    return end >= time >= start
+    return time_key(end) >= time_key(time) >= time_key(start)
 
 
 def created_before(created: str, time: str) -> bool:
@@ -136,9 +136,7 @@ def created_before(created: str, time: str) -> bool:
     Returns:
         bool: True if created before the specified time; False otherwise.
     """
-    time = datetime.strptime(time, '%Y-%m-%dT%H:%M:%SZ')
-    created = datetime.strptime(created, '%Y-%m-%dT%H:%M:%SZ')
-    return created < time
+    return time_key(created) < time_key(time)
 
 def created_after(created: str, time: str) -> bool:
     """
@@ -151,9 +149,22 @@ def created_after(created: str, time: str) -> bool:
     Returns:
         bool: True if created after the specified time; False otherwise.
     """
-    time = datetime.strptime(time, '%Y-%m-%dT%H:%M:%SZ')
-    created = datetime.strptime(created, '%Y-%m-%dT%H:%M:%SZ')
-    return created > time
+    return time_key(created) > time_key(time)
+
+
+def reached_time(nodes: list, time: str) -> bool:
+    """
+    Determines if a page of nodes ordered by creation time has reached a certain time, meaning later pages
+    only hold nodes created at or after it. Used as a stop predicate for paginated queries.
+
+    Args:
+        nodes (list): The nodes of a page, each containing a "createdAt" field, in ascending order of creation.
+        time (str): The cutoff time.
+
+    Returns:
+        bool: True if the last node was created at or after the specified time; False otherwise.
+    """
+    return bool(nodes) and not created_before(nodes[-1]["createdAt"], time)
 
 
 def write_csv(file: str, data_row: str) -> None:
@@ -185,9 +196,33 @@ def get_owner_and_name(link: str) -> tuple:
     return match.group("owner"), match.group("repo")
 
 
+def not_found_data(error: QueryFailedException) -> Optional[dict]:
+    """
+    Returns the data of a failed query whose only errors are nodes that do not exist, such as an unknown login.
+    Any other failure, such as a gateway error, rate limiting or a malformed body, may succeed when retried.
+
+    Args:
+        error (QueryFailedException): The failure of the query.
+
+    Returns:
+        Optional[dict]: The data of the response, None if the failure is not only missing nodes.
+    """
+    if error.response.status_code != 200:
+        return None
+    try:
+        body = error.response.json()
+    except ValueError:
+        return None
+    errors = body.get('errors') or []
+    if not errors or any(entry.get('type') != 'NOT_FOUND' for entry in errors):
+        return None
+    return body.get('data')
+
+
 def have_rate_limit(client: Client, query: Query, args: dict) -> list:
     """
-    Determines whether enough rate limit remains to execute a given query.
+    Determines whether enough rate limit remains to execute a given query. The cost of the query is estimated
+    locally, only the remaining rate limit is asked from the server, by a dry run that costs nothing.
     
     Args:
         client (Client): The client to use for execution.
@@ -197,10 +232,8 @@ def have_rate_limit(client: Client, query: Query, args: dict) -> list:
     Returns:
         list: A list containing a boolean indicating whether the rate limit is sufficient and the reset time.
     """
-    query_string = query.substitute(**args).__str__()
-    match = re.search(r'query\s*{(?P<content>.+)}', query_string)
-    rate_limit = client.execute(query=QueryCost(match.group('content')), substitutions={"dryrun": True})['rateLimit']
-    cost = rate_limit['cost']
+    cost = estimate_cost(query.substitute(**args).__str__())
+    rate_limit = client.execute(query=RateLimit(), substitutions={"dryrun": True})['rateLimit']
     remaining = rate_limit['remaining']
     reset_at = rate_limit['resetAt']
     if cost < remaining - 5:
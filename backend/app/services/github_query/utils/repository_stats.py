@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+from backend.app.services.github_query.queries.contributions.user_repositories import UserRepositories, \
+    UserRepositoriesAllCategories
+from backend.app.services.github_query.utils.checkpoint import CheckpointStore, fold_pages
+
+# shared by every user, so that the template of the query is compiled only once
+REPOSITORIES = UserRepositoriesAllCategories()
+
+
+def repository_stats(client: Any, login: str, end: str, checkpoint: Optional[CheckpointStore] = None) -> Dict[str, Any]:
+    """
+    Collects the statistics of the four repository categories of a user in one pass over the repositories,
+    bucketing each repository locally.
+
+    Args:
+        client (Client): The client to execute the query with.
+        login (str): The GitHub login of the user.
+        end (str): The time up to which repositories are counted, formatted as "%Y-%m-%dT%H:%M:%SZ".
+        checkpoint (Optional[CheckpointStore]): The store to resume the pagination from, keyed by
+                                                "<login>/repositories".
+
+    Returns:
+        Dict[str, Any]: The columns of the categories, such as Atotal_count, Afork_count and type_A_lang.
+    """
+    stats = {"repo_stats": {category: {"total_count": 0, "fork_count": 0, "stargazer_count": 0,
+                                       "watchers_count": 0, "total_size": 0}
+                            for category in UserRepositoriesAllCategories.CATEGORIES},
+             "lang_stats": {category: {} for category in UserRepositoriesAllCategories.CATEGORIES}}
+
+    def categorize(response, stats):
+        UserRepositoriesAllCategories.categorized_repository_stats(
+            UserRepositories.user_repositories(response), login, stats["repo_stats"], stats["lang_stats"],
+            end, end, 'before')
+        return stats
+
+    stats = fold_pages(client, REPOSITORIES,
+                       {"user": login, "pg_size": 100, "order_by": {"field": "CREATED_AT", "direction": "ASC"}},
+                       categorize, stats, checkpoint=checkpoint, key=f"{login}/repositories")
+    columns = {}
+    for category in UserRepositoriesAllCategories.CATEGORIES:
+        columns.update({category + key: value for key, value in stats["repo_stats"][category].items()})
+        columns[f"type_{category}_lang"] = stats["lang_stats"][category]
+    return columns
@@ -0,0 +1,75 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+import pandas as pd
+
+
+class ResultCollector:
+    """
+    ResultCollector accumulates the rows mined one at a time into per-column buffers and materialises them
+    as a DataFrame only on demand, instead of concatenating a new frame for every row.
+    """
+
+    def __init__(self, columns: List[str], dtypes: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Initializes an empty collector.
+
+        Args:
+            columns (List[str]): The columns of the result, in order. Rows with further keys add columns at the end.
+            dtypes (Optional[Dict[str, Any]]): The dtypes of some columns in the materialised frame.
+        """
+        self._buffers: Dict[str, List[Any]] = {column: [] for column in columns}
+        self._dtypes = dtypes or {}
+        self._length = 0
+        self._frame: Optional[pd.DataFrame] = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, row: Mapping[str, Any]) -> None:
+        """
+        Appends a row. Columns missing from the row are filled with pd.NA.
+
+        Args:
+            row (Mapping[str, Any]): The values of the row, keyed by column.
+        """
+        for column in row:
+            if column not in self._buffers:
+                # a new column, missing from every earlier row
+                self._buffers[column] = [pd.NA] * self._length
+        for column, buffer in self._buffers.items():
+            buffer.append(row.get(column, pd.NA))
+        self._length += 1
+        self._frame = None
+
+    def extend(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        """
+        Appends rows in order.
+
+        Args:
+            rows (Iterable[Mapping[str, Any]]): The rows to append.
+        """
+        for row in rows:
+            self.append(row)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Returns the collected rows, each as a dictionary keyed by column.
+
+        Returns:
+            List[Dict[str, Any]]: The rows, in order of collection.
+        """
+        columns = list(self._buffers)
+        return [dict(zip(columns, values)) for values in zip(*self._buffers.values())]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Materialises the collected rows. The frame is cached until the next row is collected.
+
+        Returns:
+            pd.DataFrame: The rows, with a default index.
+        """
+        if self._frame is None:
+            frame = pd.DataFrame(self._buffers, columns=list(self._buffers))
+            if self._dtypes:
+                frame = frame.astype(self._dtypes)
+            self._frame = frame
+        return self._frame
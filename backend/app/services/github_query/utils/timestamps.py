@@ -0,0 +1,88 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterable
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# the fixed-width form GitHub returns timestamps in, which orders chronologically as plain strings; days past the
+# 28th are left to strptime, which knows the length of each month
+_CANONICAL = re.compile(r"(?!0000)\d{4}-(0[1-9]|1[0-2])-(0[1-9]|1\d|2[0-8])T([01]\d|2[0-3]):[0-5]\d:[0-5]\dZ")
+
+
+@lru_cache(maxsize=4096)
+def parse_time(time_string: str) -> datetime:
+    """
+    Parses a time string formatted as "%Y-%m-%dT%H:%M:%SZ". Results are cached, as the same cutoff times
+    are parsed again for every node and every page.
+
+    Args:
+        time_string (str): The time string to parse.
+
+    Returns:
+        datetime: The parsed time.
+
+    Raises:
+        ValueError: If the string does not match the format.
+    """
+    return datetime.strptime(time_string, TIME_FORMAT)
+
+
+@lru_cache(maxsize=4096)
+def is_time_format(time_string: str) -> bool:
+    """
+    Checks if a string matches the format "%Y-%m-%dT%H:%M:%SZ". Results are cached, as the same substitution
+    values are checked again for every page of a query.
+
+    Args:
+        time_string (str): The string to check.
+
+    Returns:
+        bool: True if the string matches the time format, False otherwise.
+    """
+    try:
+        parse_time(time_string)
+        return True
+    except ValueError:
+        return False
+
+
+def time_key(time_string: str) -> str:
+    """
+    Returns a key of a time string that compares in chronological order. The canonical form is its own key,
+    which saves parsing the many timestamps of the nodes of a page; other forms strptime accepts, such as
+    unpadded fields, are parsed and formatted into the canonical form, and invalid times raise as they do there.
+
+    Args:
+        time_string (str): A time string formatted as "%Y-%m-%dT%H:%M:%SZ".
+
+    Returns:
+        str: The canonical form of the time.
+
+    Raises:
+        ValueError: If the string does not match the format.
+    """
+    if _CANONICAL.fullmatch(time_string):
+        return time_string
+    return parse_time(time_string).strftime(TIME_FORMAT)
+
+
+def count_leading_before(times: Iterable[str], time: str) -> int:
+    """
+    Counts the timestamps before a cutoff time up to the first one at or after it, for nodes in ascending
+    order of creation. The timestamps after that one are neither counted nor parsed.
+
+    Args:
+        times (Iterable[str]): The timestamps, in ascending order.
+        time (str): The cutoff time.
+
+    Returns:
+        int: The number of leading timestamps strictly before the cutoff.
+    """
+    cutoff = time_key(time)
+    count = 0
+    for created in times:
+        if time_key(created) >= cutoff:
+            break
+        count += 1
+    return count
@@ -0,0 +1,40 @@
+"""
+Micro-benchmark of rendering paginated queries, comparing the compiled templates of Query.substitute with
+re-rendering the query tree on every page as the client used to.
+
+Run from the repository root:
+    python -m backend.scripts.benchmark_query_render
+"""
+import timeit
+from string import Template
+from backend.app.services.github_query.github_graphql.query import Query
+from backend.app.services.github_query.queries.contributions.user_repositories import UserRepositoriesAllCategories
+from backend.app.services.github_query.queries.comments.user_issue_comments import UserIssueComments
+
+PAGES = 100
+ROUNDS = 20
+
+
+def render_uncompiled(query, substitutions):
+    return Template(str(query)).substitute(**Query.convert_dict(substitutions))
+
+
+def paginate(query, substitutions, render):
+    query.paginator.has_next_page = True
+    query.paginator.args.pop("after", None)
+    for page in range(PAGES):
+        render(query, substitutions)
+        query.paginator.update_paginator(True, f"Y3Vyc29yOnYyOpK5MjAyMS0wMS0wMVQwMDowMDowMFo{page}")
+
+
+def benchmark(name, query, substitutions):
+    uncompiled = min(timeit.repeat(lambda: paginate(query, substitutions, render_uncompiled), number=1, repeat=ROUNDS))
+    compiled = min(timeit.repeat(lambda: paginate(query, substitutions, lambda q, s: q.substitute(**s)), number=1, repeat=ROUNDS))
+    print(f"{name:32} {PAGES} pages: uncompiled {uncompiled * 1000:8.2f} ms, "
+          f"compiled {compiled * 1000:8.2f} ms, {uncompiled / compiled:5.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark("UserIssueComments", UserIssueComments(), {"user": "octocat", "pg_size": 100})
+    benchmark("UserRepositoriesAllCategories", UserRepositoriesAllCategories(),
+              {"user": "octocat", "pg_size": 100, "order_by": {"field": "CREATED_AT", "direction": "ASC"}})
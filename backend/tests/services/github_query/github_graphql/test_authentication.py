@@ -1,5 +1,7 @@
+import threading
 import pytest
-from backend.app.services.github_query.github_graphql.authentication import Authenticator, PersonalAccessTokenAuthenticator 
+from datetime import datetime, timedelta
+from backend.app.services.github_query.github_graphql.authentication import Authenticator, PersonalAccessTokenAuthenticator, TokenPoolAuthenticator
 
 def test_authenticator_raises():
     """
@@ -24,3 +26,67 @@ def test_personal_access_token_authenticator():
     expected_header = {"Authorization": f"token {token}"}
     assert authenticator.get_authorization_header() == expected_header, "The authorization header should be formatted correctly."
 
+def test_single_credential_cannot_rotate():
+    """
+    Test that an authenticator holding a single credential asks the caller to wait instead of rotating.
+    """
+    authenticator = PersonalAccessTokenAuthenticator(token="test_token_123")
+    authenticator.update_rate_limit(authenticator.get_authorization_header(), 0, "2999-01-01T00:00:00Z")
+    assert authenticator.rotate(authenticator.get_authorization_header(), "2999-01-01T00:00:00Z") is False
+
+def test_token_pool_requires_tokens():
+    """
+    Test that an empty token pool is rejected.
+    """
+    with pytest.raises(ValueError):
+        TokenPoolAuthenticator([])
+
+def test_token_pool_picks_most_headroom():
+    """
+    Test that the token pool hands out the token with the most remaining points.
+    """
+    pool = TokenPoolAuthenticator.from_tokens(["a", "b", "c"])
+    pool.update_rate_limit({"Authorization": "token a"}, 100, "2999-01-01T00:00:00Z")
+    pool.update_rate_limit({"Authorization": "token b"}, 4000, "2999-01-01T00:00:00Z")
+    pool.update_rate_limit({"Authorization": "token c"}, 2000, "2999-01-01T00:00:00Z")
+    assert pool.get_authorization_header() == {"Authorization": "token b"}, "The token with most headroom should be used."
+
+def test_token_pool_spreads_unknown_tokens():
+    """
+    Test that tokens without a known budget are handed out in turn.
+    """
+    pool = TokenPoolAuthenticator.from_tokens(["a", "b"])
+    headers = [pool.get_authorization_header()["Authorization"] for _ in range(4)]
+    assert headers == ["token a", "token b", "token a", "token b"], "Untried tokens should be rotated through."
+
+def test_token_pool_rotates_exhausted_token():
+    """
+    Test that an exhausted token is skipped until its window resets.
+    """
+    pool = TokenPoolAuthenticator.from_tokens(["a", "b"])
+    pool.update_rate_limit({"Authorization": "token b"}, 10, "2999-01-01T00:00:00Z")
+    assert pool.rotate({"Authorization": "token a"}, "2999-01-01T00:00:00Z") is True
+    assert pool.get_authorization_header() == {"Authorization": "token b"}, "The exhausted token should be skipped."
+
+    # a token whose window has already reset counts as full again
+    pool.update_rate_limit({"Authorization": "token a"}, 0, "2000-01-01T00:00:00Z")
+    assert pool.get_authorization_header() == {"Authorization": "token a"}, "A reset token should be used again."
+
+def test_token_pool_blocks_until_a_token_frees_up():
+    """
+    Test that callers block while every token is exhausted and resume once a budget is reported.
+    """
+    pool = TokenPoolAuthenticator.from_tokens(["a", "b"])
+    reset_at = (datetime.utcnow() + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    pool.rotate({"Authorization": "token a"}, reset_at)
+    pool.rotate({"Authorization": "token b"}, reset_at)
+
+    result = {}
+    waiter = threading.Thread(target=lambda: result.update(pool.get_authorization_header()))
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive(), "The caller should wait while every token is exhausted."
+
+    pool.update_rate_limit({"Authorization": "token b"}, 5000, reset_at)
+    waiter.join(timeout=2)
+    assert result == {"Authorization": "token b"}, "The caller should resume with the token that freed up."
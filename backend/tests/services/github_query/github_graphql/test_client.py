@@ -1,11 +1,14 @@
+import asyncio
+import threading
+import time
 import pytest
 import requests_mock
 from unittest.mock import MagicMock
 from datetime import datetime
 from requests.exceptions import Timeout
-from backend.app.services.github_query.github_graphql.client import Client, InvalidAuthenticationError, QueryFailedException, RESTClient
-from backend.app.services.github_query.github_graphql.authentication import PersonalAccessTokenAuthenticator 
-from backend.app.services.github_query.github_graphql.query import Query, PaginatedQuery
+from backend.app.services.github_query.github_graphql.client import Client, AsyncClient, InvalidAuthenticationError, QueryFailedException, RESTClient
+from backend.app.services.github_query.github_graphql.authentication import PersonalAccessTokenAuthenticator, TokenPoolAuthenticator
+from backend.app.services.github_query.github_graphql.query import QueryNode, QueryNodePaginator, Query, PaginatedQuery, PaginationState
 
 @pytest.fixture
 def valid_token():
@@ -140,6 +143,26 @@ class TestClient:
         assert query.paginator.update_paginator.call_count == 2, "update_paginator should be called twice, once per page"
         query.paginator.update_paginator.assert_called_with(False, "cursor2")  # Last call should reflect the end of pagination
 
+    def test_execution_generator_stop_predicate(self, github_client):
+        """Test that pagination stops after the first page the stop predicate accepts."""
+        query = MagicMock()
+        # The server reports more pages throughout, so only the predicate can end the pagination
+        query.paginator.has_next.side_effect = lambda: query.paginator.update_paginator.call_args is None or \
+            query.paginator.update_paginator.call_args[0][0]
+        query.path = []
+        github_client._execute = MagicMock()
+        github_client._execute.side_effect = [
+            {"pageInfo": {"endCursor": "cursor1", "hasNextPage": True}, "nodes": [{"createdAt": "2021-01-01T00:00:00Z"}]},
+            {"pageInfo": {"endCursor": "cursor2", "hasNextPage": True}, "nodes": [{"createdAt": "2023-01-01T00:00:00Z"}]},
+            {"pageInfo": {"endCursor": "cursor3", "hasNextPage": True}, "nodes": [{"createdAt": "2024-01-01T00:00:00Z"}]},
+        ]
+
+        results = list(github_client._execution_generator(
+            query, {}, lambda page: page["nodes"][-1]["createdAt"] >= "2022-01-01T00:00:00Z"))
+
+        assert len(results) == 2, "Should yield the page that hit the predicate and nothing after it."
+        query.paginator.update_paginator.assert_called_with(False, "cursor2")
+
     def test_client_execute_success(self, github_client, requests_mock):
         """Test successful execution of a query"""
         requests_mock.post(github_client._base_path(), [
@@ -157,4 +180,429 @@ class TestClient:
         ])
         with pytest.raises(QueryFailedException) as excinfo:
             github_client.execute(Query("query { viewer { login }}"), {})
-        assert "Query failed with code" in str(excinfo.value), "QueryFailedException should contain the right error message."
\ No newline at end of file
+        assert "Query failed with code" in str(excinfo.value), "QueryFailedException should contain the right error message."
+
+class TestClientPaginationState:
+    def test_concurrent_paginations_share_one_query(self, github_client, requests_mock):
+        """Test that threads paginating one query through their own states each follow their own cursors."""
+        query = PaginatedQuery(fields=[QueryNode("user", args={"login": "$user"}, fields=[
+            QueryNodePaginator("comments", args={"first": 1}, fields=[
+                "nodes", QueryNode("pageInfo", fields=["endCursor", "hasNextPage"])])])])
+
+        def respond(request, context):
+            body = request.json()["query"]
+            if "rateLimit(dryRun: true)" in body:
+                return {"data": {"rateLimit": {"cost": 1, "remaining": 5000, "resetAt": "2021-01-01T00:00:00Z"}}}
+            login = body.split('login: "')[1].split('"')[0]
+            page = int(body.split('after: "')[1].split('"')[0][len(login):]) + 1 if 'after: "' in body else 0
+            time.sleep(0.01)
+            return {"data": {"user": {"comments": {"nodes": [f"{login}{page}"], "pageInfo": {
+                "endCursor": f"{login}{page}", "hasNextPage": page < 4}}}}}
+        requests_mock.post(github_client._base_path(), json=respond)
+
+        results = {}
+
+        def paginate(login):
+            pages = github_client.execute(query, {"user": login}, state=PaginationState())
+            results[login] = [page["user"]["comments"]["nodes"][0] for page in pages]
+        threads = [threading.Thread(target=paginate, args=(login,)) for login in ("alice", "bob", "carol")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for login in ("alice", "bob", "carol"):
+            assert results[login] == [f"{login}{page}" for page in range(5)], "Each pagination should follow its own cursors."
+        assert "after" not in query.paginator.args, "The shared query should be left untouched."
+
+class TestClientPrefetch:
+    @staticmethod
+    def paged_query(pages):
+        """A mocked paginated query whose paginator follows the pages handed out by the fake _execute."""
+        query = MagicMock()
+        query.path = []
+        query.paginator.has_next.side_effect = lambda: query.paginator.update_paginator.call_args is None or \
+            query.paginator.update_paginator.call_args[0][0]
+        responses = [{"pageInfo": {"endCursor": f"cursor{i}", "hasNextPage": i < pages - 1}, "nodes": [i]}
+                     for i in range(pages)]
+        return query, responses
+
+    def test_prefetch_yields_every_page_in_order(self, github_client):
+        query, responses = self.paged_query(4)
+        github_client._execute = MagicMock(side_effect=responses)
+
+        results = list(github_client._prefetching_generator(query, {}, prefetch=2))
+
+        assert [page["nodes"][0] for page in results] == [0, 1, 2, 3], "Pages should be yielded in cursor order."
+        query.paginator.update_paginator.assert_called_with(False, "cursor3")
+
+    def test_prefetch_overlaps_next_fetch(self, github_client):
+        query, responses = self.paged_query(2)
+        second_fetch = threading.Event()
+
+        def fake_execute(query, substitutions, state=None):
+            if github_client._execute.call_count == 2:
+                second_fetch.set()
+            return responses[github_client._execute.call_count - 1]
+        github_client._execute = MagicMock(side_effect=fake_execute)
+
+        pages = github_client._prefetching_generator(query, {}, prefetch=1)
+        next(pages)
+        assert second_fetch.wait(timeout=2), "The second page should be requested while the first is processed."
+        assert [page["nodes"][0] for page in pages] == [1]
+
+    def test_prefetch_raises_failed_page(self, github_client):
+        query, responses = self.paged_query(3)
+        github_client._execute = MagicMock(side_effect=[responses[0], QueryFailedException(MagicMock(status_code=502), "q")])
+
+        pages = github_client._prefetching_generator(query, {}, prefetch=2)
+        assert next(pages)["nodes"] == [0], "Pages before the failure should still be yielded."
+        with pytest.raises(QueryFailedException):
+            next(pages)
+
+    def test_prefetch_stops_when_consumer_leaves(self, github_client):
+        query, responses = self.paged_query(50)
+        github_client._execute = MagicMock(side_effect=responses)
+
+        pages = github_client._prefetching_generator(query, {}, prefetch=1)
+        next(pages)
+        pages.close()
+        time.sleep(0.3)
+        assert github_client._execute.call_count < 5, "The buffer should cap how far the fetcher runs ahead."
+
+    def test_async_prefetch_yields_every_page(self, authenticator):
+        client = AsyncClient(authenticator=authenticator)
+        query, responses = self.paged_query(3)
+        pages = iter(responses)
+
+        async def fake_execute(query, substitutions, state=None):
+            return next(pages)
+        client._execute = fake_execute
+
+        async def run():
+            return [page async for page in client._prefetching_generator(query, {}, prefetch=2)]
+
+        results = asyncio.run(run())
+        client.close()
+        assert [page["nodes"][0] for page in results] == [0, 1, 2], "Should yield every page in order."
+
+
+class TestClientSession:
+    def test_client_reuses_one_session(self, github_client, requests_mock):
+        """Test that every request of the client goes through the same pooled session."""
+        requests_mock.post(github_client._base_path(), json={'data': 'success'}, status_code=200)
+        session = github_client._session
+        github_client._retry_request(1, 1, "query { viewer { login }}", {})
+        github_client._retry_request(1, 1, "query { viewer { login }}", {})
+        assert github_client._session is session, "The client should keep a single long-lived session."
+        assert requests_mock.call_count == 2, "Both requests should be sent through the session."
+
+    def test_client_pool_size(self, authenticator):
+        """Test that the client's own session mounts adapters with the configured pool size."""
+        client = Client(authenticator=authenticator, pool_connections=2, pool_maxsize=32)
+        adapter = client._session.get_adapter("https://api.github.com/graphql")
+        assert adapter._pool_connections == 2, "The adapter should cache the configured number of pools."
+        assert adapter._pool_maxsize == 32, "The adapter should keep the configured number of connections."
+
+    def test_injected_session(self, authenticator, requests_mock):
+        """Test that an injected session is used for requests and left open on close."""
+        session = MagicMock()
+        session.post.return_value.status_code = 200
+        client = Client(authenticator=authenticator, session=session)
+        client._retry_request(1, 1, "query { viewer { login }}", {})
+        client.close()
+        assert session.post.call_count == 1, "Requests should be sent through the injected session."
+        session.close.assert_not_called()
+
+    def test_context_manager_closes_own_session(self, authenticator):
+        """Test that leaving the context manager closes the session built by the client."""
+        with Client(authenticator=authenticator) as client:
+            client._session = MagicMock(wraps=client._session)
+        client._session.close.assert_called_once()
+
+    def test_rest_client_uses_session(self, authenticator):
+        """Test that the REST client sends GET requests through its session."""
+        session = MagicMock()
+        session.get.return_value.headers = {"X-RateLimit-Remaining": "100"}
+        session.get.return_value.status_code = 200
+        session.get.return_value.json.return_value = {"login": "octocat"}
+        with RESTClient(authenticator=authenticator, session=session) as client:
+            assert client.get("/users/octocat") == {"login": "octocat"}
+        session.get.assert_called_once_with("https://api.github.com/users/octocat", headers=authenticator.get_authorization_header())
+        session.close.assert_not_called()
+
+
+class TestClientInlineRateLimit:
+    @pytest.fixture
+    def inline_client(self, authenticator):
+        return Client(authenticator=authenticator, rate_limit_mode="inline", dry_run_threshold=100)
+
+    def test_invalid_rate_limit_mode(self, authenticator):
+        """Test that an unknown rate limit mode is rejected."""
+        with pytest.raises(ValueError):
+            Client(authenticator=authenticator, rate_limit_mode="unknown")
+
+    def test_inline_skips_dry_run_with_budget(self, inline_client, requests_mock):
+        """Test that a known, healthy budget sends only the real query with rateLimit selected."""
+        inline_client._rate_limits["token valid_token_123"] = {"cost": 1, "remaining": 4000, "resetAt": "2999-01-01T00:00:00Z"}
+        requests_mock.post(inline_client._base_path(), json={
+            "data": {"viewer": {"login": "octocat"}, "clientRateLimit": {"cost": 1, "remaining": 3999, "resetAt": "2999-01-01T00:00:00Z"}}
+        })
+        response = inline_client._execute("query { viewer { login }}", {})
+        assert response == {"viewer": {"login": "octocat"}}, "rateLimit should be stripped from the returned data."
+        assert requests_mock.call_count == 1, "No dry run should be sent while the budget is healthy."
+        assert "clientRateLimit: rateLimit { cost remaining resetAt }" in requests_mock.last_request.json()["query"]
+        assert inline_client._rate_limits["token valid_token_123"]["remaining"] == 3999, "The local budget should follow the response."
+
+    def test_inline_dry_runs_unknown_budget(self, inline_client, requests_mock):
+        """Test that the first query of a client is dry-run because its budget is unknown."""
+        requests_mock.post(inline_client._base_path(), [
+            {'json': {"data": {"rateLimit": {"cost": 1, "remaining": 5000, "resetAt": "2999-01-01T00:00:00Z"}}}},
+            {'json': {"data": {"viewer": {"login": "octocat"}, "clientRateLimit": {"cost": 1, "remaining": 4999, "resetAt": "2999-01-01T00:00:00Z"}}}}
+        ])
+        inline_client._execute("query { viewer { login }}", {})
+        assert requests_mock.call_count == 2, "The unknown budget should be priced with one dry run."
+        assert "dryRun: true" in requests_mock.request_history[0].json()["query"]
+
+    def test_inline_dry_runs_near_threshold(self, inline_client, requests_mock):
+        """Test that a budget close to the threshold falls back to a dry run."""
+        inline_client._rate_limits["token valid_token_123"] = {"cost": 1, "remaining": 50, "resetAt": "2999-01-01T00:00:00Z"}
+        requests_mock.post(inline_client._base_path(), [
+            {'json': {"data": {"rateLimit": {"cost": 1, "remaining": 50, "resetAt": "2999-01-01T00:00:00Z"}}}},
+            {'json': {"data": {"viewer": {"login": "octocat"}, "clientRateLimit": {"cost": 1, "remaining": 49, "resetAt": "2999-01-01T00:00:00Z"}}}}
+        ])
+        inline_client._execute("query { viewer { login }}", {})
+        assert requests_mock.call_count == 2, "A low budget should be checked with a dry run first."
+
+    def test_inline_reset_budget(self, inline_client, requests_mock):
+        """Test that a budget whose window has reset is treated as full again."""
+        inline_client._rate_limits["token valid_token_123"] = {"cost": 1, "remaining": 0, "resetAt": "2000-01-01T00:00:00Z"}
+        requests_mock.post(inline_client._base_path(), json={
+            "data": {"viewer": {"login": "octocat"}, "clientRateLimit": {"cost": 1, "remaining": 4999, "resetAt": "2999-01-01T00:00:00Z"}}
+        })
+        inline_client._execute("query { viewer { login }}", {})
+        assert requests_mock.call_count == 1, "A reset window should not be dry-run."
+
+
+class TestClientEstimatedRateLimit:
+    # 1 + 100 + 100 * 50 requests, 51 points
+    HEAVY_QUERY = "query { viewer { repositories(first: 100) { nodes { issues(first: 50) { nodes { labels(first: 60) { nodes { id } } } } } } } }"
+
+    @pytest.fixture
+    def estimate_client(self, authenticator):
+        return Client(authenticator=authenticator, rate_limit_mode="estimate")
+
+    def test_estimate_dry_runs_unknown_budget_only(self, estimate_client, requests_mock):
+        """Test that only the first query of a credential is dry-run, later ones are priced locally."""
+        requests_mock.post(estimate_client._base_path(), [
+            {'json': {"data": {"rateLimit": {"cost": 1, "remaining": 5000, "resetAt": "2999-01-01T00:00:00Z"}}}},
+            {'json': {"data": {"viewer": {"login": "octocat"}, "clientRateLimit": {"cost": 1, "remaining": 4999, "resetAt": "2999-01-01T00:00:00Z"}}}},
+            {'json': {"data": {"viewer": {"login": "octocat"}, "clientRateLimit": {"cost": 1, "remaining": 4998, "resetAt": "2999-01-01T00:00:00Z"}}}},
+        ])
+        estimate_client._execute("query { viewer { login }}", {})
+        estimate_client._execute("query { viewer { login }}", {})
+        assert requests_mock.call_count == 3, "The second query should not be dry-run."
+        assert "clientRateLimit: rateLimit { cost remaining resetAt }" in requests_mock.last_request.json()["query"]
+
+    def test_estimate_waits_when_budget_is_short(self, estimate_client, requests_mock):
+        """Test that a query estimated to cost more than the budget waits for the reset without a dry run."""
+        estimate_client._rate_limits["token valid_token_123"] = {"cost": 1, "remaining": 40, "resetAt": "2999-01-01T00:00:00Z"}
+        estimate_client._wait_for_reset = MagicMock()
+        requests_mock.post(estimate_client._base_path(), json={
+            "data": {"viewer": {}, "clientRateLimit": {"cost": 51, "remaining": 4949, "resetAt": "2999-01-01T00:00:00Z"}}
+        })
+        estimate_client._execute(self.HEAVY_QUERY, {})
+        estimate_client._wait_for_reset.assert_called_once_with("2999-01-01T00:00:00Z")
+        assert requests_mock.call_count == 1, "The query should be priced locally."
+
+
+
+class TestClientVariables:
+    def test_variables_payload(self, authenticator, requests_mock):
+        """Test that queries are sent as one typed document with the values in the variables payload."""
+        client = Client(authenticator=authenticator, use_variables=True)
+        client._dry_run = MagicMock(side_effect=lambda content, headers, *args: headers)
+        requests_mock.post("https://api.github.com/graphql", json={"data": {"user": {"login": "someone"}}})
+        query = Query(fields=[QueryNode("user", args={"login": "$user"}, fields=["login"])])
+
+        client.execute(query, {"user": "alice"})
+        client.execute(query, {"user": "bob"})
+
+        first, second = [request.json() for request in requests_mock.request_history]
+        assert first["query"] == 'query($user: String!) { user(login: $user) { login } }'
+        assert first["query"] == second["query"], "Every login should share the same document."
+        assert first["variables"] == {"user": "alice"}
+        assert second["variables"] == {"user": "bob"}
+
+    def test_variables_inline_rate_limit(self, authenticator, requests_mock):
+        """Test that the inline rateLimit selection keeps the variable declarations."""
+        client = Client(authenticator=authenticator, use_variables=True, rate_limit_mode="inline")
+        client._budget_is_low = MagicMock(return_value=False)
+        requests_mock.post("https://api.github.com/graphql", json={"data": {
+            "user": {"login": "alice"},
+            "clientRateLimit": {"cost": 1, "remaining": 4999, "resetAt": "2099-01-01T00:00:00Z"}}})
+        query = Query(fields=[QueryNode("user", args={"login": "$user"}, fields=["login"])])
+
+        assert client.execute(query, {"user": "alice"}) == {"user": {"login": "alice"}}
+        sent = requests_mock.last_request.json()
+        assert sent["query"] == 'query($user: String!) { user(login: $user) { login }  clientRateLimit: rateLimit { cost remaining resetAt } }'
+        assert sent["variables"] == {"user": "alice"}
+
+    def test_variables_dry_run(self, authenticator, requests_mock):
+        """Test that the dry run prices the document with its variables."""
+        client = Client(authenticator=authenticator, use_variables=True)
+        requests_mock.post("https://api.github.com/graphql", [
+            {"json": {"data": {"clientRateLimit": {"cost": 1, "remaining": 5000, "resetAt": "2099-01-01T00:00:00Z"}}}},
+            {"json": {"data": {"user": {"login": "alice"}}}},
+        ])
+        query = Query(fields=[QueryNode("user", args={"login": "$user"}, fields=["login"])])
+
+        client.execute(query, {"user": "alice"})
+        dry_run = requests_mock.request_history[0].json()
+        assert dry_run["query"] == 'query($user: String!) { user(login: $user) { login }  clientRateLimit: rateLimit(dryRun: true) { cost remaining resetAt } }'
+        assert dry_run["variables"] == {"user": "alice"}
+
+
+class TestAsyncClient:
+    def test_async_execute_success(self, authenticator, requests_mock):
+        """Test that awaiting execute returns the data of a non-paginated query."""
+        client = AsyncClient(authenticator=authenticator)
+        requests_mock.post(client._base_path(), [
+            {'json': {"data": {"rateLimit": {"cost": 1, "remaining": 5000, "resetAt": "2021-01-01T00:00:00Z"}}}, 'status_code': 200},
+            {'json': {"data": "query success"}, 'status_code': 200}
+        ])
+
+        async def run():
+            async with client:
+                return await client.execute(Query("query { viewer { login }}"), {})
+
+        assert asyncio.run(run()) == "query success", "Execute should return success on valid response."
+
+    def test_async_execute_failed(self, authenticator, requests_mock):
+        """Test that a failed query raises QueryFailedException from the awaitable."""
+        client = AsyncClient(authenticator=authenticator)
+        requests_mock.post(client._base_path(), [
+            {'json': {"data": {"rateLimit": {"cost": 1, "remaining": 5000, "resetAt": "2021-01-01T00:00:00Z"}}}, 'status_code': 200},
+            {"json": {"error": "bad request"}, "status_code": 400}
+        ])
+
+        async def run():
+            async with client:
+                await client.execute(Query("query { viewer { login }}"), {})
+
+        with pytest.raises(QueryFailedException):
+            asyncio.run(run())
+
+    def test_async_execution_generator(self, authenticator):
+        """Test that the async generator yields every page and updates the paginator."""
+        client = AsyncClient(authenticator=authenticator)
+        query = MagicMock()
+        query.paginator.has_next.side_effect = [True, True, False]
+        query.path = []
+        pages = iter([
+            {"pageInfo": {"endCursor": "cursor1", "hasNextPage": True}, "nodes": [{"edges": "data1"}]},
+            {"pageInfo": {"endCursor": "cursor2", "hasNextPage": False}, "nodes": [{"edges": "data2"}]}
+        ])
+
+        async def fake_execute(query, substitutions, state=None):
+            return next(pages)
+        client._execute = fake_execute
+
+        async def run():
+            return [page async for page in client._execution_generator(query, {})]
+
+        results = asyncio.run(run())
+        client.close()
+        assert [page["nodes"][0]["edges"] for page in results] == ["data1", "data2"], "Should yield both pages in order."
+        query.paginator.update_paginator.assert_called_with(False, "cursor2")
+
+    def test_async_concurrency_is_bounded(self, authenticator):
+        """Test that no more than max_concurrency queries are in flight at once."""
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def post(*args, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            response = MagicMock()
+            response.status_code = 200
+            response.json.return_value = {"data": {"viewer": {"login": "octocat"}}}
+            return response
+
+        session = MagicMock()
+        session.post.side_effect = post
+        client = AsyncClient(authenticator=authenticator, session=session, max_concurrency=3)
+        client._dry_run = MagicMock(side_effect=lambda content, headers, *args: headers)
+
+        async def run():
+            async with client:
+                return await asyncio.gather(*(client.execute("query { viewer { login }}", {}) for _ in range(9)))
+
+        results = asyncio.run(run())
+        assert len(results) == 9, "Every query should complete."
+        assert 1 < peak <= 3, "Queries should overlap but never exceed the concurrency limit."
+
+    def test_async_exit_does_not_block_the_loop(self, authenticator):
+        """Test that leaving the context waits for in-flight queries without blocking the event loop."""
+        client = AsyncClient(authenticator=authenticator)
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            ticker = asyncio.ensure_future(tick())
+            async with client:
+                client._executor.submit(time.sleep, 0.2)
+            ticker.cancel()
+
+        asyncio.run(run())
+        assert len(ticks) > 5, "The event loop should keep running while the worker threads drain."
+
+    def test_async_options_are_keyword_only(self, authenticator):
+        """Test that the options added by AsyncClient cannot shift positional Client arguments."""
+        with pytest.raises(TypeError):
+            AsyncClient("https", "api.github.com", False, authenticator, None, 10, None, "dryrun", 100, False, None)
+
+
+
+class TestClientTokenPool:
+    def test_exhausted_token_is_rotated(self, requests_mock):
+        """Test that a query the current token cannot afford is sent with another token instead of waiting."""
+        pool = TokenPoolAuthenticator.from_tokens(["a", "b"])
+        client = Client(authenticator=pool)
+        requests_mock.post(client._base_path(), [
+            {'json': {"data": {"rateLimit": {"cost": 10, "remaining": 3, "resetAt": "2999-01-01T00:00:00Z"}}}},
+            {'json': {"data": "query success"}}
+        ])
+        client._wait_for_reset = MagicMock()
+        assert client._execute("query { viewer { login }}", {}) == "query success"
+        client._wait_for_reset.assert_not_called()
+        tokens = [request.headers["Authorization"] for request in requests_mock.request_history]
+        assert tokens == ["token a", "token b"], "The query should be sent with the token that has headroom."
+
+    def test_inline_budget_is_tracked_per_token(self, requests_mock):
+        """Test that inline accounting reports each response's budget to the pool."""
+        pool = TokenPoolAuthenticator.from_tokens(["a", "b"])
+        client = Client(authenticator=pool, rate_limit_mode="inline")
+        client._rate_limits = {
+            "token a": {"cost": 1, "remaining": 4000, "resetAt": "2999-01-01T00:00:00Z"},
+            "token b": {"cost": 1, "remaining": 4000, "resetAt": "2999-01-01T00:00:00Z"},
+        }
+        pool.update_rate_limit({"Authorization": "token a"}, 4000, "2999-01-01T00:00:00Z")
+        pool.update_rate_limit({"Authorization": "token b"}, 4000, "2999-01-01T00:00:00Z")
+        requests_mock.post(client._base_path(), json={
+            "data": {"viewer": {"login": "octocat"}, "clientRateLimit": {"cost": 1, "remaining": 1000, "resetAt": "2999-01-01T00:00:00Z"}}
+        })
+        client._execute("query { viewer { login }}", {})
+        used = requests_mock.last_request.headers["Authorization"]
+        assert client._rate_limits[used]["remaining"] == 1000
+        assert pool.get_authorization_header()["Authorization"] != used, "The next query should go to the other token."
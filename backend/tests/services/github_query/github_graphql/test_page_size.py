@@ -0,0 +1,115 @@
+import re
+import pytest
+from unittest.mock import MagicMock
+from requests.exceptions import Timeout
+from backend.app.services.github_query.github_graphql.client import Client, QueryFailedException
+from backend.app.services.github_query.github_graphql.authentication import PersonalAccessTokenAuthenticator
+from backend.app.services.github_query.github_graphql.page_size import PageSizeController
+from backend.app.services.github_query.github_graphql.query import PaginationState
+from backend.app.services.github_query.queries.comments.user_issue_comments import UserIssueComments
+
+class TestPageSizeController:
+    def test_initial_size_is_clamped(self):
+        controller = PageSizeController(minimum=5, maximum=50)
+        assert controller.size("A", 100) == 50
+        assert controller.size("B", 1) == 5
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            PageSizeController(minimum=50, maximum=10)
+
+    def test_cheap_fast_pages_grow(self):
+        controller = PageSizeController()
+        controller.size("A", 20)
+        assert controller.observe("A", 20, latency=0.5, cost=1) == 30
+        assert controller.observe("A", 30, latency=0.5, cost=1) == 45
+
+    def test_expensive_pages_hold(self):
+        controller = PageSizeController()
+        controller.size("A", 20)
+        assert controller.observe("A", 20, latency=0.5, cost=3) == 20, "Larger pages would cost proportionally more."
+        assert controller.observe("A", 20, latency=0.5, cost=None) == 20, "Unknown costs should not grow pages."
+
+    def test_slow_pages_shrink(self):
+        controller = PageSizeController(target_latency=2.0)
+        controller.size("A", 100)
+        assert controller.observe("A", 100, latency=3.0, cost=1) == 50
+
+    def test_stale_observation_does_not_grow(self):
+        controller = PageSizeController()
+        controller.size("A", 80)
+        assert controller.observe("A", 20, latency=0.5, cost=1) == 80
+
+    def test_back_off_until_minimum(self):
+        controller = PageSizeController(minimum=10)
+        controller.size("A", 40)
+        assert controller.back_off("A", 40)
+        assert controller.size("A") == 20
+        assert controller.back_off("A", 20)
+        assert controller.size("A") == 10
+        assert not controller.back_off("A", 10), "A page failing at the minimum size should not be retried."
+
+    def test_sizes_are_kept_per_query(self):
+        controller = PageSizeController()
+        controller.size("Heavy", 100)
+        controller.size("Light", 100)
+        controller.back_off("Heavy", 100)
+        assert controller.size("Heavy") == 50
+        assert controller.size("Light") == 100
+
+class TestClientPageSize:
+    @staticmethod
+    def client(controller):
+        return Client(authenticator=PersonalAccessTokenAuthenticator(token="token"), page_size=controller)
+
+    @staticmethod
+    def page(has_next):
+        return {"user": {"login": "alice", "issueComments": {
+            "totalCount": 2, "nodes": [{"createdAt": "2020-01-01T00:00:00Z"}],
+            "pageInfo": {"endCursor": "cursor", "hasNextPage": has_next}}}}
+
+    def test_gateway_error_retries_the_page_smaller(self):
+        client = self.client(PageSizeController())
+        sizes = []
+
+        def send(query, query_string, variables):
+            sizes.append(int(re.search(r"first: (\d+)", query_string).group(1)))
+            if len(sizes) == 1:
+                raise QueryFailedException(response=MagicMock(status_code=502), query=query_string)
+            client._last_cost.value = 1
+            return self.page(has_next=len(sizes) < 3)
+        client._send = send
+
+        pages = list(client.execute(UserIssueComments(), {"user": "alice", "pg_size": 100}, state=PaginationState()))
+        assert len(pages) == 2
+        assert sizes == [100, 50, 75], "The failed page should be retried at half the size, then grow while cheap."
+
+    def test_timeout_at_minimum_size_raises(self):
+        client = self.client(PageSizeController(minimum=25))
+
+        def send(query, query_string, variables):
+            raise Timeout("All retry attempts exhausted.")
+        client._send = send
+
+        with pytest.raises(Timeout):
+            list(client.execute(UserIssueComments(), {"user": "alice", "pg_size": 100}, state=PaginationState()))
+        assert client._page_size.size("UserIssueComments") == 25
+
+    def test_other_failures_are_not_retried(self):
+        client = self.client(PageSizeController())
+        calls = []
+
+        def send(query, query_string, variables):
+            calls.append(query_string)
+            raise QueryFailedException(response=MagicMock(status_code=401), query=query_string)
+        client._send = send
+
+        with pytest.raises(QueryFailedException):
+            list(client.execute(UserIssueComments(), {"user": "alice", "pg_size": 100}, state=PaginationState()))
+        assert len(calls) == 1
+
+    def test_without_pg_size_the_query_is_sent_as_is(self):
+        client = self.client(PageSizeController())
+        client._execute = MagicMock(return_value=self.page(has_next=False))
+        list(client.execute(UserIssueComments(), {"user": "alice"}, state=PaginationState()))
+        assert client._execute.call_args.args[1] == {"user": "alice"}
@@ -1,4 +1,6 @@
-from backend.app.services.github_query.github_graphql.query import QueryNode, Query, QueryNodePaginator, PaginatedQuery
+import pytest
+from unittest.mock import patch
+from backend.app.services.github_query.github_graphql.query import QueryNode, Query, QueryNodePaginator, PaginatedQuery, PaginationState, BatchedQuery, InvalidQueryException, node_count
 
 class TestQueryNode:
     def test_initialization(self):
@@ -173,3 +175,143 @@ class TestPaginatedQuery:
         path, paginator = paginated_query.extract_path_to_pageinfo_node(paginated_query)
         assert path == ["nestedNode"], "The path should lead to the nestedNode containing pageInfo."
         assert paginator == nested_node, "The paginator should be the nested node containing pageInfo."
+
+    def test_substitute_renders_tree_once_per_cursor_state(self):
+        """Test that pages after the first reuse one compiled template with the cursor slotted in."""
+        paginator = QueryNodePaginator("comments", args={"first": "$pg_size"},
+                                       fields=[QueryNode("pageInfo", fields=["endCursor", "hasNextPage"])])
+        paginated_query = PaginatedQuery(fields=[QueryNode("user", args={"login": "$user"}, fields=[paginator])])
+
+        with patch.object(PaginatedQuery, "__str__", autospec=True, side_effect=QueryNode.__str__) as render:
+            first = paginated_query.substitute(user="alice", pg_size=10)
+            paginated_query.paginator.update_paginator(True, "cursor1")
+            second = paginated_query.substitute(user="alice", pg_size=10)
+            paginated_query.paginator.update_paginator(True, "cursor2")
+            third = paginated_query.substitute(user="bob", pg_size=10)
+
+        assert render.call_count == 2, "The tree should be rendered once without and once with a cursor."
+        assert first == 'query { user(login: "alice") { comments(first: 10) { pageInfo { endCursor hasNextPage } } } }'
+        assert second == 'query { user(login: "alice") { comments(first: 10, after: "cursor1") { pageInfo { endCursor hasNextPage } } } }'
+        assert third == 'query { user(login: "bob") { comments(first: 10, after: "cursor2") { pageInfo { endCursor hasNextPage } } } }'
+        assert paginated_query.paginator.args["after"] == '"cursor2"', "Compiling should leave the paginator untouched."
+
+    def test_with_variables_shares_document_across_pages(self):
+        """Test that the cursor is a variable, so every page sends the same document."""
+        paginator = QueryNodePaginator("comments", args={"first": "$pg_size"},
+                                       fields=[QueryNode("pageInfo", fields=["endCursor", "hasNextPage"])])
+        paginated_query = PaginatedQuery(fields=[QueryNode("user", args={"login": "$user"}, fields=[paginator])])
+
+        first, first_variables = paginated_query.with_variables(user="alice", pg_size=10)
+        paginated_query.paginator.update_paginator(True, "cursor1")
+        second, second_variables = paginated_query.with_variables(user="alice", pg_size=10)
+
+        assert first == ('query($user: String!, $pg_size: Int!, $after: String) '
+                         '{ user(login: $user) { comments(first: $pg_size, after: $after) { pageInfo { endCursor hasNextPage } } } }')
+        assert first == second, "Pages should share the same document."
+        assert first_variables == {"user": "alice", "pg_size": 10, "after": None}
+        assert second_variables == {"user": "alice", "pg_size": 10, "after": "cursor1"}
+        assert paginated_query.paginator.args["after"] == '"cursor1"', "Compiling should leave the paginator untouched."
+
+    def test_paginators_do_not_share_default_args(self):
+        """Test that the cursor written by one paginator does not leak into another."""
+        first, second = QueryNodePaginator("comments"), QueryNodePaginator("comments")
+        first.update_paginator(True, "cursor1")
+        assert "after" not in second.args, "Paginators should not share their default arguments."
+        assert QueryNode("a").fields is not QueryNode("b").fields, "Nodes should not share their default fields."
+
+    def test_substitute_page_leaves_query_untouched(self):
+        """Test that pagination states render their own pages of one shared query."""
+        paginator = QueryNodePaginator("comments", args={"first": "$pg_size"},
+                                       fields=[QueryNode("pageInfo", fields=["endCursor", "hasNextPage"])])
+        paginated_query = PaginatedQuery(fields=[QueryNode("user", args={"login": "$user"}, fields=[paginator])])
+        alice, bob = PaginationState(), PaginationState()
+        alice.update_paginator(True, "cursor1")
+
+        assert paginated_query.substitute_page(alice, user="alice", pg_size=10) == \
+            'query { user(login: "alice") { comments(first: 10, after: "cursor1") { pageInfo { endCursor hasNextPage } } } }'
+        assert paginated_query.substitute_page(bob, user="bob", pg_size=10) == \
+            'query { user(login: "bob") { comments(first: 10) { pageInfo { endCursor hasNextPage } } } }'
+        assert paginated_query.with_variables_page(alice, user="alice", pg_size=10)[1]["after"] == "cursor1"
+        assert "after" not in paginated_query.paginator.args, "Pagination states should leave the paginator untouched."
+        assert paginated_query.paginator.has_next(), "Pagination states should leave the paginator untouched."
+
+class TestQueryVariables:
+    def test_inferred_types(self):
+        query = Query(fields=[QueryNode("user", args={"login": "$user"}, fields=[
+            QueryNode("contributionsCollection", args={"from": "$start", "to": "$end"}, fields=["totalCommitContributions"]),
+            QueryNode("rateLimit", args={"dryRun": "$dryrun"}, fields=["cost"])
+        ])])
+
+        document, variables = query.with_variables(user="alice", start="2020-01-01T00:00:00Z", end="2021-01-01T00:00:00Z",
+                                                   dryrun=False, unused=1)
+
+        assert document.startswith('query($user: String!, $start: DateTime!, $end: DateTime!, $dryrun: Boolean!) {')
+        assert 'contributionsCollection(from: $start, to: $end)' in document
+        assert variables == {"user": "alice", "start": "2020-01-01T00:00:00Z", "end": "2021-01-01T00:00:00Z", "dryrun": False}
+
+    def test_declared_types(self):
+        class OrderedQuery(Query):
+            variable_types = {"order_by": "RepositoryOrder"}
+
+        query = OrderedQuery(fields=[QueryNode("repositories", args={"orderBy": "$order_by"}, fields=["totalCount"])])
+        document, variables = query.with_variables(order_by={"field": "CREATED_AT", "direction": "ASC"})
+
+        assert document == 'query($order_by: RepositoryOrder) { repositories(orderBy: $order_by) { totalCount } }'
+        assert variables == {"order_by": {"field": "CREATED_AT", "direction": "ASC"}}
+
+    def test_untyped_variable(self):
+        query = Query(fields=[QueryNode("repositories", args={"orderBy": "$order_by"}, fields=["totalCount"])])
+        with pytest.raises(InvalidQueryException):
+            query.with_variables(order_by={"field": "CREATED_AT", "direction": "ASC"})
+
+    def test_missing_variable(self):
+        query = Query(fields=[QueryNode("user", args={"login": "$user"}, fields=["login"])])
+        with pytest.raises(InvalidQueryException):
+            query.with_variables()
+
+class TestBatchedQuery:
+    @staticmethod
+    def user_query():
+        return Query(fields=[QueryNode("user", args={"login": "$user"}, fields=["login", "id"])])
+
+    def test_batched_query_aliases_roots(self):
+        """Test that every substitution gets its own aliased root field."""
+        batch = BatchedQuery(self.user_query(), [{"user": "alice"}, {"user": "bob"}])
+        expected = 'query { u0: user(login: "alice") { login id } u1: user(login: "bob") { login id } }'
+        assert batch.substitute() == expected, "Each login should be queried under its own alias."
+
+    def test_split_response(self):
+        """Test that the batch response is split into per-substitution results shaped like the original query's."""
+        batch = BatchedQuery(self.user_query(), [{"user": "alice"}, {"user": "ghost"}])
+        results = batch.split_response({"u0": {"login": "alice", "id": "1"}, "u1": None})
+        assert results == [{"user": {"login": "alice", "id": "1"}}, {"user": None}], "Unresolved entries should be None."
+
+    def test_paginated_query_cannot_be_batched(self):
+        """Test that paginated queries are rejected."""
+        page_info_node = QueryNode(name="pageInfo", fields=["endCursor", "hasNextPage"])
+        paginated_query = PaginatedQuery(fields=[QueryNode(name="nestedNode", fields=[page_info_node])])
+        with pytest.raises(InvalidQueryException):
+            BatchedQuery(paginated_query, [{}])
+
+    def test_node_count(self):
+        """Test that nested connection sizes are multiplied, including page sizes given as placeholders."""
+        query = Query(fields=[
+            QueryNode("repositories", args={"first": "$pg_size"}, fields=[
+                QueryNode("issues", args={"first": 10}, fields=[
+                    QueryNode("labels (first: 20)", fields=["name"])
+                ])
+            ])
+        ])
+        assert node_count(query, {"pg_size": 50}) == 50 + 50 * 10 + 50 * 10 * 20
+
+    def test_batches_respect_limits(self):
+        """Test that batches are capped by the batch size and by the node limit."""
+        substitutions = [{"user": str(i)} for i in range(5)]
+        batches = BatchedQuery.batches(self.user_query(), substitutions, max_batch_size=2)
+        assert [len(batch.substitutions) for batch in batches] == [2, 2, 1], "Batches should hold at most two entries."
+
+        heavy_query = Query(fields=[QueryNode("user", args={"login": "$user"}, fields=[
+            QueryNode("repositories", args={"first": 100}, fields=["name"])
+        ])])
+        batches = BatchedQuery.batches(heavy_query, substitutions, max_batch_size=100, node_limit=300)
+        assert [len(batch.substitutions) for batch in batches] == [3, 2], "Batches should stay under the node limit."
@@ -0,0 +1,96 @@
+import os
+import json
+import pytest
+from backend.app.services.github_query.github_graphql.client import Client
+from backend.app.services.github_query.github_graphql.authentication import PersonalAccessTokenAuthenticator
+from backend.app.services.github_query.github_graphql.response_cache import ResponseCache, ResponseCacheMiss, contributions_ttl
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "cache"))
+
+class TestResponseCache:
+    def test_key_depends_on_query_and_variables(self):
+        """Test that keys differ by query text and variables but not by the order of the variables."""
+        assert ResponseCache.key("query { a }") != ResponseCache.key("query { b }")
+        assert ResponseCache.key("q", {"x": 1}) != ResponseCache.key("q", {"x": 2})
+        assert ResponseCache.key("q", {"x": 1, "y": 2}) == ResponseCache.key("q", {"y": 2, "x": 1})
+
+    def test_get_returns_stored_data(self, cache):
+        """Test that a stored response is returned until it expires."""
+        cache.put("k", "Other", {}, {"user": {"login": "a"}})
+        assert cache.get("k", "Other", {}) == {"user": {"login": "a"}}
+
+    def test_expired_response_is_a_miss(self, tmp_path):
+        """Test that a response older than its TTL is not returned."""
+        cache = ResponseCache(str(tmp_path), ttls={"UserProfileStats": 10})
+        cache.put("k", "UserProfileStats", {}, {"user": {}})
+        assert cache.get("k", "UserProfileStats", {}) == {"user": {}}
+        path = os.path.join(str(tmp_path), "k.json")
+        with open(path) as file:
+            entry = json.load(file)
+        entry["stored_at"] -= 60
+        with open(path, "w") as file:
+            json.dump(entry, file)
+        assert cache.get("k", "UserProfileStats", {}) is None
+
+    def test_zero_ttl_is_not_stored(self, tmp_path):
+        """Test that queries with a TTL of 0 bypass the cache."""
+        cache = ResponseCache(str(tmp_path), ttls={"Live": 0})
+        cache.put("k", "Live", {}, {"a": 1})
+        assert cache.get("k", "Live", {}) is None
+
+    def test_contributions_ttl(self):
+        """Test that past contribution windows never expire while current ones do."""
+        assert contributions_ttl({"start": "2020-01-01T00:00:00Z", "end": "2021-01-01T00:00:00Z"}) is None
+        assert contributions_ttl({"end0": "2020-01-01T00:00:00Z", "end1": "2999-01-01T00:00:00Z"}) == 3600
+        assert contributions_ttl({}) == 3600
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used responses are evicted beyond the size bound."""
+        cache = ResponseCache(str(tmp_path), max_bytes=250)
+        data = {"payload": "x" * 50}
+        cache.put("a", "Other", {}, data)
+        cache.put("b", "Other", {}, data)
+        cache.get("a", "Other", {})
+        cache.put("c", "Other", {}, data)
+        assert cache.get("a", "Other", {}) == data
+        assert cache.get("b", "Other", {}) is None
+        assert cache.get("c", "Other", {}) == data
+
+    def test_reopened_cache_keeps_entries(self, tmp_path):
+        """Test that a cache reopened on the same directory serves the earlier responses."""
+        ResponseCache(str(tmp_path)).put("k", "Other", {}, {"a": 1})
+        assert ResponseCache(str(tmp_path)).get("k", "Other", {}) == {"a": 1}
+
+    def test_offline_replays_and_raises_on_miss(self, tmp_path):
+        """Test that offline mode replays expired responses, stores nothing and raises on a miss."""
+        ResponseCache(str(tmp_path)).put("k", "Other", {}, {"a": 1})
+        offline = ResponseCache(str(tmp_path), ttls={"Other": 0.0}, offline=True)
+        assert offline.get("k", "Other", {}) == {"a": 1}
+        offline.put("new", "Other", {}, {"b": 2})
+        with pytest.raises(ResponseCacheMiss):
+            offline.get("new", "Other", {})
+
+class TestClientResponseCache:
+    def test_cached_query_skips_the_server(self, tmp_path, requests_mock):
+        """Test that executing the same query twice sends it to the server once."""
+        client = Client(authenticator=PersonalAccessTokenAuthenticator(token="token"),
+                        cache=ResponseCache(str(tmp_path)))
+        requests_mock.post(client._base_path(), [
+            {'json': {"data": {"rateLimit": {"cost": 1, "remaining": 5000, "resetAt": "2021-01-01T00:00:00Z"}}}, 'status_code': 200},
+            {'json': {"data": {"viewer": {"login": "a"}}}, 'status_code': 200},
+        ])
+        first = client.execute("query { viewer { login }}", {})
+        calls = requests_mock.call_count
+        second = client.execute("query { viewer { login }}", {})
+        assert first == second == {"viewer": {"login": "a"}}
+        assert requests_mock.call_count == calls, "The second execution should be answered from the cache."
+
+    def test_offline_client_never_reaches_the_server(self, tmp_path, requests_mock):
+        """Test that an offline cache raises instead of sending an uncached query."""
+        client = Client(authenticator=PersonalAccessTokenAuthenticator(token="token"),
+                        cache=ResponseCache(str(tmp_path), offline=True))
+        with pytest.raises(ResponseCacheMiss):
+            client.execute("query { viewer { login }}", {})
+        assert requests_mock.call_count == 0
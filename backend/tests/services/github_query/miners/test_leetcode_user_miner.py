@@ -0,0 +1,30 @@
+from unittest.mock import MagicMock
+from backend.app.services.github_query.github_graphql.client import QueryFailedException
+from backend.app.services.github_query.miners.leetcode_user_miner import LeetcodeUserMiner
+from backend.app.services.github_query.utils.checkpoint import CheckpointStore
+
+
+def failure(status_code, errors=None):
+    response = MagicMock(status_code=status_code)
+    response.json.return_value = {"data": {"user": None}, "errors": errors or []}
+    return QueryFailedException(response=response, query="q")
+
+
+class TestLeetcodeUserMinerCheckpoint:
+    def test_transient_failure_is_retried_on_resume(self, tmp_path):
+        path = str(tmp_path / "checkpoint.jsonl")
+        client = MagicMock()
+        client.execute.side_effect = failure(502)
+        LeetcodeUserMiner(client, CheckpointStore(path)).run("alice")
+        assert not CheckpointStore(path).is_complete("alice"), "A gateway error should not be recorded as final."
+
+        client.execute.reset_mock()
+        LeetcodeUserMiner(client, CheckpointStore(path)).run("alice")
+        client.execute.assert_called_once()
+
+    def test_missing_login_is_recorded(self, tmp_path):
+        path = str(tmp_path / "checkpoint.jsonl")
+        client = MagicMock()
+        client.execute.side_effect = failure(200, [{"type": "NOT_FOUND", "message": "Could not resolve"}])
+        LeetcodeUserMiner(client, CheckpointStore(path)).run("ghost")
+        assert CheckpointStore(path).rows("ghost")[0]["created_at"] == "Do Not Exist"
@@ -0,0 +1,124 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+from backend.app.services.github_query.github_graphql.client import QueryFailedException
+from backend.app.services.github_query.miners.repository_contributors_contribution_miner import \
+    RepositoryContributorsContributionMiner, HISTORY_START, HISTORY_END
+from backend.app.services.github_query.queries.repositories.repository_commits import RepositoryCreatedAt
+
+
+def user(login):
+    return {"login": login, "name": None, "id": f"id-{login}", "email": "", "createdAt": "2020-01-01T00:00:00Z"}
+
+
+def failure(status_code, body):
+    """A QueryFailedException whose response has the given status and raw body."""
+    response = MagicMock(status_code=status_code, text=body)
+    response.json.side_effect = lambda: json.loads(body)
+    return QueryFailedException(response=response, query="query")
+
+
+def batch_response(logins):
+    return {f"u{index}": user(login) for index, login in enumerate(logins)}
+
+
+class TestResolveIds:
+    def test_resolves_batch_and_caches(self):
+        client = MagicMock()
+        client.execute.return_value = batch_response(["alice", "bob"])
+        miner = RepositoryContributorsContributionMiner(client)
+
+        assert miner._resolve_ids(["alice", "bob"]) == [("alice", "id-alice"), ("bob", "id-bob")]
+        assert miner._resolve_ids(["bob", "alice"]) == [("bob", "id-bob"), ("alice", "id-alice")]
+        assert client.execute.call_count == 1, "Resolved logins should be served from the cache."
+
+    def test_shared_cache_skips_known_logins(self):
+        client = MagicMock()
+        client.execute.return_value = batch_response(["bob"])
+        cache = {"alice": "id-alice"}
+        miner = RepositoryContributorsContributionMiner(client, user_ids=cache)
+
+        assert miner._resolve_ids(["alice", "bob"]) == [("alice", "id-alice"), ("bob", "id-bob")]
+        assert 'u0: user(login: "bob")' in str(client.execute.call_args.kwargs["query"])
+        assert "alice" not in str(client.execute.call_args.kwargs["query"])
+        assert cache["bob"] == "id-bob", "The shared cache should be filled in."
+
+    def test_partial_not_found_keeps_resolved_logins(self):
+        body = json.dumps({"data": {"u0": user("alice"), "u1": None},
+                           "errors": [{"type": "NOT_FOUND", "path": ["u1"], "message": "Could not resolve"}]})
+        client = MagicMock()
+        client.execute.side_effect = failure(200, body)
+        miner = RepositoryContributorsContributionMiner(client)
+
+        assert miner._resolve_ids(["alice", "ghost"]) == [("alice", "id-alice")]
+        assert "ghost" not in miner._user_ids
+
+    def test_non_json_gateway_error_is_raised(self):
+        client = MagicMock()
+        client.execute.side_effect = failure(502, "<html>Bad Gateway</html>")
+        miner = RepositoryContributorsContributionMiner(client)
+
+        with pytest.raises(QueryFailedException):
+            miner._resolve_ids(["alice"])
+        assert miner._user_ids == {}
+
+    def test_other_errors_are_raised(self):
+        body = json.dumps({"data": {"u0": None}, "errors": [{"type": "RATE_LIMITED", "message": "slow down"}]})
+        client = MagicMock()
+        client.execute.side_effect = failure(200, body)
+        miner = RepositoryContributorsContributionMiner(client)
+
+        with pytest.raises(QueryFailedException):
+            miner._resolve_ids(["alice"])
+
+    def test_gateway_error_is_recorded_by_run(self):
+        client = MagicMock()
+        client.execute.side_effect = [iter([{"repository": {"defaultBranchRef": {"target": {"history": {
+            "nodes": [{"author": {"name": "Alice", "user": {"login": "alice"}}}],
+            "pageInfo": {"endCursor": None, "hasNextPage": False}}}}}}]),
+            failure(504, "")]
+        miner = RepositoryContributorsContributionMiner(client)
+
+        miner.run("https://github.com/owner/repo")
+        assert miner.cumulated_contribution["repo"].tolist() == ["Query failed with code 504"]
+
+
+def commit(authored_date, login="alice"):
+    return {"oid": authored_date, "authoredDate": authored_date, "changedFilesIfAvailable": 1, "additions": 1,
+            "deletions": 0, "message": authored_date, "parents": {"totalCount": 1},
+            "author": {"name": login, "user": {"login": login}}}
+
+
+class WindowedHistoryClient:
+    """
+    Answers windowed history queries from a fixed list of commits, GitHub's since and until bounds being inclusive.
+    Every window also holds a commit dated exactly on each of its bounds, like a history dense enough to have one.
+    """
+
+    def __init__(self, commits):
+        self.commits = commits
+        self.windows = []
+
+    def execute(self, query, substitutions, state=None):
+        if isinstance(query, RepositoryCreatedAt):
+            return {"repository": {"createdAt": "2020-01-01T00:00:00Z"}}
+        since, until = substitutions["since"], substitutions["until"]
+        self.windows.append((since, until))
+        nodes = [node for node in self.commits if since <= node["authoredDate"] <= until]
+        nodes += [commit(bound) for bound in (since, until) if bound not in (HISTORY_START, HISTORY_END)]
+        return iter([{"repository": {"defaultBranchRef": {"target": {"history": {
+            "nodes": nodes, "pageInfo": {"endCursor": None, "hasNextPage": False}}}}}}])
+
+
+class TestWindowedHistory:
+    def test_boundary_and_future_commits_are_counted_once(self):
+        commits = [commit("2015-06-01T00:00:00Z"), commit("2021-06-01T00:00:00Z"), commit("2999-01-01T00:00:00Z")]
+        client = WindowedHistoryClient(commits)
+        miner = RepositoryContributorsContributionMiner(client)
+
+        miner.run("https://github.com/owner/repo", single_pass=True, windows=3)
+        assert client.windows[0][0] == HISTORY_START and client.windows[-1][1] == HISTORY_END
+        shared = {until for _, until in client.windows[:-1]}
+        assert len(shared) == 2
+        assert miner.cumulated_contribution["commits"].tolist() == [len(commits) + len(shared)], \
+            "Commits on a shared bound should be counted once, and commits after now should be kept."
@@ -0,0 +1,256 @@
+import signal
+import multiprocessing
+import pandas as pd
+import pytest
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+import backend.app.services.github_query.miners.student_metric_stats_miner as stats_miner
+from backend.app.services.github_query.miners.student_metric_stats_miner import UserMetricStatsCohortMiner, UserMetricStatsMiner
+from backend.app.services.github_query.utils.checkpoint import CheckpointStore
+from backend.app.services.github_query.github_graphql.query import PaginatedQuery
+from backend.app.services.github_query.queries.profiles.user_login import UserLogin
+from backend.app.services.github_query.queries.comments.user_issue_comments import UserIssueComments
+
+
+class InProcessExecutor:
+    """Runs submitted logins in the test process; the logins in pending are left running until shut down."""
+
+    instances = []
+
+    def __init__(self, max_workers, initializer, initargs, pending=()):
+        self.max_workers = max_workers
+        self.initargs = initargs
+        self.pending = set(pending)
+        self.shutdowns = []
+        InProcessExecutor.instances.append(self)
+
+    def submit(self, fn, *args):
+        future = Future()
+        if args[0] in self.pending:
+            return future
+        try:
+            future.set_result(fn(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shutdowns.append((wait, cancel_futures))
+
+
+def mined(login, start, end):
+    """Stands in for a worker: logins starting with x fail, the worker of login crash dies."""
+    if login == "crash":
+        raise RuntimeError("worker died")
+    if login.startswith("x"):
+        return [{"github": login, "created_at": "Do Not Exist"}], [login]
+    return [{"github": login, "created_at": "2020-01-01T00:00:00Z", "commit": len(login)}], []
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    InProcessExecutor.instances = []
+    monkeypatch.setattr(stats_miner, "ProcessPoolExecutor", InProcessExecutor)
+    monkeypatch.setattr(stats_miner, "_mine_cohort_user", mined)
+    return InProcessExecutor
+
+
+class TestUserMetricStatsCohortMiner:
+    def test_requires_tokens(self):
+        with pytest.raises(ValueError):
+            UserMetricStatsCohortMiner([])
+
+    def test_merges_rows_in_input_order(self, executor):
+        miner = UserMetricStatsCohortMiner(["t1", "t2"], client_kwargs={"rate_limit_mode": "inline"})
+        miner.run(["alice", "xavier", "bo", "crash"])
+
+        frame = miner.total_contributions
+        assert frame["github"].tolist() == ["alice", "xavier", "bo"]
+        assert frame["commit"].tolist()[0] == 5 and pd.isna(frame["commit"].tolist()[1])
+        assert miner.exceptions == ["xavier", "crash"], "Failed logins and crashed workers should be listed in order."
+        assert miner.interrupted == []
+        pool = executor.instances[0]
+        assert pool.max_workers == 2
+        assert pool.initargs[1:] == ({"rate_limit_mode": "inline"}, None, None)
+
+    def test_reads_cohort_csv(self, executor, tmp_path):
+        path = tmp_path / "cohort.csv"
+        pd.DataFrame({"github": [" alice ", None, "bob"], "name": ["A", "N", "B"]}).to_csv(path, index=False)
+        assert UserMetricStatsCohortMiner.read_logins(str(path)) == ["alice", "bob"]
+
+        miner = UserMetricStatsCohortMiner(["t1"])
+        miner.run(str(path))
+        assert miner.total_contributions["github"].tolist() == ["alice", "bob"]
+
+    def test_checkpointed_logins_skip_the_pool(self, executor, tmp_path):
+        path = str(tmp_path / "run.jsonl")
+        CheckpointStore(path).complete("alice", [{"github": "alice", "created_at": "2019-01-01T00:00:00Z", "commit": 9}])
+        miner = UserMetricStatsCohortMiner(["t1"], checkpoint=path)
+        miner.run(["alice", "bob"])
+        assert miner.total_contributions["commit"].tolist() == [9, 3]
+
+    def test_keyboard_interrupt_cancels_pending_logins(self, executor, monkeypatch):
+        monkeypatch.setattr(stats_miner, "ProcessPoolExecutor",
+                            lambda **kwargs: InProcessExecutor(**kwargs, pending={"carol"}))
+
+        def interrupted(futures):
+            yield next(future for future in futures if future.done())
+            raise KeyboardInterrupt
+        monkeypatch.setattr(stats_miner, "as_completed", interrupted)
+
+        miner = UserMetricStatsCohortMiner(["t1"])
+        miner.run(["alice", "bob", "carol"])
+        assert miner.total_contributions["github"].tolist() == ["alice", "bob"], "Finished logins should still be merged."
+        assert miner.interrupted == ["carol"]
+        assert executor.instances[0].shutdowns[0] == (True, True), "Pending logins should be cancelled."
+
+
+class TestCohortWorker:
+    def test_worker_builds_its_own_client(self, tmp_path, monkeypatch):
+        tokens = multiprocessing.Queue()
+        tokens.put("worker-token")
+        handler = signal.getsignal(signal.SIGINT)
+        try:
+            stats_miner._init_cohort_worker(tokens, {"rate_limit_mode": "inline"}, str(tmp_path / "run.jsonl"),
+                                            str(tmp_path / "windows.jsonl"))
+            assert signal.getsignal(signal.SIGINT) == signal.SIG_IGN, "Ctrl-C should be left to the parent."
+        finally:
+            signal.signal(signal.SIGINT, handler)
+        assert stats_miner._worker_client._authenticator.get_authorization_header()["Authorization"] == "token worker-token"
+        assert stats_miner._worker_client._rate_limit_mode == "inline"
+        assert isinstance(stats_miner._worker_checkpoint, CheckpointStore)
+        assert stats_miner._worker_window_store is not None
+
+    def test_mine_cohort_user_returns_records(self, monkeypatch):
+        client = MagicMock()
+        client.execute.side_effect = stats_miner.QueryFailedException(response=MagicMock(status_code=200), query="q")
+        monkeypatch.setattr(stats_miner, "_worker_client", client)
+        monkeypatch.setattr(stats_miner, "_worker_checkpoint", None)
+        monkeypatch.setattr(stats_miner, "_worker_window_store", None)
+
+        rows, exceptions = stats_miner._mine_cohort_user("ghost", None, None)
+        assert rows[0]["github"] == "ghost" and rows[0]["created_at"] == "Do Not Exist"
+        assert exceptions == ["ghost"]
+
+
+def failure(status_code, errors=None):
+    response = MagicMock(status_code=status_code)
+    response.json.return_value = {"data": {"user": None}, "errors": errors or []}
+    return stats_miner.QueryFailedException(response=response, query="q")
+
+
+class TestRunCheckpoint:
+    def test_transient_failure_is_retried_on_resume(self, tmp_path):
+        path = str(tmp_path / "checkpoint.jsonl")
+        client = MagicMock()
+        client.execute.side_effect = failure(502)
+        miner = UserMetricStatsMiner(client, CheckpointStore(path))
+        miner.run("alice")
+        assert miner.total_contributions["created_at"].tolist() == ["Do Not Exist"]
+        assert not CheckpointStore(path).is_complete("alice"), "A gateway error should not be recorded as final."
+
+        client.execute.reset_mock()
+        UserMetricStatsMiner(client, CheckpointStore(path)).run("alice")
+        assert client.execute.call_args.kwargs["substitutions"] == {"user": "alice"}, "The login should be queried again."
+
+    def test_missing_login_is_not_retried(self, tmp_path):
+        path = str(tmp_path / "checkpoint.jsonl")
+        client = MagicMock()
+        client.execute.side_effect = failure(200, [{"type": "NOT_FOUND", "message": "Could not resolve"}])
+        UserMetricStatsMiner(client, CheckpointStore(path)).run("ghost")
+
+        client.execute.reset_mock()
+        resumed = UserMetricStatsMiner(client, CheckpointStore(path))
+        resumed.run("ghost")
+        client.execute.assert_not_called()
+        assert resumed.exceptions == ["ghost"]
+
+
+class FakeClient:
+    """
+    Answers the queries of an incremental run: one commit per contribution window, and issue comments paged
+    like Client does, the pages being lists of createdAt times, their cursors c0, c1, ...
+    """
+
+    def __init__(self, comment_pages):
+        self.comment_pages = comment_pages
+        self.fetched_pages = []
+
+    def execute(self, query, substitutions, stop_predicate=None, state=None):
+        if isinstance(query, UserLogin):
+            return {"user": {"createdAt": "2020-01-01T00:00:00Z"}}
+        if isinstance(query, PaginatedQuery):
+            return self._pages(stop_predicate, state)
+        windows = [key for key in substitutions if key.startswith("start")]
+        return {"user": {f"window{index}": {
+            "restrictedContributionsCount": 0, "totalCommitContributions": 1, "totalIssueContributions": 0,
+            "totalPullRequestContributions": 0, "totalPullRequestReviewContributions": 0,
+            "totalRepositoryContributions": 0} for index in range(len(windows))}}
+
+    def _pages(self, stop_predicate, state):
+        index = 0 if state.end_cursor is None else int(state.end_cursor[1:]) + 1
+        while state.has_next():
+            self.fetched_pages.append(index)
+            has_next = index + 1 < len(self.comment_pages)
+            response = {"user": {"login": "alice", "issueComments": {
+                "totalCount": 0, "nodes": [{"createdAt": created} for created in self.comment_pages[index]],
+                "pageInfo": {"endCursor": f"c{index}", "hasNextPage": has_next}}}}
+            if has_next and stop_predicate is not None and stop_predicate(response):
+                has_next = False
+            state.update_paginator(has_next, f"c{index}")
+            index += 1
+            yield response
+
+
+def incremental_miner(client):
+    miner = UserMetricStatsMiner(client)
+    miner.PAGINATED_COUNTS = (("issue_comments", UserIssueComments(), UserIssueComments.user_issue_comments),)
+    miner._repository_stats = lambda login, end: {}
+    return miner
+
+
+class TestRunIncremental:
+    def test_first_run(self, tmp_path):
+        state = CheckpointStore(str(tmp_path / "state.jsonl"))
+        client = FakeClient([["2020-01-01T00:00:00Z", "2020-02-01T00:00:00Z"], ["2020-03-01T00:00:00Z"]])
+        miner = incremental_miner(client)
+
+        miner.run_incremental("alice", state, end="2021-01-01T00:00:00Z")
+        row = miner.total_contribution_records[0]
+        assert miner.exceptions == []
+        assert row["created_at"] == "2020-01-01T00:00:00Z" and row["end_at"] == "2021-01-01T00:00:00Z"
+        assert row["commit"] == 2, "Both yearly windows since the account was created should be counted."
+        assert row["issue_comments"] == 3
+        assert state.progress("alice/last_run")[2]["commit"] == 2
+        assert state.progress("alice/issue_comments") == ("c0", True, 2), "The next run should resume at the last page."
+
+    def test_resumed_run_counts_only_new_items(self, tmp_path):
+        state = CheckpointStore(str(tmp_path / "state.jsonl"))
+        pages = [["2020-01-01T00:00:00Z", "2020-02-01T00:00:00Z"], ["2020-03-01T00:00:00Z"]]
+        incremental_miner(FakeClient(pages)).run_incremental("alice", state, end="2021-01-01T00:00:00Z")
+
+        pages[1].append("2021-06-01T00:00:00Z")
+        pages.append(["2022-02-01T00:00:00Z"])
+        client = FakeClient(pages)
+        miner = incremental_miner(client)
+        miner.run_incremental("alice", state, end="2022-01-01T00:00:00Z")
+
+        row = miner.total_contribution_records[0]
+        assert client.fetched_pages == [1, 2], "Pages before the checkpoint should not be fetched again."
+        assert row["issue_comments"] == 4, "Comments created after end should not be counted."
+        assert row["commit"] == 3, "The window since the previous run should be added to the previous total."
+        assert row["created_at"] == "2020-01-01T00:00:00Z"
+
+    @pytest.mark.parametrize("previous_commit", [None, "missing"])
+    def test_previous_row_with_null_or_missing_count(self, tmp_path, previous_commit):
+        state = CheckpointStore(str(tmp_path / "state.jsonl"))
+        previous = {"github": "alice", "created_at": "2020-01-01T00:00:00Z", "end_at": "2021-01-01T00:00:00Z",
+                    "issue": None}
+        if previous_commit != "missing":
+            previous["commit"] = previous_commit
+        miner = incremental_miner(FakeClient([["2020-01-01T00:00:00Z"]]))
+
+        miner.run_incremental("alice", state, previous=previous, end="2022-01-01T00:00:00Z")
+        row = miner.total_contribution_records[0]
+        assert miner.exceptions == [], "A null or missing count should not fail the login."
+        assert row["commit"] == 1 and row["issue"] == 0
@@ -1,5 +1,5 @@
 import re
-from backend.app.services.github_query.queries.contributions.user_repositories import UserRepositories
+from backend.app.services.github_query.queries.contributions.user_repositories import UserRepositories, UserRepositoriesAllCategories
 
 class TestUserRepositories:
     def test_user_repositories_query_structure(self):
@@ -215,3 +215,50 @@ class TestUserRepositories:
         assert repo_stats["stargazer_count"] == 10, "Stargazer count should be 10."
         assert lang_stats["Python"] == 600, "Python size should be 600."
         assert lang_stats["JavaScript"] == 400, "JavaScript size should be 400."
+
+
+class TestUserRepositoriesAllCategories:
+    def test_query_structure(self):
+        query_string = str(UserRepositoriesAllCategories())
+        assert 'repositories(first: $pg_size, ownerAffiliations: [OWNER, COLLABORATOR], orderBy: $order_by)' in query_string
+        assert 'isFork' in query_string
+        assert re.search(r'owner\s*{\s*login\s*}', query_string), "Owner login should be requested for each repository."
+
+    def test_repository_category(self):
+        def repo(owner, is_fork):
+            return {"owner": {"login": owner}, "isFork": is_fork}
+
+        assert UserRepositoriesAllCategories.repository_category(repo("Alice", False), "alice") == "A"
+        assert UserRepositoriesAllCategories.repository_category(repo("alice", True), "alice") == "B"
+        assert UserRepositoriesAllCategories.repository_category(repo("bob", False), "alice") == "C"
+        assert UserRepositoriesAllCategories.repository_category(repo("bob", True), "alice") == "D"
+
+    def test_categorized_repository_stats(self):
+        def repo(owner, is_fork, forks, language):
+            return {
+                "owner": {"login": owner},
+                "isFork": is_fork,
+                "createdAt": "2020-01-01T00:00:00Z",
+                "forkCount": forks,
+                "stargazerCount": 1,
+                "watchers": {"totalCount": 1},
+                "languages": {
+                    "totalSize": 100,
+                    "edges": [{"size": 100, "node": {"name": language}}]
+                }
+            }
+
+        repo_list = [repo("alice", False, 2, "Python"), repo("alice", False, 3, "Go"), repo("bob", True, 7, "C")]
+        repo_stats = {category: {"total_count": 0, "fork_count": 0, "stargazer_count": 0, "watchers_count": 0, "total_size": 0}
+                      for category in UserRepositoriesAllCategories.CATEGORIES}
+        lang_stats = {category: {} for category in UserRepositoriesAllCategories.CATEGORIES}
+        end = "2022-01-01T00:00:00Z"
+        UserRepositoriesAllCategories.categorized_repository_stats(repo_list, "alice", repo_stats, lang_stats, end, end, 'before')
+
+        assert repo_stats["A"]["total_count"] == 2
+        assert repo_stats["A"]["fork_count"] == 5
+        assert lang_stats["A"] == {"Python": 100, "Go": 100}
+        assert repo_stats["B"]["total_count"] == 0
+        assert repo_stats["C"]["total_count"] == 0
+        assert repo_stats["D"]["total_count"] == 1
+        assert lang_stats["D"] == {"C": 100}
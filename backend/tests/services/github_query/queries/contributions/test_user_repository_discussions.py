@@ -14,7 +14,7 @@ class TestUserRepositoryDiscussions:
         query {
             user(login: "$user") {
                 login
-                repositoryDiscussions(first: $pg_size) {
+                repositoryDiscussions(first: $pg_size, orderBy: {field: CREATED_AT, direction: ASC}) {
                     totalCount
                     nodes {
                         createdAt
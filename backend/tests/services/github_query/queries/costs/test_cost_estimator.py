@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import MagicMock
+from backend.app.services.github_query.github_graphql.client import Client
+from backend.app.services.github_query.github_graphql.authentication import PersonalAccessTokenAuthenticator
+from backend.app.services.github_query.github_graphql.query import QueryNode, connection_size, request_count
+from backend.app.services.github_query.queries.costs.cost_estimator import parse_query, estimate_cost
+from backend.app.services.github_query.queries.contributions.user_repositories import UserRepositoriesAllCategories
+from backend.app.services.github_query.queries.comments.user_issue_comments import UserIssueComments
+from backend.app.services.github_query.utils.helper import have_rate_limit
+
+# queries along with the rateLimit(dryRun: true) response GitHub gives for them, from the examples of GitHub's
+# rate limit documentation
+DRY_RUNS = [
+    ('''
+    query {
+      viewer {
+        login
+        repositories(first: 100) {
+          edges { node { id
+            issues(first: 50) { edges { node { id
+              labels(first: 60) { edges { node { id name } } }
+            } } }
+          } }
+        }
+      }
+    }
+    ''', 5101, {"data": {"rateLimit": {"cost": 51, "remaining": 4949, "resetAt": "2024-01-01T00:00:00Z"}}}),
+    ('''
+    query {
+      viewer {
+        repositories(first: 50) {
+          edges { repository: node { name
+            issues(first: 10) { totalCount edges { node { title bodyHTML } } }
+          } }
+        }
+      }
+    }
+    ''', 51, {"data": {"rateLimit": {"cost": 1, "remaining": 4999, "resetAt": "2024-01-01T00:00:00Z"}}}),
+    ('query { viewer { login } }', 0,
+     {"data": {"rateLimit": {"cost": 1, "remaining": 4999, "resetAt": "2024-01-01T00:00:00Z"}}}),
+]
+
+class TestCostEstimator:
+    @pytest.mark.parametrize("query, requests, dry_run", DRY_RUNS)
+    def test_matches_dry_runs(self, query, requests, dry_run):
+        assert request_count(parse_query(query)) == requests
+        assert estimate_cost(query) == dry_run["data"]["rateLimit"]["cost"], "The estimate should match the server's dry run."
+
+    def test_parse_query_structure(self):
+        root = parse_query('query($user: String!, $n: Int!) { a: user(login: $user) { '
+                           'items(first: $n, orderBy: {field: CREATED_AT, direction: ASC}) @include(if: true) { '
+                           'nodes { ... on Issue { title } ...Fields } } } }')
+        user = root.fields[0]
+        assert user.name == "a: user" and user.args == {"login": "$user"}
+        items = user.fields[0]
+        assert items.name == "items" and items.args["first"] == "$n"
+        nodes = items.fields[0]
+        assert nodes.fields[0] == QueryNode("... on Issue", fields=["title"])
+        assert nodes.fields[1] == "...Fields"
+
+    def test_connection_size(self):
+        assert connection_size(QueryNode("items", args={"first": "$pg_size"}), {"pg_size": 30}) == 30
+        assert connection_size(QueryNode("items", args={"last": 5})) == 5
+        assert connection_size(QueryNode("parents (first: 2)")) == 2
+        assert connection_size(QueryNode("items", args={"first": "$pg_size"})) == 100, "Unknown sizes should be assumed full."
+        assert connection_size(QueryNode("user", args={"login": "$user"})) is None
+
+    def test_query_tree_and_rendered_query_agree(self):
+        query = UserRepositoriesAllCategories()
+        substitutions = {"user": "alice", "pg_size": 100, "order_by": {"field": "CREATED_AT", "direction": "ASC"}}
+        document, variables = query.with_variables(**substitutions)
+        expected = 1 + 100  # the repositories, and the languages of each one
+        assert request_count(query, substitutions) == expected
+        assert request_count(parse_query(query.substitute(**substitutions))) == expected
+        assert request_count(parse_query(document), variables) == expected
+        assert estimate_cost(query, {"pg_size": 20}) == 1
+
+    def test_have_rate_limit_uses_the_estimate(self):
+        mock_client = MagicMock(spec=Client)
+        mock_client.execute.return_value = {"rateLimit": {"cost": 0, "remaining": 55, "resetAt": "2024-01-01T00:00:00Z"}}
+        heavy = MagicMock()
+        heavy.substitute.return_value = DRY_RUNS[0][0]
+        assert have_rate_limit(mock_client, heavy, {}) == [False, "2024-01-01T00:00:00Z"]
+        assert have_rate_limit(mock_client, UserIssueComments(), {"user": "alice", "pg_size": 100}) == \
+            [True, "2024-01-01T00:00:00Z"]
+
+    def test_have_rate_limit_with_inline_client(self, requests_mock):
+        client = Client(authenticator=PersonalAccessTokenAuthenticator(token="token"), rate_limit_mode="inline")
+        client._rate_limits["token token"] = {"cost": 1, "remaining": 4000, "resetAt": "2999-01-01T00:00:00Z"}
+        requests_mock.post(client._base_path(), json={"data": {
+            "rateLimit": {"cost": 0, "limit": 5000, "remaining": 4000, "resetAt": "2999-01-01T00:00:00Z", "used": 1000},
+            "clientRateLimit": {"cost": 1, "remaining": 3999, "resetAt": "2999-01-01T00:00:00Z"}}})
+
+        assert have_rate_limit(client, UserIssueComments(), {"user": "alice", "pg_size": 100}) == \
+            [True, "2999-01-01T00:00:00Z"]
+        sent = requests_mock.last_request.json()["query"]
+        assert sent.count("rateLimit(dryRun: true)") == 1 and "clientRateLimit: rateLimit {" in sent, \
+            "The selection added by the client should not conflict with the query's own rateLimit."
@@ -211,4 +211,60 @@ class TestRepositoryCommits:
         assert "" in result, "empty string should be in the cumulative commits."
         assert result[""]["alice_smith"]["total_additions"] == 7, "alice_smith without name should have 7 additions."
         assert result["Bob Brown"]["total_deletions"] == 5, "Bob Brown without login should have 5 deletions."
-        assert result["Alice Smith"]["alice_smith"]["total_files"] == 2, "Alice Smith with login should have 2 files."
\ No newline at end of file
+        assert result["Alice Smith"]["alice_smith"]["total_files"] == 2, "Alice Smith with login should have 2 files."
+
+    def test_commits_by_author(self, mock_raw_data_multiple_commits, mock_raw_data_multiple_commits_multiple_parents):
+        """Test partitioning commits by login across pages."""
+        result = RepositoryCommits.commits_by_author(mock_raw_data_multiple_commits)
+        result = RepositoryCommits.commits_by_author(mock_raw_data_multiple_commits_multiple_parents, result)
+
+        assert set(result) == {"alice_smith", "john_doe"}, "Commits without a linked user should be left out."
+        assert [commit["message"] for commit in result["alice_smith"]] == ["First commit", "Third commit"]
+        assert len(result["john_doe"]) == 1, "Merge commits should be left out."
+        assert result["john_doe"][0] == {'authoredDate': "2021-01-01T00:00:00Z", 'changedFiles': 5,
+                                         'additions': 10, 'deletions': 4, 'message': "Initial commit"}
+
+    def test_windowed_query_structure(self):
+        """Test the history bounds and oid of the windowed query."""
+        query_string = str(RepositoryCommits(windowed=True))
+
+        assert "history(since: $since, until: $until, first: $pg_size)" in query_string
+        assert "nodes { oid authoredDate" in query_string
+
+    def test_time_windows(self):
+        """Test splitting a span into adjacent windows."""
+        windows = RepositoryCommits.time_windows("2020-01-01T00:00:00Z", "2020-01-04T00:00:00Z", 3)
+
+        assert windows == [("2020-01-01T00:00:00Z", "2020-01-02T00:00:00Z"),
+                           ("2020-01-02T00:00:00Z", "2020-01-03T00:00:00Z"),
+                           ("2020-01-03T00:00:00Z", "2020-01-04T00:00:00Z")]
+
+    def test_merge_windows(self):
+        """Test merging windows in authored date order without the commits on their bounds twice."""
+        def page(*commits):
+            nodes = [{"oid": oid, "authoredDate": date} for oid, date in commits]
+            return {"repository": {"defaultBranchRef": {"target": {"history": {"nodes": nodes}}}}}
+
+        merged = RepositoryCommits.merge_windows([
+            page(("c", "2020-01-02T12:00:00Z"), ("b", "2020-01-02T00:00:00Z")),
+            page(("b", "2020-01-02T00:00:00Z"), ("a", "2020-01-02T01:00:00+02:00")),
+        ])
+
+        history = merged["repository"]["defaultBranchRef"]["target"]["history"]
+        assert [node["oid"] for node in history["nodes"]] == ["c", "b", "a"]
+        assert history["totalCount"] == 3
+
+    def test_commits_list_null_author_name(self):
+        """Test that commits whose author has no name are grouped under None, apart from named authors."""
+        def commit(name, login, additions):
+            return {"authoredDate": "2021-01-01T00:00:00Z", "changedFilesIfAvailable": 1, "additions": additions,
+                    "deletions": 0, "message": "", "parents": {"totalCount": 1},
+                    "author": {"name": name, "email": "", "user": {"login": login} if login else None}}
+        raw_data = {"repository": {"defaultBranchRef": {"target": {"history": {"nodes": [
+            commit(None, "ghost", 1), commit("Ann", "ann", 2), commit(None, None, 4), commit(None, "ghost", 8)]}}}}}
+
+        result = RepositoryCommits.commits_list(raw_data)
+        assert result[None]["ghost"]["total_additions"] == 9
+        assert result[None]["ghost"]["total_commits"] == 2
+        assert result[None]["total_additions"] == 4, "A nameless commit without a user should be counted by name only."
+        assert result["Ann"] == {"ann": {"total_additions": 2, "total_deletions": 0, "total_files": 1, "total_commits": 1}}
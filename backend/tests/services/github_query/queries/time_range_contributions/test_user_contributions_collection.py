@@ -1,5 +1,5 @@
 import re
-from backend.app.services.github_query.queries.time_range_contributions.user_contributions_collection import UserContributionsCollection
+from backend.app.services.github_query.queries.time_range_contributions.user_contributions_collection import UserContributionsCollection, UserContributionsCollectionWindows
 
 class TestUserContributionsCollection:
     def test_user_contributions_collection_query_structure(self):
@@ -63,3 +63,67 @@ class TestUserContributionsCollection:
         # Call the user_contributions_collection method and assert it returns the expected result
         processed_contributions = UserContributionsCollection.user_contributions_collection(raw_data)
         assert processed_contributions == expected_contributions, "Processed user contributions do not match the expected structure."
+
+
+class TestUserContributionsCollectionWindows:
+    def test_windows_query_structure(self):
+        # Instantiate the query class with two windows
+        windows_query = UserContributionsCollectionWindows(2)
+        query_string = str(windows_query)
+        fields = "startedAt endedAt restrictedContributionsCount totalCommitContributions totalIssueContributions " \
+                 "totalPullRequestContributions totalPullRequestReviewContributions totalRepositoryContributions"
+        expected_query = (
+            'query { user(login: "$user") { '
+            f'window0: contributionsCollection(from: $start0, to: $end0) {{ {fields} }} '
+            f'window1: contributionsCollection(from: $start1, to: $end1) {{ {fields} }} '
+            '} }'
+        )
+        assert query_string == expected_query, "Each window should be an aliased contributionsCollection."
+
+    def test_yearly_windows(self):
+        windows = UserContributionsCollectionWindows.yearly_windows("2020-01-01T00:00:00Z", "2021-06-01T00:00:00Z")
+        assert windows == [("2020-01-01T00:00:00Z", "2020-12-31T00:00:00Z"),
+                           ("2020-12-31T00:00:00Z", "2021-06-01T00:00:00Z")], "Windows should cover the span in yearly steps."
+        assert UserContributionsCollectionWindows.yearly_windows("2020-01-01T00:00:00Z", "2020-01-01T00:00:00Z") == []
+
+    def test_window_substitutions(self):
+        windows = [("2020-01-01T00:00:00Z", "2020-12-31T00:00:00Z"), ("2020-12-31T00:00:00Z", "2021-06-01T00:00:00Z")]
+        substitutions = UserContributionsCollectionWindows.window_substitutions("octocat", windows)
+        assert substitutions == {"user": "octocat",
+                                 "start0": "2020-01-01T00:00:00Z", "end0": "2020-12-31T00:00:00Z",
+                                 "start1": "2020-12-31T00:00:00Z", "end1": "2021-06-01T00:00:00Z"}
+        rendered = UserContributionsCollectionWindows(2).substitute(**substitutions)
+        assert 'window1: contributionsCollection(from: "2020-12-31T00:00:00Z", to: "2021-06-01T00:00:00Z")' in rendered
+
+    def test_windows_processing(self):
+        def window(commits):
+            return {
+                "startedAt": "2020-01-01T00:00:00Z",
+                "endedAt": "2020-12-31T23:59:59Z",
+                "restrictedContributionsCount": 0,
+                "totalCommitContributions": commits,
+                "totalIssueContributions": 1,
+                "totalPullRequestContributions": 2,
+                "totalPullRequestReviewContributions": 0,
+                "totalRepositoryContributions": 3,
+            }
+        raw_data = {"user": {"window0": window(10), "window1": window(5)}}
+        processed_contributions = UserContributionsCollectionWindows.user_contributions_collection(raw_data)
+        assert processed_contributions == {"res_con": 0, "commit": 15, "issue": 2, "pr": 4, "pr_review": 0, "repository": 6}
+        assert "res_con" in processed_contributions, "Zero counts should be kept in the summed Counter."
+
+    def test_window_contributions_in_window_order(self):
+        def window(commits):
+            return {
+                "startedAt": "2020-01-01T00:00:00Z",
+                "endedAt": "2020-12-31T23:59:59Z",
+                "restrictedContributionsCount": 0,
+                "totalCommitContributions": commits,
+                "totalIssueContributions": 0,
+                "totalPullRequestContributions": 0,
+                "totalPullRequestReviewContributions": 0,
+                "totalRepositoryContributions": 0,
+            }
+        raw_data = {"user": {f"window{index}": window(index) for index in (10, 2, 1, 0)}}
+        windows = UserContributionsCollectionWindows.window_contributions(raw_data)
+        assert [counts["commit"] for counts in windows] == [0, 1, 2, 10], "Windows should be ordered by index, not lexically."
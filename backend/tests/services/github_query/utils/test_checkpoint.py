@@ -0,0 +1,96 @@
+import pandas as pd
+from unittest.mock import MagicMock
+from backend.app.services.github_query.github_graphql.client import Client
+from backend.app.services.github_query.github_graphql.authentication import PersonalAccessTokenAuthenticator
+from backend.app.services.github_query.queries.comments.user_issue_comments import UserIssueComments
+from backend.app.services.github_query.utils.checkpoint import CheckpointStore, fold_pages
+
+
+def issue_comments_page(cursor, has_next, created_at):
+    return {"user": {"login": "alice", "issueComments": {
+        "totalCount": 3,
+        "nodes": [{"createdAt": created_at}],
+        "pageInfo": {"endCursor": cursor, "hasNextPage": has_next}}}}
+
+
+def count_comments(response, counter):
+    return counter + len(UserIssueComments.user_issue_comments(response))
+
+
+class TestCheckpointStore:
+    def test_completed_keys_survive_reopening(self, tmp_path):
+        path = str(tmp_path / "run.jsonl")
+        store = CheckpointStore(path)
+        store.complete("alice", [{"github": "alice", "commit": 3, "lifetime": pd.NA}])
+
+        reopened = CheckpointStore(path)
+        assert reopened.is_complete("alice")
+        assert not reopened.is_complete("bob")
+        assert reopened.rows("alice") == [{"github": "alice", "commit": 3, "lifetime": None}], "pd.NA should be stored as null."
+
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        store = CheckpointStore(str(path))
+        store.complete("alice", [])
+        with open(path, "a") as file:
+            file.write('{"type": "complete", "key": "bo')
+
+        reopened = CheckpointStore(str(path))
+        assert reopened.is_complete("alice")
+        assert not reopened.is_complete("bob"), "A record torn by a crash should not count."
+
+    def test_latest_progress_wins(self, tmp_path):
+        path = str(tmp_path / "run.jsonl")
+        store = CheckpointStore(path)
+        assert store.progress("alice/issue_comments") == (None, True, None)
+        store.save_progress("alice/issue_comments", "cursor1", True, 1)
+        store.save_progress("alice/issue_comments", "cursor2", False, 2)
+        assert CheckpointStore(path).progress("alice/issue_comments") == ("cursor2", False, 2)
+
+
+class TestFoldPages:
+    def test_resumes_after_last_processed_page(self, tmp_path):
+        path = str(tmp_path / "run.jsonl")
+        client = Client(authenticator=PersonalAccessTokenAuthenticator(token="token"))
+        client._execute = MagicMock(side_effect=[
+            issue_comments_page("cursor1", True, "2020-01-01T00:00:00Z"),
+            RuntimeError("connection lost"),
+        ])
+        try:
+            fold_pages(client, UserIssueComments(), {"user": "alice", "pg_size": 1}, count_comments, 0,
+                       checkpoint=CheckpointStore(path), key="alice/issue_comments")
+        except RuntimeError:
+            pass
+
+        pages = iter([
+            issue_comments_page("cursor2", True, "2020-02-01T00:00:00Z"),
+            issue_comments_page("cursor3", False, "2020-03-01T00:00:00Z"),
+        ])
+        cursors = []
+
+        def fake_execute(query, substitutions, state=None):
+            cursors.append(state.end_cursor)
+            return next(pages)
+        client._execute = fake_execute
+        counter = fold_pages(client, UserIssueComments(), {"user": "alice", "pg_size": 1}, count_comments, 0,
+                             checkpoint=CheckpointStore(path), key="alice/issue_comments")
+
+        assert counter == 3, "The count of the first run should be carried over."
+        assert cursors == ["cursor1", "cursor2"], "Only the pages after the checkpoint should be fetched."
+
+    def test_finished_pagination_is_not_fetched_again(self, tmp_path):
+        store = CheckpointStore(str(tmp_path / "run.jsonl"))
+        store.save_progress("alice/issue_comments", "cursor3", False, 3)
+        client = MagicMock()
+
+        assert fold_pages(client, UserIssueComments(), {"user": "alice", "pg_size": 1}, count_comments, 0,
+                          checkpoint=store, key="alice/issue_comments") == 3
+        client.execute.assert_not_called()
+
+    def test_without_checkpoint(self):
+        client = Client(authenticator=PersonalAccessTokenAuthenticator(token="token"))
+        client._execute = MagicMock(side_effect=[
+            issue_comments_page("cursor1", True, "2020-01-01T00:00:00Z"),
+            issue_comments_page("cursor2", False, "2020-02-01T00:00:00Z"),
+        ])
+        assert fold_pages(client, UserIssueComments(), {"user": "alice", "pg_size": 1}, count_comments, 0) == 2
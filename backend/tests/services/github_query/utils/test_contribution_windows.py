@@ -0,0 +1,85 @@
+from collections import Counter
+from unittest.mock import MagicMock
+from backend.app.services.github_query.utils.contribution_windows import ContributionWindowStore, windowed_contributions
+
+WINDOWS = [("2020-01-01T00:00:00Z", "2020-12-31T00:00:00Z"),
+           ("2020-12-31T00:00:00Z", "2021-12-31T00:00:00Z"),
+           ("2021-12-31T00:00:00Z", "2022-06-01T00:00:00Z")]
+
+
+def collection(commits):
+    return {"startedAt": "", "endedAt": "", "restrictedContributionsCount": 0, "totalCommitContributions": commits,
+            "totalIssueContributions": 1, "totalPullRequestContributions": 0,
+            "totalPullRequestReviewContributions": 0, "totalRepositoryContributions": 0}
+
+
+def windows_client(*commits_per_request):
+    """A client answering each request with one collection per window, from the given commit counts."""
+    client = MagicMock()
+    client.execute.side_effect = [{"user": {f"window{index}": collection(commits) for index, commits in enumerate(commits)}}
+                                  for commits in commits_per_request]
+    return client
+
+
+class TestContributionWindowStore:
+    def test_windows_survive_reopening(self, tmp_path):
+        path = str(tmp_path / "windows.jsonl")
+        ContributionWindowStore(path).put("alice", WINDOWS[0], Counter({"commit": 3}))
+
+        reopened = ContributionWindowStore(path)
+        assert reopened.get("alice", WINDOWS[0]) == Counter({"res_con": 0, "commit": 3, "issue": 0, "pr": 0,
+                                                             "pr_review": 0, "repository": 0})
+        assert reopened.get("alice", WINDOWS[1]) is None
+        assert reopened.get("bob", WINDOWS[0]) is None
+
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        path = tmp_path / "windows.jsonl"
+        ContributionWindowStore(str(path)).put("alice", WINDOWS[0], Counter())
+        with open(path, "a") as file:
+            file.write('{"login": "bo')
+        assert len(ContributionWindowStore(str(path))) == 1
+
+    def test_put_is_fsynced(self, tmp_path, monkeypatch):
+        synced = []
+        monkeypatch.setattr("os.fsync", synced.append)
+        ContributionWindowStore(str(tmp_path / "windows.jsonl")).put("alice", WINDOWS[0], Counter())
+        assert len(synced) == 1, "Every stored window should reach the disk before put returns."
+
+
+class TestWindowedContributions:
+    def test_without_store_fetches_every_window(self):
+        client = windows_client([1, 2, 3])
+        contributions = windowed_contributions(client, "alice", WINDOWS)
+        assert contributions["commit"] == 6 and contributions["issue"] == 3
+        assert contributions["res_con"] == 0, "Zero counts should be kept."
+
+    def test_repeat_run_only_fetches_open_window(self, tmp_path):
+        store = ContributionWindowStore(str(tmp_path / "windows.jsonl"))
+        now = "2022-06-01T00:00:00Z"
+        first = windowed_contributions(windows_client([1, 2, 3]), "alice", WINDOWS, store, now)
+        assert len(store) == 2, "Only the windows that ended should be stored."
+
+        client = windows_client([5])
+        second = windowed_contributions(client, "alice", WINDOWS, store, now)
+        substitutions = client.execute.call_args.kwargs["substitutions"]
+        assert substitutions == {"user": "alice", "start0": WINDOWS[2][0], "end0": WINDOWS[2][1]}
+        assert first["commit"] == 6 and second["commit"] == 8
+
+    def test_recent_window_is_not_stored(self, tmp_path):
+        store = ContributionWindowStore(str(tmp_path / "windows.jsonl"))
+        windowed_contributions(windows_client([1, 2, 3]), "alice", WINDOWS, store, "2021-12-31T12:00:00Z")
+        assert store.get("alice", WINDOWS[1]) is None, "A window that ended less than a day ago may still change."
+
+    def test_all_windows_stored_skips_the_request(self, tmp_path):
+        store = ContributionWindowStore(str(tmp_path / "windows.jsonl"))
+        windowed_contributions(windows_client([1, 2, 3]), "alice", WINDOWS, store, "2023-01-01T00:00:00Z")
+        client = windows_client()
+        assert windowed_contributions(client, "alice", WINDOWS, store)["commit"] == 6
+        client.execute.assert_not_called()
+
+    def test_query_is_reused_per_window_count(self):
+        first, second = windows_client([1, 2, 3]), windows_client([4, 5, 6])
+        windowed_contributions(first, "alice", WINDOWS)
+        windowed_contributions(second, "bob", WINDOWS)
+        assert first.execute.call_args.kwargs["query"] is second.execute.call_args.kwargs["query"], \
+            "The compiled query of a window count should be shared between calls."
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from unittest.mock import MagicMock
 from backend.app.services.github_query.github_graphql.client import Client
 from backend.app.services.github_query.github_graphql.query import Query
-from backend.app.services.github_query.utils.helper import print_methods, print_attr, get_abs_path, generate_file_name, add_by_days, minus_by_days, in_time_period, created_before, created_after, write_csv, get_owner_and_name, have_rate_limit
+from backend.app.services.github_query.utils.helper import print_methods, print_attr, get_abs_path, generate_file_name, add_by_days, minus_by_days, in_time_period, created_before, created_after, reached_time, write_csv, get_owner_and_name, have_rate_limit
 
 class TestUtilityFunctions:
     def test_get_abs_path(mock_file_path):
@@ -46,6 +46,13 @@ class TestUtilityFunctions:
         assert created_after("2022-01-01T00:00:00Z", "2021-01-01T00:00:00Z") is True, "Created should be after the time."
         assert created_after("2022-01-01T00:00:00Z", "2023-01-01T00:00:00Z") is False, "Created should not be after the time."
 
+    def test_reached_time(self):
+        nodes = [{"createdAt": "2021-01-01T00:00:00Z"}, {"createdAt": "2022-06-01T00:00:00Z"}]
+        assert reached_time(nodes, "2022-01-01T00:00:00Z") is True, "The last node is past the cutoff."
+        assert reached_time(nodes, "2022-06-01T00:00:00Z") is True, "A node at the cutoff reaches it."
+        assert reached_time(nodes, "2023-01-01T00:00:00Z") is False, "No node reaches the cutoff yet."
+        assert reached_time([], "2022-01-01T00:00:00Z") is False, "An empty page never reaches the cutoff."
+
     def test_write_csv(self):
         with tempfile.NamedTemporaryFile("w+", delete=False) as tmp:
             data_row = "test,data,row"
@@ -97,8 +104,8 @@ class TestUtilityFunctions:
         # Mock the client's execute method to return controlled rate limit info
         mock_rate_limit_info = {
             'rateLimit': {
-                'cost': 10,
-                'remaining': 10,  # Ensure the cost is not less than remaining - 5
+                'cost': 0,
+                'remaining': 6,  # Ensure the estimated cost of 1 is not less than remaining - 5
                 'resetAt': "2023-01-01T00:00:00Z"
             }
         }
@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock
+from backend.app.services.github_query.utils.repository_stats import REPOSITORIES, repository_stats
+
+
+def repository(owner, is_fork, forks, language):
+    return {"owner": {"login": owner}, "isFork": is_fork, "createdAt": "2020-01-01T00:00:00Z", "forkCount": forks,
+            "stargazerCount": 1, "watchers": {"totalCount": 1},
+            "languages": {"totalSize": 100, "edges": [{"size": 100, "node": {"name": language}}]}}
+
+
+def page(*repositories):
+    return {"user": {"repositories": {"nodes": list(repositories)}}}
+
+
+class TestRepositoryStats:
+    def test_pages_are_bucketed_into_columns(self):
+        client = MagicMock()
+        client.execute.return_value = iter([page(repository("alice", False, 2, "Python")),
+                                            page(repository("alice", False, 3, "Go"), repository("bob", True, 7, "C"))])
+
+        columns = repository_stats(client, "alice", "2022-01-01T00:00:00Z")
+        assert columns["Atotal_count"] == 2 and columns["Afork_count"] == 5
+        assert columns["type_A_lang"] == {"Python": 100, "Go": 100}
+        assert columns["Btotal_count"] == 0 and columns["type_B_lang"] == {}
+        assert columns["Dtotal_count"] == 1 and columns["type_D_lang"] == {"C": 100}
+        assert client.execute.call_args.kwargs["query"] is REPOSITORIES, "Every user should share the same query."
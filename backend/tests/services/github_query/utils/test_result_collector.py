@@ -0,0 +1,47 @@
+import pandas as pd
+from backend.app.services.github_query.utils.result_collector import ResultCollector
+
+class TestResultCollector:
+    def test_empty_frame_keeps_columns(self):
+        collector = ResultCollector(["github", "commit"])
+        frame = collector.to_frame()
+        assert list(frame.columns) == ["github", "commit"], "An empty result should still have its columns."
+        assert len(frame) == 0 and len(collector) == 0
+
+    def test_matches_concat(self):
+        """Test that collecting rows gives the frame the miners used to build with pd.concat."""
+        rows = [{"github": "alice", "commit": 3, "type_A_lang": {"Python": 10}},
+                {"github": "bob", "commit": pd.NA, "type_A_lang": pd.NA}]
+        expected = pd.DataFrame(columns=["github", "commit", "type_A_lang"])
+        for row in rows:
+            expected = pd.concat([expected, pd.DataFrame([row])], ignore_index=True)
+
+        collector = ResultCollector(["github", "commit", "type_A_lang"])
+        collector.extend(rows)
+
+        assert collector.to_frame().to_dict("records") == expected.to_dict("records")
+        assert collector.to_frame()["type_A_lang"][0] == {"Python": 10}, "Dictionary values should be kept as is."
+
+    def test_missing_and_new_columns(self):
+        collector = ResultCollector(["repo", "login"])
+        collector.append({"repo": "r"})
+        collector.append({"repo": "s", "login": "alice", "commits": 2})
+
+        frame = collector.to_frame()
+        assert list(frame.columns) == ["repo", "login", "commits"], "New columns should be added at the end."
+        assert pd.isna(frame["login"][0]), "Missing values should be filled with pd.NA."
+        assert pd.isna(frame["commits"][0]), "Earlier rows should be back-filled for a new column."
+        assert collector.to_records()[1] == {"repo": "s", "login": "alice", "commits": 2}
+
+    def test_frame_is_cached_until_append(self):
+        collector = ResultCollector(["login"])
+        collector.append({"login": "alice"})
+        frame = collector.to_frame()
+        assert collector.to_frame() is frame, "The frame should only be built once per change."
+        collector.append({"login": "bob"})
+        assert list(collector.to_frame()["login"]) == ["alice", "bob"]
+
+    def test_dtypes(self):
+        collector = ResultCollector(["login", "commits"], dtypes={"commits": "Int64"})
+        collector.extend([{"login": "alice", "commits": 2}, {"login": "bob"}])
+        assert str(collector.to_frame()["commits"].dtype) == "Int64"
@@ -0,0 +1,44 @@
+import pytest
+from datetime import datetime
+from backend.app.services.github_query.utils.timestamps import parse_time, is_time_format, time_key, count_leading_before
+
+
+class TestTimestamps:
+    def test_parse_time(self):
+        assert parse_time("2021-01-02T03:04:05Z") == datetime(2021, 1, 2, 3, 4, 5)
+        with pytest.raises(ValueError):
+            parse_time("2021-01-02")
+
+    def test_is_time_format(self):
+        assert is_time_format("2021-01-02T03:04:05Z")
+        assert not is_time_format("octocat")
+        assert not is_time_format("2021-13-02T03:04:05Z"), "Out of range fields should not match the format."
+
+    def test_time_key(self):
+        assert time_key("2021-01-02T03:04:05Z") == "2021-01-02T03:04:05Z"
+        assert time_key("2021-1-2T3:4:5Z") == "2021-01-02T03:04:05Z", "Unpadded fields should be normalised."
+        with pytest.raises(ValueError):
+            time_key("")
+
+    @pytest.mark.parametrize("time_string", ["2020-13-45T00:00:00Z", "2021-02-29T00:00:00Z", "2021-04-31T00:00:00Z",
+                                             "2021-01-01T24:00:00Z", "2021-01-01T00:60:00Z", "0000-01-01T00:00:00Z"])
+    def test_time_key_rejects_invalid_canonical_times(self, time_string):
+        with pytest.raises(ValueError):
+            time_key(time_string)
+
+    def test_time_key_month_ends(self):
+        assert time_key("2020-02-29T23:59:59Z") == "2020-02-29T23:59:59Z"
+        assert time_key("2021-12-31T00:00:00Z") == "2021-12-31T00:00:00Z"
+
+    def test_count_leading_before(self):
+        times = ["2021-01-01T00:00:00Z", "2021-01-02T00:00:00Z", "2020-01-01T00:00:00Z"]
+        assert count_leading_before(times, "2021-01-02T00:00:00Z") == 1, "Counting should stop at the first later time."
+        assert count_leading_before(times, "2022-01-01T00:00:00Z") == 3
+        assert count_leading_before([], "2022-01-01T00:00:00Z") == 0
+        assert count_leading_before(["2021-1-1T00:00:00Z", "2021-01-03T00:00:00Z"], "2021-01-02T00:00:00Z") == 1, \
+            "Unpadded fields should be compared by time."
+
+    def test_count_leading_before_stops_parsing(self):
+        times = ["2021-01-01T00:00:00Z", "2021-01-03T00:00:00Z", "not a time"]
+        assert count_leading_before(iter(times), "2021-01-02T00:00:00Z") == 1, \
+            "Timestamps after the first later one should not be parsed."